@@ -13,12 +13,16 @@
 #    Notes:
 #     - This add-on is currently implemented using command line pipes via Python.
 #     - Implementation is also limited to file access initially.
-#     - The use of subversions SWIG hooks should be investigated since it should lead
-#       to better compatibility accross svn versions.
+#     - Subversion's SWIG bindings are used in-process for the frequent queries when
+#       they can be imported (see svnbackend.py). Otherwise the svn executable is used.
 #     - This add-on is not yet localized.
 #     - Diff will be implemented in text first. If practical, a binary diff would be 
 #       useful.
 #
+#     - The svn helpers and job funcs below the Blender imports do not need bpy.
+#       Outside Blender they are used by the command line (see svncli.py):
+#       python -m svnconnector --help
+#
 #     - Blender 'installs' (copies) addons to the following locations:
 #       MacOS: /Users/{user}/Library/Application Support/Blender/{versions}/
 #       Win:   TBC
@@ -30,17 +34,28 @@
 #       by Jacques Lucke
 #  
 
-import bpy
-from bpy.types import Attribute, Operator, AddonPreferences, STATUSBAR_HT_header
-from bpy.props import StringProperty, IntProperty, BoolProperty
-from bpy.app.handlers import persistent
+try:
+    import bpy
+    import bpy.utils.previews
+    from bpy.types import Attribute, Operator, Menu, Panel, AddonPreferences, STATUSBAR_HT_header
+    from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
+    from bpy.app.handlers import persistent
+except ImportError:
+    # Imported outside Blender, e.g. by 'python -m svnconnector'. The Blender
+    # classes are still defined, on plain bases, but are never registered.
+    bpy = None
+    Operator = Menu = Panel = AddonPreferences = object
+    StringProperty = IntProperty = BoolProperty = EnumProperty = dict
+    persistent = lambda func: func
 
 import os, sys, inspect, logging
-import platform, subprocess, re, gettext
+import platform, subprocess, re, gettext, json, urllib.parse, getpass, shutil
 
 from pathlib import Path
 from datetime import datetime
 
+from . import svnstate, svnjobs, svnbackend, svnxml, wcdb, svnhistory, revcache, blendfile, svnthumbs, blenddiff, svnsavepoints, svnprofiles, svnsparse, svnbatch, svntrace, svnlog, svnremote, svnlocks
+
 
 
 ##############################
@@ -62,13 +77,45 @@ svnadmin_version = ""
 ## File SVN Status
 svn_file_status  = ''
 
+## Per-user folder for the local caches (revision cache, history index, thumbnails)
+#   Not the add-on folder: an update or reinstall replaces that, and a
+#   system-wide install may not be writable. SVNCONNECTOR_CACHE_DIR overrides it.
+def getUserCacheDir():
+    override = os.environ.get('SVNCONNECTOR_CACHE_DIR')
+    if override:
+        return Path(override)
+    if sys.platform == 'darwin':
+        base = Path.home()/'Library'/'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home()/'.cache'
+    return Path(base)/'svnconnector'
+
+cacheDir = getUserCacheDir()
+
 ## Define default preferences
 ## TODO: Move this to prefs file
 prefs = dict(
     str_prefSVNExecutableDir = None,
     bln_SVNUseDefaultLocalHome = True,
     str_prefSVNRepoHome = None,
-    bln_SVNUseDefaultRepoName = True
+    bln_SVNUseDefaultRepoName = True,
+    int_prefStateCacheTTL = 10,
+    bln_prefUseRevisionCache = True,
+    int_prefRevisionCacheMB = 4096,
+    bln_prefAutoCommit = False,
+    int_prefAutoCommitDelay = 30,
+    int_prefAutoCommitInterval = 300,
+    int_prefAutoCommitMaxPending = 10,
+    str_prefRepoProfile = svnprofiles.DEFAULT_PROFILE,
+    str_prefCheckoutDepth = 'infinity',
+    int_prefProcessTimeout = svnjobs.PROCESS_TIMEOUT,
+    str_prefProjectDir = '',
+    str_prefTraceFile = '',
+    str_prefLogLevel = svnlog.DEFAULT_LEVEL,
+    str_prefServerMode = 'local',
+    str_prefServerURL = '',
+    bln_prefNeedsLock = False,
+    int_prefLockCacheTTL = svnlocks.LOCK_TTL
 )
 
 # svn command parameter dictionary correct as v1.14.1
@@ -77,14 +124,15 @@ prefs = dict(
 #   Alternatively SWIG: https://svnbook.red-bean.com/en/1.0/ch08s02.html#svn-ch-8-sect-2.3
 svn_commands = {"svn_version_quiet": ["svn","--version","--quiet"],
                 "svn_version": ["svn","--version"],
-                "svn_info": ["svn","info"], # E155007 'not a working copy'
-                "svn_status": ["svn","status","-v"], # W155007 'not a working copy'
-                "svn_status_all": ["svn","status"],
-                "svn_revision": ["svn","info"],
+                "svn_info": ["svn","info","--xml"], # E155007 'not a working copy'
+                "svn_status": ["svn","status","-v","--xml"], # W155007 'not a working copy'
+                "svn_status_all": ["svn","status","--xml"],
+                "svn_revision": ["svn","info","--xml"],
                 "svn_admin_version": ["svnadmin","--version","--quiet"],
                 "svn_admin_create": ["svnadmin", "create"],
                 "svn_commit_single": ["svn","commit","-m \'Commit from svnconnector.\'"],
                 "svn_commit_all": ["svn","commit","-m \'Commit from svnconnector.\'"],
+                "svn_commit_savepoint": ["svn","commit","--no-unlock","-m \'Save point from svnconnector.\'"],
                 "svn_add_single": ["svn","add","--parents"],
                 "svn_revert": ["svn","revert"],
                 "svn_update": ["svn", "update"],
@@ -92,7 +140,27 @@ svn_commands = {"svn_version_quiet": ["svn","--version","--quiet"],
                 "svn_mkdir_repo": ["svn", "mkdir", "-m \'Create directory structure.\'"],
                 "svn_checkout": ["svn", "checkout"],
                 "svn_get_revision": ["svn", "checkout"],
-                "svn_get_wc-root": ["svn", "info", "--show-item", "wc-root"]}
+                "svn_get_wc-root": ["svn", "info", "--show-item", "wc-root"],
+                "svn_status_batch": ["svn","status","-v","--xml","--depth","empty"],
+                "svn_add_batch": ["svn","add","--parents","--depth","empty"],
+                "svn_commit_changeset": ["svn","commit","-m \'Commit from svnconnector.\'","--depth","empty"],
+                "svn_log": ["svn","log","--xml"],
+                "svn_cat": ["svn","cat","-r"],
+                "svn_import": ["svn","import","-m \'Initial import from svnconnector.\'"],
+                "svn_checkout_force": ["svn","checkout","--force"],
+                "svn_update_set_depth": ["svn","update","--parents","--force","--set-depth"],
+                "svn_cleanup": ["svn","cleanup"],
+                "svn_status_lock": ["svn","status","-u","-v","--xml","--depth","empty"],
+                "svn_lock": ["svn","lock","-m \'Locked from svnconnector.\'"],
+                "svn_unlock": ["svn","unlock"],
+                "svn_propset_needs_lock": ["svn","propset","svn:needs-lock","*"]}
+
+## Seconds the quick version probes may take before svn is considered broken
+probe_timeout = 30
+
+## Patterns not imported by 'Create Repo & Import Folder': svn's default
+#  global-ignores plus Blender's numbered backups (.blend1, .blend2, ...).
+bulk_import_ignores = "*.o *.lo *.la *.al .libs *.so *.so.[0-9]* *.a *.pyc *.pyo __pycache__ *.rej *~ #*# .#* .*.swp .DS_Store [Tt]humbs.db *.blend? *.blend??"
 
 ##########################
 ### SVN Utility Funcs  ###
@@ -100,24 +168,35 @@ svn_commands = {"svn_version_quiet": ["svn","--version","--quiet"],
 
 ## Return full svn command line for the environment
 def generateSvnCommandLine(svn_command):
-    result = svn_commands[svn_command]
+    # A copy, so that a changed executables folder applies to the next call.
+    result = list(svn_commands[svn_command])
     result[0] = os.path.join(prefs["str_prefSVNExecutableDir"],result[0])
 
-    myLogger.debug("Generated command: \'" + ' '.join(result) + "\'")
+    # svn subcommands get --non-interactive etc. right after the subcommand,
+    # as some command lines end in an option still waiting for its value.
+    if Path(result[0]).stem == 'svn' and not result[1].startswith('-'):
+        result = result[:2] + svnremote.commandOptions(server_mode_in_use == 'remote' and svnremote.isSshUrl(serverUrl)) + result[2:]
+
+    if myLogger.isEnabledFor(logging.DEBUG):
+        myLogger.debug("Generated command: '%s'", ' '.join(result))
 
     return result
 
 
+## Command releasing the working copy locks left by an svn process killed while working on path
+def getCleanupCommand(path):
+    try:
+        wc_root = wcdb.findWcRoot(path)
+    except wcdb.SchemaMismatch:
+        wc_root = None
+    if wc_root is None:
+        wc_root = path if os.path.isdir(path) else os.path.dirname(path)
+    return generateSvnCommandLine("svn_cleanup") + [wc_root]
+
+
 ## Return whether there is a working set available for the directory
 def getHasWorkingSet(working_dir):
-    process = subprocess.Popen(generateSvnCommandLine("svn_info") + [working_dir],
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-    if (len(stdout)<1) & (len(re.findall("E155007", stderr.decode('utf-8')))>0):
-        return False
-    else:
-        return True
+    return svnBackend.hasWorkingSet(working_dir)
 
 
 ## Get the SVN status of the repo or file at filepath
@@ -136,83 +215,93 @@ def getHasWorkingSet(working_dir):
 #     '?' item is not under version control
 #     '!' item is missing (removed by non-svn comman    d) or incomplete
 #     '~' versioned item obstructed by some item of a different kind
-def getSvnStatus(wc_root):
-    process = subprocess.Popen(generateSvnCommandLine("svn_status_all") + [wc_root],
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
+def getSvnStatus(wc_root, items=None):
+    # Only entries whose item is in items are kept (e.g. {'added'}). The
+    # output is filtered while it streams, so large working copies are cheap.
+    keep = None if items is None else (lambda entry: entry.item in items)
+    returncode, entries, stderr = svnxml.runStatus(generateSvnCommandLine("svn_status_all") + [wc_root], keep)
 
-    if len(stdout)>1:
-        result = stdout.decode('utf-8')
-        myLogger.debug(f'Got svn_status {result}.')
+    if returncode==0 or len(entries)>0:
+        myLogger.debug('Got svn_status with %d entries.', len(entries))
 
-        return None, result
+        return None, entries
 
     elif len(stderr)>1:
         # Warnings will be returned on stderr.
-        error = stderr.decode('utf-8')
-        
-        return error, None
+        return stderr, None
 
     else:
-        return f'Command returned code: {process.returncode}', None
+        return f'Command returned code: {returncode}', None
 
 
 def getSvnFileStatus(filepath):
-    process = subprocess.Popen(generateSvnCommandLine("svn_status") + [filepath],
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-
-    if len(stdout)>1:
-        result = stdout.decode('utf-8')
-        return None, result[0]
-    elif len(stderr)>1:
-        # Warnings will be returned on stderr.
-        error = stderr.decode('utf-8')
-        
-        # We want to allow 'warning: W155010: The node ... was not found.'
-        # This just means that the parents are not added.
-        if len(re.findall("W155010", error))>0:
-            return None, '?'
-        else:
-            return error, None
-    else:
-        return f'Command returned code: {process.returncode}', None
+    return svnBackend.fileStatus(filepath)
 
 
 ## Get the revision number of the given node (file or directory)
 def getSvnRevision(filepath):
-    process = subprocess.Popen(generateSvnCommandLine("svn_revision") + [filepath],
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-
-    if len(stdout)>1:
-        result = stdout.decode('utf-8')
-
-        ## Extract repo number from the command's string response
-        # Revision: n
-        # Node Kind: directory | file
-        result = re.findall(r'Revision: \d+',result)
-        if len(result)<1:
-            result = 0
-        else:
-            result = re.findall(r'\d+',result[0])[0]
-
-        return None, int(result)
+    return svnBackend.revision(filepath)
+
+
+## Get the status of many nodes with a single svn invocation
+#   Only the nodes themselves are reported (--depth empty). Returns a dict of
+#   path -> StatusEntry; targets svn could not report on are left out.
+#   Job funcs pass their job, so that a cancel or timeout stops svn.
+def getSvnStatusBatch(paths, job=None):
+    if len(paths)<1:
+        return None, {}
+
+    returncode, entries, stderr = svnxml.runStatus(generateSvnCommandLine("svn_status_batch") + list(paths), job=job)
+
+    if returncode!=0 and len(entries)<1 and len(re.findall("W155010", stderr))<1:
+        return stderr if len(stderr)>1 else f'Command returned code: {returncode}', None
+
+    return None, {os.path.normpath(entry.path): entry for entry in entries}
+
+
+## Get the folders between wc_root and paths which are scheduled for addition
+#   These must be committed together with the paths themselves (E200009).
+#   Only the ancestors are asked about, in one 'svn status --depth empty', so
+#   the cost does not grow with the size of the working copy.
+def getAddedParents(paths, wc_root, job=None):
+    wc_root = os.path.normpath(wc_root)
+    parents = set()
+    for path in paths:
+        parent = os.path.dirname(os.path.normpath(path))
+        while len(parent)>len(wc_root) and parent not in parents:
+            parents.add(parent)
+            parent = os.path.dirname(parent)
+
+    err, statuses = getSvnStatusBatch(sorted(parents), job)
+    if err:
+        return err, None
+    return None, sorted(path for path, entry in statuses.items() if entry.item == 'added')
+
+
+## Get the repository UUID and repository-relative path (e.g. '/trunk/a.blend') of filepath
+#   Read from wc.db when possible. Only asks svn if use_svn is set, so draw()
+#   can call this without starting a process. Job funcs pass their job.
+def getSvnReposInfo(filepath, use_svn=True, job=None):
+    try:
+        db = wcdb.getWcDbFor(filepath)
+        info = db.reposInfo(filepath) if db is not None else None
+        if info is not None:
+            root, uuid, repos_path = info
+            return None, (uuid, '/' + repos_path)
+    except wcdb.SchemaMismatch as error:
+        myLogger.debug('Could not read repository info from wc.db: %s', error)
+
+    if not use_svn:
+        return 'Repository information not available without svn.', None
+
+    returncode, entries, stderr = svnxml.runInfo(generateSvnCommandLine("svn_info") + [filepath], job)
+    if len(entries)>0 and entries[0].repos_uuid:
+        entry = entries[0]
+        return None, (entry.repos_uuid, urllib.parse.unquote(entry.url[len(entry.repos_root):]) or '/')
     elif len(stderr)>1:
-        # Warnings will be returned on stderr.
-        error = stderr.decode('utf-8')
-        
-        # We want to allow 'warning: W155010: The node ... was not found.'
-        # This just means that the parents are not added.
-        if len(re.findall("W155010", error))>0:
-            return None, '?'
-        else:
-            return error, None
+        return stderr, None
     else:
-        return f'Command returned code: {process.returncode}', None
+        return f'Command returned code: {returncode}', None
 
 
 ## Generate a repo name based on the current folder
@@ -221,70 +310,291 @@ def generateRepoName(filepath):
     return result
 
 
+## Resolve the repositories home for a file in working_dir
+#   A relative repoRoot is taken relative to working_dir after expanding '~'.
+#   A server URL (remote mode) is returned as it is, as a string.
+def resolveRepoRoot(repoRoot, working_dir):
+    if svnremote.isRemoteUrl(repoRoot):
+        return None, str(repoRoot).rstrip('/')
+
+    repoRoot = Path(repoRoot)
+    if not repoRoot.is_absolute():
+        repoRoot = repoRoot.expanduser()
+        if not repoRoot.is_absolute():
+            try:
+                repoRoot = Path(working_dir).joinpath(repoRoot).resolve()
+            except ValueError as error:
+                myLogger.error(f'Could not resolve repoRoot {repoRoot} against working_dir {working_dir}.')
+                return 'Could not resolve repsitory root folder.', None
+    return None, repoRoot
+
+
 ## Get the Root dir of the Working Copy
 def getSVNWCRoot(filepath):
-    process = subprocess.Popen(generateSvnCommandLine("svn_info") + [filepath],
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
+    return svnBackend.wcRoot(filepath)
+
+
+## Collect filepath and every file it references inside wc_root
+#   The files need not exist, e.g. in a sparse working copy.
+#   Uses bpy, so it must be called on the main thread.
+def getReferencedPaths(filepath, wc_root):
+    paths = {os.path.normpath(filepath)}
+
+    for path in bpy.utils.blend_paths(absolute=True, packed=False, local=False):
+        paths.add(os.path.normpath(bpy.path.abspath(path)))
+    for library in bpy.data.libraries:
+        paths.add(os.path.normpath(bpy.path.abspath(library.filepath)))
+
+    root = os.path.join(os.path.normpath(wc_root), '')
+    return sorted(path for path in paths if path.startswith(root))
+
+
+## Collect filepath and every existing file it references inside wc_root
+#   Uses bpy, so it must be called on the main thread.
+def getChangeSetPaths(filepath, wc_root):
+    # Sequences and UDIM tiles are given as patterns which do not exist on disk.
+    return [path for path in getReferencedPaths(filepath, wc_root) if os.path.isfile(path)]
+
+
+## Return whether filepath and its properties are unchanged since the last commit
+#   Answered from wc.db and a streamed SHA-1 against the pristine checksum, so
+#   no svn process is needed. The properties are compared first, as a change
+#   of e.g. svn:needs-lock alone leaves the content as committed. False
+#   whenever that cannot be decided.
+def isUnchangedSinceCommit(filepath):
+    try:
+        db = wcdb.getWcDbFor(filepath)
+        return db is not None and not db.propertiesModified(filepath) and db.matchesPristine(filepath) is True
+    except (wcdb.SchemaMismatch, OSError) as error:
+        myLogger.debug('Could not compare %s with its pristine copy: %s', filepath, error)
+        return False
 
-    if len(stdout)>1:
-        result = stdout.decode('utf-8')
 
-        wc_root = result.split('\n')[2]
-        wc_root = wc_root[wc_root.find(':')+1::].strip()
+#########################
+###  SVN State Cache  ###
+#########################
 
-        return None, wc_root
+## Last known svn state of the files shown in the UI
+#   draw() and poll() read from here instead of starting svn processes.
+stateCache = svnstate.StateCache(ttl=prefs["int_prefStateCacheTTL"])
 
-    elif len(stderr)>1:
-        # Warnings will be returned on stderr.
-        error = stderr.decode('utf-8')
-        
-        return error, None
 
-    else:
-        return f'Command returned code: {process.returncode}', None
+## Query svn for the current state of filepath
+#   Only called by stateCache on a miss or after the entry has expired.
+def loadFileState(filepath):
+    state = svnstate.FileState(filepath)
 
+    # An unsaved file cannot belong to a working copy.
+    if not filepath:
+        state.status_err = state.revision_err = 'File has not been saved.'
+        return state
 
-## Get parents to add in case of E200009
-def getCommitListWithParents(filepath, wc_root, svn_status):
+    state.has_working_set = getHasWorkingSet(Path(filepath).parent)
+    if not state.has_working_set:
+        state.status_err = state.revision_err = 'Not a working copy.'
+        return state
 
-    sep = os.sep    
-    relpaths = filepath[len(wc_root)+1::]
-    result = []
+    state.status_err, state.status = getSvnFileStatus(filepath)
+    state.revision_err, state.revision = getSvnRevision(filepath)
+    state.wc_root_err, state.wc_root = getSVNWCRoot(filepath)
 
-    myLogger.debug(f'Creating commitlist for filepath {filepath} against wc_root {wc_root}.')
+    myLogger.debug('Loaded svn state for %s: status \'%s\', revision \'%s\'.', filepath, state.status, state.revision)
 
-    ## Get a list of oustanding file/folder additions
-    svn_status = re.findall("^A.*$",svn_status,re.MULTILINE)
-    svn_status = [item[8::] for item in svn_status] #encoding issue
-    myLogger.debug(f'Using svn_status for interset {svn_status}.')
+    return state
 
-    ## Better to use re iterator
-    for i in range(relpaths.count(sep)+1):
-        result.append(os.path.join(wc_root,relpaths))
-        relpaths = relpaths[:relpaths.rfind(os.sep):]
 
-    myLogger.debug(f'Using unintersected commitlist {result}.')
+## Get the (possibly cached) svn state of filepath
+def getCachedFileState(filepath):
+    return stateCache.get(filepath, loadFileState)
 
-    ## Need to cross-reference against svn status results
-    #  Intersect
-    result = [value for value in result if value in svn_status]
 
-    myLogger.debug(f'Created commitlist {result}.')
+## Drop cached svn state whenever a file is loaded or saved
+#   The handler signature differs between Blender versions, so accept anything.
+@persistent
+def svnStateFileHandler(*args):
+    stateCache.invalidate()
 
-    return result
+
+################################
+###  SVN Capability Probing  ###
+################################
+
+## Capabilities are cached on disk, keyed by the path, mtime and size of the
+#  executables, so later sessions do not need to start svn to know them.
+capsCacheFile = cacheDir/'svn_caps.json'
+svn_caps_loaded = False
+
+## The job probing the capabilities when they are not cached, or None
+capsJob = None
+
+
+## Return a key identifying the installed executable, or None if it is missing
+def getExecutableKey(executable):
+    try:
+        stat = os.stat(executable)
+    except OSError:
+        return None
+    return [str(executable), stat.st_mtime_ns, stat.st_size]
+
+
+## communicate() with a child which is killed if it takes longer than probe_timeout
+#   A killed child returns what it printed so far and a note on stderr.
+def communicateWithTimeout(process, timeout=None):
+    try:
+        return process.communicate(timeout=timeout or probe_timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        stdout, stderr = process.communicate()
+        myLogger.error(f'\'{" ".join(process.args[:2])}\' did not finish in {timeout or probe_timeout} seconds.')
+        return stdout, stderr + b'Timed out.'
+
+
+## Run the svn and svnadmin executables to find their versions and RA modules
+def probeSvnCapabilities():
+    caps = dict(svn_version = "", svn_ra_local = False, svn_ra_svn = False,
+                svnadmin_avail = False, svnadmin_version = "")
+
+    ## Check that svn is installed
+    try:
+        process = svntrace.Popen(generateSvnCommandLine("svn_version_quiet"),
+                                stdout=subprocess.PIPE, 
+                                stderr=subprocess.PIPE)
+        stdout, stderr = communicateWithTimeout(process)
+
+        if len(stderr)>0:
+            myLogger.error("Error locating \'svn\' command: " + stderr.decode('utf-8'))
+        else:
+            caps["svn_version"] = stdout.decode('utf-8')
+            myLogger.info("\'svn\' command found successfully. Using version" + caps["svn_version"])
+
+    except FileNotFoundError as error:
+        myLogger.critical(error)
+        myLogger.critical("\'svn\' command could not be found")
+
+    ## Check svn capabilities
+    try:
+        process = svntrace.Popen(generateSvnCommandLine("svn_version"),
+                                stdout=subprocess.PIPE, 
+                                stderr=subprocess.PIPE)
+        stdout, stderr = communicateWithTimeout(process)
+
+        stdout = stdout.decode('utf-8')
+
+        caps["svn_ra_svn"]   = len(re.findall("ra_svn", stdout))>0
+        caps["svn_ra_local"] = len(re.findall("ra_local", stdout))>0
+
+        myLogger.info("Subversion RA modules confirmed. ra_svn: {0} ra_local: {1}".format(caps["svn_ra_svn"], caps["svn_ra_local"]))
+
+    except FileNotFoundError as error:
+        myLogger.critical(error)
+        myLogger.critical("\'svn\' command could not be found.")
+
+    ## Check that svnadmin is installed
+    try:
+        process = svntrace.Popen(generateSvnCommandLine("svn_admin_version"),
+                                stdout=subprocess.PIPE, 
+                                stderr=subprocess.PIPE)
+        stdout, stderr = communicateWithTimeout(process)
+
+        caps["svnadmin_version"] = stdout.decode('utf-8')
+        caps["svnadmin_avail"] = True 
+
+        myLogger.info("\'svnadmin\' command found successfully. Using version" + caps["svnadmin_version"])
+
+    except FileNotFoundError as error:
+        myLogger.error(error)
+        myLogger.error("\'svnadmin\' command could not be found.")
+
+    return caps
+
+
+## Key of the capability cache for the installed executables
+def getCapabilitiesKey():
+    return dict(svn = getExecutableKey(generateSvnCommandLine("svn_version")[0]),
+                svnadmin = getExecutableKey(generateSvnCommandLine("svn_admin_version")[0]))
+
+
+## Return the capabilities cached for key, or None
+def readCachedCapabilities(key):
+    try:
+        cached = json.loads(capsCacheFile.read_text(encoding='utf-8'))
+        if cached.get("key") == key:
+            myLogger.info(f'Using cached svn capabilities from {capsCacheFile}.')
+            return cached["caps"]
+    except (OSError, ValueError, KeyError, AttributeError) as error:
+        myLogger.debug('No usable svn capability cache: %s', error)
+    return None
+
+
+## Probe the capabilities and write them to capsCacheFile
+#   Runs on lockEngine; the probes start three processes, so not on the UI thread.
+def svnProbeCapabilities(job, key):
+    caps = probeSvnCapabilities()
+    try:
+        capsCacheFile.parent.mkdir(parents=True, exist_ok=True)
+        capsCacheFile.write_text(json.dumps(dict(key = key, caps = caps)), encoding='utf-8')
+    except OSError as error:
+        myLogger.warning(f'Could not write svn capability cache: {error}')
+    return None, caps
+
+
+def setSvnCapabilities(caps):
+    global svn_caps_loaded, svn_version, svn_ra_local, svn_ra_svn, svnadmin_avail, svnadmin_version
+
+    svn_version      = caps["svn_version"]
+    svn_ra_local     = caps["svn_ra_local"]
+    svn_ra_svn       = caps["svn_ra_svn"]
+    svnadmin_avail   = caps["svnadmin_avail"]
+    svnadmin_version = caps["svnadmin_version"]
+    svn_caps_loaded  = True
+
+
+def svnCapabilitiesProbed(job):
+    global capsJob
+
+    if job.cancelled:
+        # e.g. by unregister(); probed again on the next request.
+        capsJob = None
+    elif job.error:
+        myLogger.error(f'Could not probe the svn capabilities: {job.error}')
+        setSvnCapabilities(dict(svn_version = "", svn_ra_local = False, svn_ra_svn = False,
+                                svnadmin_avail = False, svnadmin_version = ""))
+    else:
+        setSvnCapabilities(job.result[1])
+
+
+## Make the svn capabilities available in the module attributes, without waiting
+#   Served from capsCacheFile when the executables are unchanged. Otherwise a
+#   job probes them, and False is returned until it has been delivered.
+#   Must be called on the main thread, e.g. from draw().
+def requestSvnCapabilities():
+    global capsJob
+
+    if svn_caps_loaded:
+        return True
+
+    if capsJob is None:
+        key = getCapabilitiesKey()
+        caps = readCachedCapabilities(key)
+        if caps is not None:
+            setSvnCapabilities(caps)
+            return True
+        capsJob = lockEngine.submit('probe_caps', svnProbeCapabilities, key, on_done=svnCapabilitiesProbed)
+        return False
+
+    if capsJob.finished:
+        lockEngine.pump()
+    return svn_caps_loaded
 
 
 ######################
 ###  INIT/LOGGING  ###
 ######################
 
-logFile = logging.FileHandler(filename=str(Path(__file__).parent/'svnconnector.log'),
-                                mode='w',
-                                encoding='utf-8')
-logFile.setFormatter(logging.Formatter('%(name)s: %(levelname)s %(message)s'))
-logging.basicConfig(level=logging.DEBUG, handlers=[logFile])
+# Written by a background thread, see svnlog.py. The level is set from the
+# add-on preferences in register().
+logPath = str(Path(__file__).parent/'svnconnector.log')
+svnlog.startLogging(logPath, prefs["str_prefLogLevel"])
 
 myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
 
@@ -308,7 +618,8 @@ if platform.system() == "Darwin": # | "Linux" | "Windows"
     prefs["str_prefSVNRepoHome"] = "~/.svnrepos/"
     #prefs["str_prefSVNRepoHome"] = "file://$HOME/.svnrepos/" 
 elif platform.system() == "Linux":
-    prefs["str_prefSVNExecutableDir"] = "/usr/local/bin/"
+    # Distribution packages install to /usr/bin, builds from source to /usr/local/bin.
+    prefs["str_prefSVNExecutableDir"] = os.path.dirname(shutil.which("svn") or "/usr/local/bin/svn") + "/"
     prefs["str_prefSVNRepoHome"] = "~/.svnrepos/"
     #prefs["str_prefSVNRepoHome"] = "file://$HOME/.svnrepos/"
 # elif platform.system() == "Windows":
@@ -328,63 +639,1459 @@ myLogger.info("Using Python version " + '.'.join(map(str, sys.version_info)))
 
 
 # Record Blender version
-myLogger.info(f'Got blender version {bpy.app.version}.')
+if bpy is not None:
+    myLogger.info(f'Got blender version {bpy.app.version}.')
+else:
+    myLogger.info('Running without Blender.')
 
 
 ## Check that svn is installed
+#   Only the executable is looked up here so that importing the add-on starts no
+#   processes. Its version and capabilities are probed on first use.
 #   TODO: Confirm minimum version
-try:
-    process = subprocess.Popen(generateSvnCommandLine("svn_version_quiet"),
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-
-    if len(stderr)>0:
-        myLogger.error("Error locating \'svn\' command: " + stderr.decode('utf-8'))
-    else:
-        svn_version = stdout.decode('utf-8')
-        myLogger.info("\'svn\' command found successfully. Using version" + svn_version )
-    
-except FileNotFoundError as error:
-    myLogger.critical(error)
+if getExecutableKey(generateSvnCommandLine("svn_version")[0]) is None:
     myLogger.critical("\'svn\' command could not be found")
     raise SystemError("\'svn\' command could not be found. Please ensure that subversion is installed and available on your environment's PATH variable.")
 
 
-## Check svn capabilities
-try:
-    process = subprocess.Popen(generateSvnCommandLine("svn_version"),
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
+## Select the svn backend
+#   The in-process bindings are used when they can be imported.
+svnBackend = svnbackend.createBackend(generateSvnCommandLine)
+myLogger.info(f'Using svn backend \'{svnBackend.name}\'.')
 
-    stdout = stdout.decode('utf-8')
-    
-    svn_ra_svn   = len(re.findall("ra_svn", stdout))>0
-    svn_ra_local = len(re.findall("ra_local", stdout))>0
-    
-    myLogger.info("Subversion RA modules confirmed. ra_svn: {0} ra_local: {1}".format(svn_ra_svn, svn_ra_local))
-    
-except FileNotFoundError as error:
-    myLogger.critical(error)
-    myLogger.critical("\'svn\' command could not be found.")
 
 
-## Check that svnadmin is installed
-try:
-    process = subprocess.Popen(generateSvnCommandLine("svn_admin_version"),
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
-    
-    svnadmin_version = stdout.decode('utf-8')
-    svnadmin_avail = True 
-    
-    myLogger.info("\'svnadmin\' command found successfully. Using version" + svnadmin_version)
-    
-except FileNotFoundError as error:
-    myLogger.error(error)
-    myLogger.error("\'svnadmin\' command could not be found.")
+#######################
+###  SVN Job Funcs  ###
+#######################
+
+# The functions below run on a worker thread via jobEngine, so they must not
+# touch bpy. Each returns an (error, message) pair like the utility funcs above.
+
+jobEngine = svnjobs.JobEngine()
+
+
+## bpy.app.timers callback delivering finished jobs on the main thread
+def svnJobTimer():
+    return jobEngine.pump()
+
+
+## Start a job and make sure its result will be delivered
+#   on_done(job) is called on the main thread after the state cache is dropped.
+def submitSvnJob(name, func, *args, on_done=None):
+    def done(job):
+        svnJobDone(job)
+        if on_done is not None:
+            on_done(job)
+
+    job = jobEngine.submit(name, func, *args, on_done=done)
+    if not bpy.app.timers.is_registered(svnJobTimer):
+        bpy.app.timers.register(svnJobTimer, first_interval=svnjobs.PUMP_INTERVAL)
+    return job
+
+
+## Any job may have changed the working copy, so drop the cached state
+#   Lock states are only marked for a refresh; they are kept on show until then.
+def svnJobDone(job):
+    stateCache.invalidate()
+    lockCache.expire()
+
+
+## Re-open the current file after svn has replaced it on disk
+#   Run from a timer so that it happens after the operator has finished.
+def reloadMainFile():
+    bpy.ops.wm.revert_mainfile()
+    return None
+
+
+## Report the outcome of a job from the operator which started it
+def reportJobResult(operator, job, reload=False):
+    if job.cancelled:
+        operator.report({'WARNING'}, f'{operator.bl_label}: Cancelled.')
+        return {'CANCELLED'}
+
+    if job.error:
+        operator.report({'ERROR'}, job.error)
+        return {'FINISHED'}
+
+    err, message = job.result
+    if err:
+        operator.report({'ERROR'}, err)
+    else:
+        operator.report({'INFO'}, message)
+        if reload:
+            bpy.app.timers.register(reloadMainFile, first_interval=0.0)
+
+    return {'FINISHED'}
+
+
+## Run a revert or update command and interpret its output
+#   The command's last argument is the file being reverted or updated.
+def runSvnFileUpdate(job, command, description):
+    returncode, stdout, stderr = job.runProcess(command, svnjobs.SvnProgress(job),
+                                                cleanup=getCleanupCommand(command[-1]))
+    if len(stdout)>0:
+        result = stdout.decode('utf-8')
+        myLogger.info(result.replace('\n',' '))
+        myLogger.debug('Successfully completed %s. Return code: \'%s\'.', description, returncode)
+        return None, result.replace('\n',' ')
+    elif len(stderr)>0:
+        result = stderr.decode('utf-8')
+        myLogger.error(result)
+        return result, None
+    else:
+        myLogger.error(f'Error when {description}: {returncode}')
+        return f'Error when {description}: {returncode}', None
+
+
+## Create a repository for the folder of filepath and commit the file to it
+#   https://subversion.apache.org/quick-start#setting-up-a-local-repo
+#   The layout is created in r1 and the file (or, with bulk set, the whole
+#   folder) is imported as r2 with 'svn import'. Checking out trunk over the
+#   folder with --force then adopts the existing files as the working copy, so
+#   no separate add, commit and update are needed: four svn processes in total,
+#   however many files are imported.
+#   The repository profile (see svnprofiles.py) is applied right after
+#   'svnadmin create', before the first commit.
+#   With a depth other than 'infinity' the working copy is sparse: only the
+#   folders of filepath and of the files in needed are checked out in full.
+#   If repoRoot is a server URL (remote mode) no repository is created: the
+#   layout is made in a new folder repoName under that URL, and the profile
+#   is left to the server's administrator.
+def svnCreateAndImport(job, filepath, repoRoot, repoName, bulk=False, profile='default', depth='infinity', needed=()):
+    filename = Path(filepath).name
+    working_dir = Path(filepath).parent
+
+    # Check we are not already in a working set
+    # Answered from the file system (.svn), so no svn process is needed.
+    job.setProgress(0.0, 'Checking for an existing working copy')
+    if getHasWorkingSet(working_dir):
+        return "A working copy already exists for this directory. You can add or commit this file to the existing working copy.", None
+
+    remote = svnremote.isRemoteUrl(repoRoot)
+    if remote:
+        err, repoUrl = checkRemoteProject(job, repoRoot, repoName)
+        if err:
+            return err, None
+        created = f'project at {repoUrl}'
+    else:
+        err, repoPath = prepareLocalRepository(repoRoot, repoName)
+        if err:
+            return err, None
+        repoUrl = repoPath.as_uri()
+        created = f'repository at {repoPath}'
+
+    trunk = f'{repoUrl}/trunk'
+    if bulk:
+        # Each imported file or folder is one line of 'svn import' output.
+        total = sum(len(dirs) + len(files) for root, dirs, files in os.walk(working_dir))
+        description = f'Importing {working_dir.name} ({total} items)'
+        importCommand = (generateSvnCommandLine('svn_import')
+                         + ['--config-option', f'config:miscellany:global-ignores={bulk_import_ignores}']
+                         + [working_dir.as_posix(), trunk])
+    else:
+        total = 1
+        description = f'Importing {filename}'
+        importCommand = generateSvnCommandLine('svn_import') + [filepath, f'{trunk}/{urllib.parse.quote(filename)}']
+
+    checkoutCommand = generateSvnCommandLine('svn_checkout_force') + ['--depth', depth] + [trunk] + [working_dir.as_posix()]
+
+    # Each step is (progress start, progress message, command, error label,
+    # function run after the command succeeded or None).
+    steps = [
+        # Create a recommended project layout in the new repository:
+        # (on a server, in a new folder of the existing repository)
+        (0.15, 'Creating repository structure',
+         generateSvnCommandLine('svn_mkdir_repo') + (['--parents'] if remote else [])
+         + [trunk] + [f'{repoUrl}/branches'] + [f'{repoUrl}/tags'],
+         'Error creating repository (svn_mkdir_repo)', None),
+        # Import the file or folder into trunk/ in one commit:
+        #  svn import ./ file://$HOME/.svnrepos/MyRepo/trunk
+        (0.25, description, importCommand,
+         'Error importing to repository (svn_import)', None),
+        # Convert the current directory into a working copy of the trunk/ in the repository.
+        # --force adopts the files which were just imported instead of refusing to overwrite them.
+        #  svn checkout --force file://$HOME/.svnrepos/MyRepo/trunk ./
+        (0.9, 'Checking out working copy', checkoutCommand,
+         'Error checking out new respository', None),
+    ]
+
+    if not remote:
+        # Create a new repository withing the repoRoot
+        steps.insert(0, (0.05, 'Creating repository',
+                         generateSvnCommandLine('svn_admin_create') + [repoPath.as_posix()],
+                         'Error creating repository (svn_admin_create)',
+                         lambda: svnprofiles.applyProfile(repoPath.as_posix(), profile)))
+
+    imported = 0
+
+    def importProgress(chunk):
+        nonlocal imported
+        imported += chunk.count(b'\n')
+        job.setProgress(0.25 + 0.65*min(imported/total, 1.0), f'{description}: {min(imported, total)}/{total}')
+
+    try:
+        for progress, message, command, error_label, after in steps:
+            job.setProgress(progress, message)
+            if command is importCommand:
+                returncode, stderr = job.streamProcess(command, importProgress)
+            elif command is checkoutCommand:
+                # A killed checkout leaves a locked working copy in working_dir.
+                returncode, stdout, stderr = job.runProcess(command, svnjobs.SvnProgress(job, total, 0.9, 0.95),
+                                                            cleanup=generateSvnCommandLine('svn_cleanup') + [working_dir.as_posix()])
+            else:
+                returncode, stdout, stderr = job.runProcess(command)
+
+            if returncode!=0:
+                error = svnremote.explainError(stderr.decode("utf-8", errors="replace"))
+                myLogger.error(f'{error_label}: {error}')
+                return f'{error_label}: {error}', None
+            if after is not None:
+                error = after()
+                if error:
+                    myLogger.error(error)
+                    return error, None
+            myLogger.info(f'Completed step: {message}.')
+
+        if depth != 'infinity':
+            job.setProgress(0.95, 'Checking out the folders the file needs')
+            err, expanded = svnExpandFolders(job, working_dir.as_posix(), [filepath] + list(needed))
+            if err:
+                return err, None
+
+    except OSError as error:
+        myLogger.error(error)
+        return f'Error creating repository (OSError): {error}', None
+
+    if bulk:
+        myLogger.info(f'Completed importing {working_dir} to repository.')
+        return None, f'Created {created} and imported {imported} items from {working_dir.name}.'
+
+    myLogger.info(f'Completed importing {filename} to repository.')
+
+    return None, f'Created {created} and comitted {filename}.'
+
+
+## Check the repositories home and the name for a new local repository
+#   Creates the home if needed. Returns (err, repository path).
+def prepareLocalRepository(repoRoot, repoName):
+    #Start to create necessary paths
+    myLogger.info(f'Start creating repository at Root: \'{repoRoot}\', Name: \'{repoName}\'.')
+    # svnadmin creates repositories the same way on macOS and Linux, as long
+    # as it is in the folder of the SVN executables.
+    #  https://subversion.apache.org/quick-start#setting-up-a-local-repo
+    svnadmin = generateSvnCommandLine('svn_admin_create')[0]
+    if shutil.which(svnadmin) is None:
+        myLogger.error(f'\'svnadmin\' not found at {svnadmin}.')
+        return f'Creating repositories needs svnadmin, which was not found at {svnadmin}. Please set the folder of the SVN executables in the add-on preferences.', None
+
+    # Check whether the repo home exists. If not, create it.
+    if not repoRoot.exists():
+        myLogger.info(f'Repositories home {repoRoot.as_posix()} not found. Attempting to create it.')
+        try:
+            Path.mkdir(repoRoot, parents=True)
+            myLogger.info(f'Successfully created repositories home.')
+        except OSError as error:
+            myLogger.error(error)
+            return f'Error creating repositories home: {error}', None
+    else:
+        myLogger.info(f'Existing repo home was found.')
+
+    ## Check whether the repo already exists
+    #   If not create it
+    #   If so, error.
+    myLogger.info(f'Checking for repo \'{repoName}\'')
+
+    repoPath = Path(repoRoot,repoName)
+    if repoPath.exists():
+        myLogger.error(f'Repository {repoPath.as_posix()} already exists. Aborting.')
+        return f'Indicated repository {repoPath.as_posix()} already exists. Please choose another name or move this file to the related working set.', None
+
+    return None, repoPath
+
+
+## Check that repoName is free under the server URL repoRoot
+#   Returns (err, URL of the new project folder).
+def checkRemoteProject(job, repoRoot, repoName):
+    repoUrl = svnremote.joinUrl(repoRoot, repoName)
+    myLogger.info(f'Checking for project \'{repoUrl}\' on the server.')
+    job.setProgress(0.05, f'Connecting to {repoRoot}')
+
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_info") + [repoUrl])
+    if returncode==0:
+        myLogger.error(f'Project {repoUrl} already exists. Aborting.')
+        return f'{repoUrl} already exists on the server. Please choose another name or check it out instead.', None
+
+    # E170000: the URL does not exist, which is what we want.
+    stderr = stderr.decode('utf-8', errors='replace')
+    if svnremote.SVN_ERR_RA_ILLEGAL_URL not in svnremote.errorCodes(stderr):
+        myLogger.error(f'Could not check {repoUrl}: {stderr}')
+        return svnremote.explainError(stderr), None
+    return None, repoUrl
+
+
+## Deepen the folders of wc_root needed for the files at paths
+#   See svnsparse.foldersToExpand(). Returns (err, number of folders).
+def svnExpandFolders(job, wc_root, paths):
+    try:
+        db = wcdb.getWcDb(wc_root)
+        folders = svnsparse.foldersToExpand(paths, wc_root, lambda relpaths: db.depthsOf(relpaths))
+    except wcdb.SchemaMismatch as error:
+        myLogger.error(error)
+        return f'Could not read the folder depths of the working copy: {error}', None
+
+    if len(folders)<1:
+        return None, 0
+
+    myLogger.info(f'Expanding {len(folders)} folders to depth \'{svnsparse.EXPAND_DEPTH}\': {folders}')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_update_set_depth")
+                                                + [svnsparse.EXPAND_DEPTH] + folders,
+                                                svnjobs.SvnProgress(job), cleanup=getCleanupCommand(wc_root))
+    if returncode!=0:
+        stderr = stderr.decode('utf-8', errors='replace')
+        myLogger.error(f'Error expanding folders: {stderr}')
+        return f'Error checking out folders: {stderr}', None
+    return None, len(folders)
+
+
+## Check out the folders holding the files the open .blend references
+def svnExpandReferenced(job, wc_root, paths):
+    job.setProgress(0.0, 'Checking folder depths')
+    err, count = svnExpandFolders(job, wc_root, paths)
+    if err:
+        return err, None
+    if count<1:
+        return None, 'All referenced folders are already checked out.'
+    return None, f'Checked out {count} folders.'
+
+
+## Change the depth of one folder of a working copy
+def svnSetDepth(job, path, depth):
+    job.setProgress(0.0, f'Setting {Path(path).name} to \'{svnsparse.DEPTH_LABELS[depth]}\'')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_update_set_depth") + [depth, path],
+                                                svnjobs.SvnProgress(job), cleanup=getCleanupCommand(path))
+    if returncode!=0:
+        stderr = stderr.decode('utf-8', errors='replace')
+        myLogger.error(f'Error setting depth of {path}: {stderr}')
+        return f'Error setting folder depth: {stderr}', None
+    myLogger.info(stdout.decode('utf-8', errors='replace').replace('\n',' '))
+    return None, f'{Path(path).name}: {svnsparse.DEPTH_LABELS[depth]}.'
+
+
+## Fetch a page of log entries for filepath into the local history index
+#   By default only revisions newer than the index's high-water mark are
+#   fetched. With older set, the next page below its low-water mark is.
+def svnFetchHistory(job, filepath, older=False):
+    job.setProgress(0.0, 'Looking up repository')
+    err, repos = getSvnReposInfo(filepath, job=job)
+    if err:
+        myLogger.error(err)
+        return err, None
+    historyRepos[filepath] = repos
+
+    uuid, path = repos
+    index = svnhistory.getHistoryIndex(cacheDir, uuid)
+    high, low, complete = index.coverage(path)
+
+    # start None is HEAD.
+    limit = svnhistory.PAGE_SIZE
+    if high is None:
+        start, end = None, 1
+    elif older:
+        if complete or low <= 1:
+            return None, 'All revisions of this file are loaded.'
+        start, end = low-1, 1
+    else:
+        start, end, limit = None, high+1, None
+    rev_range = f'{start or "HEAD"}:{end}'
+
+    job.setProgress(0.2, f'Fetching revisions {rev_range}')
+
+    # From a server, through the RA session kept open for its repository.
+    root = getRemoteRoot(filepath)
+    if root is not None:
+        err, latest = remoteSessions.latestRevision(root)
+        if latest is not None and end > latest:
+            return None, 'History is up to date.'
+        if latest is not None:
+            err, entries = remoteSessions.log(root, path, start, end, limit)
+        if err:
+            myLogger.error(err)
+            return err, None
+        if latest is not None and entries is not None:
+            job.checkCancelled()
+            return storeHistory(index, path, entries, high, low, older, limit)
+
+    command = generateSvnCommandLine("svn_log") + ['-r', rev_range] + (['--limit', str(limit)] if limit else []) + [filepath]
+    returncode, entries, stderr = svnxml.runLog(command, job)
+    job.checkCancelled()
+
+    if returncode!=0 and len(entries)<1:
+        # E160006 'No such revision': nothing newer than the high-water mark.
+        if len(re.findall("E160006", stderr))>0:
+            return None, 'History is up to date.'
+        myLogger.error(stderr)
+        return stderr if len(stderr)>1 else f'Command returned code: {returncode}', None
+
+    return storeHistory(index, path, entries, high, low, older, limit)
+
+
+## Add the log entries fetched by svnFetchHistory to the history index
+def storeHistory(index, path, entries, high, low, older, limit):
+    if len(entries)>0:
+        revisions = [entry.revision for entry in entries]
+        # Fewer entries than asked for means the start of the file's history was reached.
+        reached_start = limit is not None and len(entries) < limit
+        index.store(path, entries, max(revisions), min(revisions), reached_start)
+    elif high is not None:
+        index.store(path, [], high, low, older)
+
+    return None, f'Fetched {len(entries)} revisions.'
+
+
+## Read the thumbnail of every indexed revision of filepath into thumbnailCache
+#   Revisions in the revision cache are read locally. Others are streamed from
+#   'svn cat' into the reader, which stops svn once the thumbnail is found.
+def svnBuildThumbnails(job, filepath):
+    job.setProgress(0.0, 'Looking up repository')
+    err, repos = getSvnReposInfo(filepath, job=job)
+    if err:
+        myLogger.error(err)
+        return err, None
+    uuid, path = repos
+
+    index = svnhistory.getHistoryIndex(cacheDir, uuid)
+    revisions = [row[0] for row in index.page(path, 0, index.count(path))]
+    if len(revisions)<1:
+        return 'No history loaded for this file. Fetch it first.', None
+
+    missing = [revnum for revnum in revisions if thumbnailCache.state(uuid, path, revnum) is None]
+    failed = 0
+    for number, revnum in enumerate(missing):
+        job.setProgress(number/len(missing), f'Reading thumbnail of revision {revnum}')
+
+        blob = getRevisionCache().lookup(uuid, path, revnum)
+        try:
+            if blob is not None:
+                thumbnail = blendfile.readThumbnail(blob)
+            else:
+                reader = blendfile.ThumbnailReader()
+                returncode, stderr = job.streamProcess(generateSvnCommandLine("svn_cat") + [str(revnum), filepath],
+                                                       reader.feed)
+                if not reader.done and returncode!=0:
+                    myLogger.error(f'Error fetching revision {revnum}: {stderr.decode("utf-8", errors="replace")}')
+                    failed += 1
+                    continue
+                thumbnail = reader.thumbnail
+        except blendfile.BlendFileError as error:
+            myLogger.warning(f'Could not read revision {revnum} of \'{filepath}\': {error}')
+            thumbnail = None
+
+        thumbnailCache.store(uuid, path, revnum, thumbnail)
+
+    if failed>0:
+        return f'Could not fetch {failed} of {len(missing)} revisions. See the log for details.', None
+    return None, f'Read thumbnails of {len(missing)} revisions.'
+
+
+## Add filepath to its working copy
+#   With locking on, a .blend file also gets svn:needs-lock.
+def svnAddFile(job, filepath):
+    job.setProgress(0.0, 'Checking file status')
+    err, status = getSvnFileStatus(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+    if status in [' ','A','C','M']:
+        return "File is already added to the working set.", None
+    elif status == 'I':
+        return "File is currently ignored. Please remove it from the .svnignore file.", None
+    elif status != '?':
+        myLogger.error(f'File has unsupported status \'{status}\'.')
+        return f'File has unsupported status \'{status}\'.', None
+
+    job.setProgress(0.3, f'Adding {Path(filepath).name}')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_add_single") + [filepath],
+                                                cleanup=getCleanupCommand(filepath))
+    if returncode!=0 or len(stdout)<1:
+        stderr = stderr.decode('utf-8')
+        myLogger.error(f'Error when adding file: {stderr or returncode}')
+        return stderr if len(stderr)>0 else f'Error when adding file: {returncode}', None
+    result = stdout.decode('utf-8').replace('\n',' ')
+    myLogger.info(result)
+
+    command = getNeedsLockCommand([filepath])
+    if command is not None:
+        job.setProgress(0.7, 'Setting svn:needs-lock')
+        returncode, stdout, stderr = job.runProcess(command, cleanup=getCleanupCommand(filepath))
+        if returncode!=0:
+            myLogger.error(f'Error setting svn:needs-lock: {stderr.decode("utf-8")}')
+            return None, result + ' Could not set svn:needs-lock.'
+        result += ' It will need a lock once committed.'
+
+    return None, result
+
+
+## Commit a set of files (a .blend and the files it references) atomically
+#   Unversioned files are added first. Statuses are gathered with one batched
+#   svn status and everything is committed with one svn commit.
+def svnCommitChangeSet(job, filepath, paths):
+    err, wc_root = getSVNWCRoot(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    job.setProgress(0.0, f'Checking status of {len(paths)} files')
+    err, statuses = getSvnStatusBatch(paths, job)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    ignored = [path for path in paths if path in statuses and statuses[path].letter == 'I']
+    to_add  = [path for path in paths if path not in statuses or statuses[path].letter == '?']
+    for path in ignored:
+        myLogger.info(f'Skipping ignored file \'{path}\'.')
+
+    if len(to_add)>0:
+        job.setProgress(0.2, f'Adding {len(to_add)} new files')
+        returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_add_batch") + to_add,
+                                                    svnjobs.SvnProgress(job, len(to_add), 0.2, 0.4),
+                                                    cleanup=getCleanupCommand(wc_root))
+        if returncode!=0:
+            stderr = stderr.decode('utf-8')
+            myLogger.error(f'Error adding files \'{stderr}\'.')
+            return f'Error adding files: {stderr}', None
+        myLogger.info(stdout.decode('utf-8').replace('\n',' '))
+
+        command = getNeedsLockCommand(to_add)
+        if command is not None:
+            returncode, stdout, stderr = job.runProcess(command, cleanup=getCleanupCommand(wc_root))
+            if returncode!=0:
+                stderr = stderr.decode('utf-8')
+                myLogger.error(f'Error setting svn:needs-lock \'{stderr}\'.')
+                return f'Error setting svn:needs-lock: {stderr}', None
+
+    commitlist = to_add + [path for path in paths
+                           if path in statuses and statuses[path].letter in ['M','A','R','D']]
+    if len(commitlist)<1:
+        return "None of the files have oustanding changes to commit.", None
+
+    # Folders added with --parents have to go into the same commit.
+    job.setProgress(0.4, 'Collecting new parent folders')
+    err, parents = getAddedParents(commitlist, wc_root, job)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    # One 'Sending'/'Adding' line and one dot of 'Transmitting file data' per file.
+    job.setProgress(0.5, f'Committing {len(commitlist)} files')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_commit_changeset") + parents + commitlist,
+                                                svnjobs.SvnProgress(job, len(parents) + 2*len(commitlist), 0.5, 1.0),
+                                                cleanup=getCleanupCommand(wc_root))
+
+    if returncode==0:
+        result = stdout.decode('utf-8')
+        myLogger.info(result.replace('\n',' '))
+        return None, f'Committed {len(commitlist)} files{f" (skipped {len(ignored)} ignored)" if ignored else ""}.'
+    else:
+        stderr = stderr.decode('utf-8')
+        myLogger.error(f'Error when committing change set \'{stderr}\'.')
+        myLogger.error(f'Error when committing commitlist \'{parents + commitlist}\'.')
+        return f'Error committing change set \'{stderr}\'.', None
+
+
+## Commit filepath, including any uncommitted parent folders if necessary
+#   With savepoint set the commit is logged as an automatic save point, and
+#   a lock on the file is kept so that it can still be saved afterwards.
+def svnCommitFile(job, filepath, savepoint=False):
+
+    # A save which changed nothing is common. Catch it before starting svn.
+    job.setProgress(0.0, 'Comparing with last commit')
+    if isUnchangedSinceCommit(filepath):
+        myLogger.info(f'File \'{filepath}\' matches its pristine copy. Nothing to commit.')
+        return "File has no oustanding changes to commit.", None
+
+    # Confirm file status
+    # Acceptable for commit: 'A','M'
+    job.setProgress(0.05, 'Checking file status')
+    err, status = getSvnFileStatus(filepath)
+
+    if err:
+        myLogger.error('Aborting: File has error staus.')
+        myLogger.error(err)
+        return err, None
+    if status == ' ':
+        return "File has no oustanding changes to commit.", None
+    elif status == '?':
+        return "File has not been added to the working set. Please add it before committing.", None
+    elif status == 'I':
+        return "File is currently ignored. Please remove it from the .svnignore file.", None
+    elif status not in ['M','A']:
+        myLogger.error(f'File has unsupported status \'{status}\'.')
+        return f'File has unsupported status \'{status}\'.', None
+
+    ## Try to commit single file individually
+    job.setProgress(0.1, f'Committing {Path(filepath).name}')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_commit_savepoint" if savepoint else "svn_commit_single") + [filepath],
+                                                svnjobs.SvnProgress(job, 2, 0.1, 0.5), cleanup=getCleanupCommand(filepath))
+
+    if returncode==0:
+        result = stdout.decode('utf-8')
+        myLogger.info(result.replace('\n',' '))
+        myLogger.info(f'Successfully committed.')
+        return None, result.replace('\n',' ')
+
+    #handle planned error cases
+    stderr = stderr.decode('utf-8')
+    if len( re.findall("E200009", stderr) )<1:
+        myLogger.error(f'Error when committing file: {stderr}')
+        return f'Error when committing file: {stderr}', None
+
+    ## If the file was added from a sub-folder of the working copy
+    #  which was created after the last commit, then we need to 
+    #  include those parent folders of that file  in the next commit.
+    myLogger.debug("attempting to commit with parents.")
+    job.setProgress(0.5, 'Collecting new parent folders')
+    err, wc_root = getSVNWCRoot(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    err, parents = getAddedParents([filepath], wc_root, job)
+    if err:
+        myLogger.error(err)
+        return err, None
+    if len(parents)<1:
+        myLogger.error(f'Error when committing file: {stderr}')
+        return f'Error when committing file: {stderr}', None
+
+    job.checkCancelled()
+    commitlist = parents + [filepath]
+
+    # --depth empty: commit the new folders themselves, not everything in them.
+    job.setProgress(0.6, f'Committing {Path(filepath).name} with parent folders')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_commit_savepoint" if savepoint else "svn_commit_all")
+                                                + ["--depth","empty"] + commitlist,
+                                                svnjobs.SvnProgress(job, len(parents) + 2, 0.6, 1.0),
+                                                cleanup=getCleanupCommand(wc_root))
+
+    if len(stdout)>0:
+        result = stdout.decode('utf-8')
+        myLogger.info(result.replace('\n',' '))
+        myLogger.debug('Successfully committed. Return code: \'%s\'.', returncode)
+        return None, result.replace('\n',' ')
+    else:
+        stderr = stderr.decode('utf-8')
+        myLogger.error(f'Error when committing file with parents \'{stderr}\'.')
+        myLogger.error(f'Error when committing commitlist \'{commitlist}\'.')
+        return f'Error committing file \'{stderr}\'.', None
+
+
+## Record an automatic save point of filepath
+#   Files with nothing to commit, or which are not under version control, are
+#   skipped quietly rather than reported as errors.
+def svnSavePoint(job, filepath):
+    job.setProgress(0.0, 'Comparing with last commit')
+    if isUnchangedSinceCommit(filepath):
+        myLogger.info(f'Save point skipped: \'{filepath}\' is unchanged.')
+        return None, 'Unchanged.'
+
+    err, status = getSvnFileStatus(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+    if status not in ['M','A']:
+        myLogger.info(f'Save point skipped: \'{filepath}\' has status \'{status}\'.')
+        return None, f'Skipped (status \'{status}\').'
+
+    blocker = getCommitBlocker(filepath)
+    if blocker:
+        myLogger.info(f'Save point skipped: {blocker}')
+        return None, 'Skipped (the server would refuse it).'
+
+    return svnCommitFile(job, filepath, savepoint=True)
+
+
+## Revert filepath to the previous revision
+# Confirm file status
+# Acceptable for revert: ' ','M'
+#  if 'M' -> Uncomitted changes, so:
+#            svn revert filename
+#  if ' ' -> Changes were previously comitted, so:
+#            svn update -r N filename
+#           or, with the revision cache, restore N's content (see svnShowRevision)
+#  if 'M' after svnShowRevision -> step back once more from the restored revision
+#           old:
+#              svn export --force -r PREV filename filename 
+#           or svn merge -r HEAD:123 .
+#         then svn commit -m "Reverted to revision 123"
+def svnRevertPrevious(job, filepath):
+    job.setProgress(0.0, 'Checking file status')
+    err, status = getSvnFileStatus(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    shown = getShownRevision(filepath) if useRevisionCache else None
+
+    if status == 'M' and shown is not None:
+        # Not an edit: an older revision restored from the revision cache.
+        revnum = shown
+        if revnum <= 2:
+            myLogger.error(f'Could not revert: File is already at first revision.')
+            return f'Could not revert: File is already at first revision.', None
+        return svnShowRevision(job, filepath, revnum-1)
+
+    elif status == 'M':
+        job.setProgress(0.2, 'Discarding uncommitted changes')
+        return runSvnFileUpdate(job, generateSvnCommandLine("svn_revert") + [filepath],
+                                f'reverting file with status {status}')
+
+    elif status == ' ':
+        #Get and adjust revision number
+        err, revnum = getSvnRevision(filepath)
+        if err:
+            myLogger.error(err)
+            return err, None
+        if revnum <= 2:
+            myLogger.error(f'Could not revert: File is already at first revision.')
+            return f'Could not revert: File is already at first revision.', None
+        revnum -= 1
+
+        if useRevisionCache:
+            return svnShowRevision(job, filepath, revnum)
+
+        myLogger.info(f'Attempting to update file to revision {revnum}.')
+        job.setProgress(0.2, f'Updating file to revision {revnum}')
+        #execute update command
+        return runSvnFileUpdate(job, generateSvnCommandLine("svn_update_previous") + [str(revnum)] + [filepath],
+                                f'updating file to revision {revnum}')
+
+    else:
+        myLogger.error(f'File has unsupported status \'{status}\'.')
+        return f'File has unsupported status \'{status}\'.', None
+
+
+## Revert filepath to revision revnum
+#   Like svnRevertPrevious(), but to a given revision. Uncommitted changes are
+#   only thrown away with discard set.
+def svnRevertToRevision(job, filepath, revnum, discard=False):
+    job.setProgress(0.0, 'Checking file status')
+    err, status = getSvnFileStatus(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    if status == 'M' and getShownRevision(filepath) is None:
+        if not discard:
+            return 'File has uncommitted changes. Commit or revert them first.', None
+        job.setProgress(0.1, 'Discarding uncommitted changes')
+        err, message = runSvnFileUpdate(job, generateSvnCommandLine("svn_revert") + [filepath],
+                                        f'reverting file with status {status}')
+        if err:
+            return err, None
+    elif status not in [' ','M']:
+        myLogger.error(f'File has unsupported status \'{status}\'.')
+        return f'File has unsupported status \'{status}\'.', None
+
+    if revnum < 2:
+        # r1 only holds the repository layout.
+        return f'Could not revert: File has no revision {revnum}.', None
+
+    if useRevisionCache:
+        return svnShowRevision(job, filepath, revnum)
+
+    myLogger.info(f'Attempting to update file to revision {revnum}.')
+    job.setProgress(0.2, f'Updating file to revision {revnum}')
+    return runSvnFileUpdate(job, generateSvnCommandLine("svn_update_previous") + [str(revnum)] + [filepath],
+                            f'updating file to revision {revnum}')
+
+
+## Return (error, path) of the cached content of revision revnum of filepath
+#   Fetched with 'svn cat' and added to the revision cache on a miss.
+def fetchRevision(job, filepath, uuid, path, revnum):
+    cache = getRevisionCache()
+    blob = cache.lookup(uuid, path, revnum)
+    if blob is not None:
+        return None, blob
+
+    myLogger.info(f'Fetching revision {revnum} of \'{filepath}\'.')
+    incoming = cache.incoming()
+    try:
+        returncode, stderr = job.streamProcess(generateSvnCommandLine("svn_cat") + [str(revnum), filepath],
+                                               incoming.write)
+    except BaseException:
+        incoming.discard()
+        raise
+    if returncode!=0:
+        incoming.discard()
+        stderr = stderr.decode('utf-8', errors='replace')
+        myLogger.error(f'Error fetching revision {revnum}: {stderr}')
+        return f'Error fetching revision {revnum}: {stderr}', None
+    return None, cache.insert(uuid, path, revnum, incoming)
+
+
+## Put the content of an older revision of filepath in place
+#   The content comes from the revision cache, or is fetched once with
+#   'svn cat' and cached. The working copy stays at its revision, so the file
+#   shows as modified: commit it to continue from this revision, or use
+#   'Return to Latest' to revert to the working copy revision.
+def svnShowRevision(job, filepath, revnum):
+    job.setProgress(0.1, 'Looking up repository')
+    err, repos = getSvnReposInfo(filepath, job=job)
+    if err:
+        myLogger.error(err)
+        return err, None
+    uuid, path = repos
+
+    job.setProgress(0.2, f'Fetching revision {revnum}')
+    err, blob = fetchRevision(job, filepath, uuid, path, revnum)
+    if err:
+        return err, None
+
+    job.checkCancelled()
+    job.setProgress(0.8, f'Restoring revision {revnum}')
+    getRevisionCache().materialize(blob, filepath)
+    stat = os.stat(filepath)
+    shownRevisions[filepath] = (revnum, stat.st_size, stat.st_mtime_ns)
+
+    myLogger.info(f'Restored revision {revnum} of \'{filepath}\' from the revision cache.')
+    return None, f'Showing revision {revnum}. Commit to continue from it, or Return to Latest.'
+
+
+## Report the datablocks changed by each revision on a page of the history
+#   Each revision is compared with the one before it in the file's log. The
+#   comparison runs blenddiff.py in a separate Python process so that large
+#   files do not hold up Blender or the other job threads.
+def svnCompareRevisions(job, filepath, offset):
+    job.setProgress(0.0, 'Looking up repository')
+    err, repos = getSvnReposInfo(filepath, job=job)
+    if err:
+        myLogger.error(err)
+        return err, None
+    uuid, path = repos
+
+    index = svnhistory.getHistoryIndex(cacheDir, uuid)
+    # One extra row gives the predecessor of the oldest revision on the page.
+    revisions = [row[0] for row in index.page(path, offset, svnhistory.PAGE_SIZE+1)]
+    if len(revisions)<1:
+        return 'No history loaded for this file. Fetch it first.', None
+    if len(revisions)<=svnhistory.PAGE_SIZE and not index.coverage(path)[2]:
+        # Older revisions exist but are not indexed; the last one cannot be compared yet.
+        revisions.append(None)
+
+    known = index.changes(path, revisions)
+    pairs = [(revnum, previous) for revnum, previous in zip(revisions[:svnhistory.PAGE_SIZE], revisions[1:] + [0])
+             if revnum is not None and previous is not None and revnum not in known]
+
+    for number, (revnum, previous) in enumerate(pairs):
+        job.setProgress(number/len(pairs), f'Comparing revision {revnum}')
+
+        # Both blobs stay pinned until blenddiff has read them; fetching the
+        # new one could otherwise evict the old one from a full cache.
+        cache = getRevisionCache()
+        pinned = []
+        try:
+            old = '-'
+            if previous:
+                err, old = fetchRevision(job, filepath, uuid, path, previous)
+                if err:
+                    return err, None
+                cache.pin(old)
+                pinned.append(old)
+            err, new = fetchRevision(job, filepath, uuid, path, revnum)
+            if err:
+                return err, None
+            cache.pin(new)
+            pinned.append(new)
+
+            # blenddiff prints only once it is done, which can take a while for large files.
+            returncode, stdout, stderr = job.runProcess([getPythonExecutable(), blenddiff.__file__, old, new], timeout=0)
+        finally:
+            for blob in pinned:
+                cache.unpin(blob)
+        if returncode!=0:
+            stderr = stderr.decode('utf-8', errors='replace')
+            myLogger.error(f'Could not compare revision {revnum}: {stderr}')
+            return f'Could not compare revision {revnum}: {stderr}', None
+        index.storeChanges(path, revnum, json.loads(stdout))
+
+    return None, f'Compared {len(pairs)} revisions.'
+
+
+## Python interpreter for helper processes
+#   Blender 2.91 and later report their bundled Python as sys.executable; older
+#   versions report the Blender binary and name Python in binary_path_python.
+def getPythonExecutable():
+    if bpy is None:
+        return sys.executable
+    return getattr(bpy.app, 'binary_path_python', None) or sys.executable
+
+
+## Discard local changes to filepath, or update it to the latest revision
+#   Step 1) svn revert myfile.txt >> discard local changes and revert the file to its pristine (repository) version.
+#   Step 2) svn update myfile.txt >> update the working copy of the file to the latest version from the repository.
+def svnUpdateLatest(job, filepath):
+    job.setProgress(0.0, 'Checking file status')
+    err, status = getSvnFileStatus(filepath)
+    if err:
+        myLogger.error(err)
+        return err, None
+
+    if status == 'M':
+        job.setProgress(0.2, 'Discarding uncommitted changes')
+        return runSvnFileUpdate(job, generateSvnCommandLine("svn_revert") + [filepath],
+                                f'reverting file with status {status}')
+
+    elif status == ' ':
+        # Asked through the RA session kept open for a server's repository, so
+        # an up to date file costs no new connection.
+        root = getRemoteRoot(filepath)
+        if root is not None:
+            err, latest = remoteSessions.latestRevision(root)
+            if err:
+                myLogger.error(err)
+                return err, None
+            err, revision = getSvnRevision(filepath)
+            if latest is not None and not err and isinstance(revision, int) and revision >= latest:
+                return None, f'Already at the latest revision ({latest}).'
+
+        myLogger.info(f'Attempting to update file to latest revision.')
+        job.setProgress(0.2, 'Updating file to latest revision')
+        #execute update command
+        return runSvnFileUpdate(job, generateSvnCommandLine("svn_update") + [filepath],
+                                'updating file to latest revision')
+
+    else:
+        myLogger.error(f'File has unsupported status \'{status}\'.')
+        return f'File has unsupported status \'{status}\'.', None
+
+
+
+
+###########################
+###  Revision Cache     ###
+###########################
+
+## Whether older revisions are restored from the local revision cache
+#   Otherwise 'svn update -r N' is used as before.
+useRevisionCache = prefs["bln_prefUseRevisionCache"]
+
+revisionCache = None
+revisionCacheBudget = prefs["int_prefRevisionCacheMB"]*1024*1024
+
+## Revision restored into each file by svnShowRevision
+#   filepath -> (revision, size, mtime_ns) of the file as it was written.
+shownRevisions = {}
+
+
+def getRevisionCache():
+    global revisionCache
+    if revisionCache is None:
+        revisionCache = revcache.RevisionCache(str(cacheDir/'revisions'), revisionCacheBudget)
+    return revisionCache
+
+
+def setRevisionCacheEnabled(enabled):
+    global useRevisionCache
+    useRevisionCache = enabled
+
+
+def setRevisionCacheBudget(megabytes):
+    global revisionCacheBudget
+    revisionCacheBudget = megabytes*1024*1024
+    if revisionCache is not None:
+        revisionCache.budget = revisionCacheBudget
+        revisionCache.evict()
+
+
+## Return the revision restored into filepath, or None
+#   None once the file has been saved or replaced since it was restored.
+def getShownRevision(filepath):
+    shown = shownRevisions.get(filepath)
+    if shown is None:
+        return None
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    revnum, size, mtime_ns = shown
+    return revnum if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns) else None
+
+
+
+###########################
+###  Save Points        ###
+###########################
+
+## Whether saves are committed automatically
+useAutoCommit = prefs["bln_prefAutoCommit"]
+
+savePointScheduler = svnsavepoints.SavePointScheduler(
+                        delay=prefs["int_prefAutoCommitDelay"],
+                        min_interval=prefs["int_prefAutoCommitInterval"],
+                        max_pending=prefs["int_prefAutoCommitMaxPending"])
+
+## Outcome of the last automatic save point, shown in SvnStatusPanel
+lastSavePoint = ''
+
+
+## Note each save for the scheduler
+@persistent
+def svnSavePointHandler(*args):
+    filepath = bpy.data.filepath
+    if not useAutoCommit or not filepath:
+        return
+    savePointScheduler.noteSave(filepath)
+    scheduleSavePointTimer()
+
+
+def scheduleSavePointTimer():
+    if bpy.app.timers.is_registered(savePointTimer):
+        bpy.app.timers.unregister(savePointTimer)
+    wait = savePointScheduler.nextCheck()
+    if wait is not None:
+        bpy.app.timers.register(savePointTimer, first_interval=max(wait, 0.1), persistent=True)
+
+
+## bpy.app.timers callback starting save points which are due
+#   Returns the delay until the next check, or None when nothing is pending.
+def savePointTimer():
+    if not useAutoCommit:
+        savePointScheduler.clear()
+        return None
+
+    filepath = savePointScheduler.due()
+    if filepath is not None:
+        if jobEngine.isBusy():
+            # Another svn operation is running; do not compete with it.
+            return 1.0
+        savePointScheduler.started(filepath)
+        submitSvnJob('save_point', svnSavePoint, filepath, on_done=savePointDone)
+
+    return savePointScheduler.nextCheck()
+
+
+def savePointDone(job):
+    global lastSavePoint
+    filepath = job.args[0]
+    err, message = job.result if job.result is not None else (job.error, None)
+    savePointScheduler.finished(filepath, not err)
+    lastSavePoint = f'{datetime.now():%H:%M} {"failed" if err else message.strip()[:40]}'
+    if err:
+        myLogger.error(f'Save point of \'{filepath}\' failed: {err}')
+    scheduleSavePointTimer()
+
+
+def setAutoCommitEnabled(enabled):
+    global useAutoCommit
+    useAutoCommit = enabled
+    if not enabled:
+        savePointScheduler.clear()
+
+
+
+###########################
+###  History Browser    ###
+###########################
+
+## Repository (uuid, path) per file, filled by wc.db lookups and history jobs
+historyRepos = {}
+
+## Page of history currently shown in SvnHistoryPanel
+historyView = svnhistory.HistoryView()
+
+
+## Return historyView showing filepath, or None if its repository is unknown
+#   Cheap enough for draw(): only wc.db and the local index are read.
+def getHistoryView(filepath):
+    if not filepath:
+        return None
+    if historyView.filepath == filepath and historyView.uuid is not None:
+        return historyView
+
+    repos = historyRepos.get(filepath)
+    if repos is None:
+        err, repos = getSvnReposInfo(filepath, use_svn=False)
+        if err:
+            return None
+        historyRepos[filepath] = repos
+
+    historyView.filepath = filepath
+    historyView.uuid, historyView.path = repos
+    historyView.load(svnhistory.getHistoryIndex(cacheDir, historyView.uuid), 0)
+    return historyView
+
+
+## Thumbnails of the revisions shown in SvnHistoryPanel
+thumbnailCache = svnthumbs.ThumbnailCache(str(cacheDir/'thumbnails'))
+
+## bpy.utils.previews collection holding the loaded thumbnails (set in register())
+thumbnailPreviews = None
+
+
+## Return the icon id of a revision's thumbnail, or 0 if it is not cached
+def getThumbnailIcon(uuid, path, revnum):
+    if thumbnailPreviews is None:
+        return 0
+    key = f'{uuid}{path}@{revnum}'
+    preview = thumbnailPreviews.get(key)
+    if preview is None:
+        image = thumbnailCache.imagePath(uuid, path, revnum)
+        if not os.path.isfile(image):
+            return 0
+        preview = thumbnailPreviews.load(key, image, 'IMAGE')
+    return preview.icon_id
+
+
+## Re-read historyView from the index, optionally moving to another offset
+def reloadHistoryView(filepath, offset=None):
+    historyView.filepath = None
+    view = getHistoryView(filepath)
+    if view is not None and offset is not None:
+        view.load(svnhistory.getHistoryIndex(cacheDir, view.uuid), offset)
+    return view
+
+
+
+###########################
+###  Project Batch      ###
+###########################
+
+## .blend files found by the last project-wide job, shown in SvnProjectPanel
+#   Replaced whole by each job, so the panel never sees a half-built state.
+projectState = None
+
+## Project folder from the preferences; empty means the open file's working copy
+projectDirectory = prefs["str_prefProjectDir"]
+
+
+def setProjectDirectory(directory):
+    global projectDirectory
+    projectDirectory = directory
+
+
+## Folder the project-wide operators work on
+def getProjectDirectory(filepath):
+    if projectDirectory:
+        return os.path.abspath(os.path.expanduser(projectDirectory))
+    try:
+        wc_root = wcdb.findWcRoot(filepath)
+    except wcdb.SchemaMismatch:
+        wc_root = None
+    return wc_root or os.path.dirname(filepath)
+
+
+## Read the .blend files under target with one recursive 'svn status -v'
+#   Returns (err, svnbatch.WcScan). Everything else is dropped as it streams.
+def scanWorkingCopy(job, wc_root, target):
+    collector = svnxml.RecordCollector("entry", svnxml.buildStatusEntry, svnbatch.keepForScan)
+    returncode, stderr = job.streamProcess(generateSvnCommandLine("svn_status") + [target], collector)
+    entries = collector.close()
+
+    if returncode!=0 and len(entries)<1:
+        stderr = stderr.decode('utf-8', errors='replace')
+        myLogger.error(f'Error reading status of \'{target}\': {stderr}')
+        return stderr if len(stderr)>1 else f'Command returned code: {returncode}', None
+    return None, svnbatch.WcScan(wc_root, target, entries)
+
+
+## Run task(job, scan) on every working copy under directory, in parallel
+#   task returns (err, message). The scans, with the changes the tasks record
+#   on state, become the new projectState.
+def runProjectBatch(job, directory, task):
+    global projectState
+
+    job.setProgress(0.0, 'Looking for working copies')
+    targets = svnbatch.findWorkingCopies(directory)
+    if len(targets)<1:
+        return f'No working copies found in \'{directory}\'.', None
+
+    state = svnbatch.ProjectState(directory)
+
+    def run(wc_root, target):
+        err, scan = scanWorkingCopy(job, wc_root, target)
+        if err:
+            return err, None, []
+        state.add(scan)
+        err, message = task(job, scan, state)
+        return err, message, scan.nested
+
+    results = svnbatch.runParallel(job, targets, run)
+    state.errors = {wc_root: err for wc_root, (err, message) in results.items() if err}
+    projectState = state
+
+    for wc_root, err in state.errors.items():
+        myLogger.error(f'Project batch failed in \'{wc_root}\': {err}')
+    if state.errors:
+        return f'{len(state.errors)} of {len(results)} working copies failed: {next(iter(state.errors.values())).strip()}', None
+    return None, results
+
+
+## Status of every versioned .blend file under directory
+def svnBatchStatus(job, directory):
+    err, results = runProjectBatch(job, directory, lambda job, scan, state: (None, None))
+    if err:
+        return err, None
+    return None, f'{len(projectState.files)} .blend files in {len(results)} working copies, {projectState.count(svnbatch.COMMIT_LETTERS)} to commit.'
+
+
+## Commit every modified .blend file under directory, one change set per working copy
+def svnBatchCommit(job, directory):
+
+    def commit(job, scan, state):
+        paths = scan.withLetters(svnbatch.COMMIT_LETTERS)
+        if len(paths)<1:
+            return None, 0
+        # Folders added with the files go into the same commit (E200009).
+        parents = scan.addedParents(paths)
+        returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_commit_changeset") + parents + paths,
+                                                    cleanup=getCleanupCommand(scan.wc_root))
+        if returncode!=0:
+            return f'Error committing change set: {stderr.decode("utf-8", errors="replace")}', None
+        myLogger.info(stdout.decode('utf-8', errors='replace').replace('\n',' '))
+        state.mark(paths, ' ')
+        return None, len(paths)
+
+    err, results = runProjectBatch(job, directory, commit)
+    if err:
+        return err, None
+    committed = sum(count for err, count in results.values())
+    if committed<1:
+        return "None of the files have oustanding changes to commit.", None
+    return None, f'Committed {committed} files in {sum(1 for err, count in results.values() if count)} working copies.'
+
+
+## Revert every versioned .blend file under directory to revision revnum
+#   Uncommitted changes are discarded first. Each working copy is updated
+#   with one 'svn update -r N', rather than through the revision cache.
+def svnBatchRevert(job, directory, revnum):
+
+    def revert(job, scan, state):
+        modified = scan.withLetters(['M'])
+        paths = scan.withLetters([' ', 'M'])
+        if len(paths)<1:
+            return None, 0
+        cleanup = getCleanupCommand(scan.wc_root)
+        if modified:
+            returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_revert") + modified, cleanup=cleanup)
+            if returncode!=0:
+                return f'Error reverting files: {stderr.decode("utf-8", errors="replace")}', None
+            state.touched.update(modified)
+        returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_update_previous") + [str(revnum)] + paths,
+                                                    cleanup=cleanup)
+        if returncode!=0:
+            return f'Error updating files to revision {revnum}: {stderr.decode("utf-8", errors="replace")}', None
+        state.touched.update(paths)
+        state.mark(paths, ' ', revnum)
+        return None, len(paths)
+
+    err, results = runProjectBatch(job, directory, revert)
+    if err:
+        return err, None
+    return None, f'Reverted {sum(count for err, count in results.values())} files to revision {revnum}.'
+
+
+
+###########################
+###  Remote Server      ###
+###########################
+
+## Parent URL new projects are imported into in remote mode, e.g. svn://host/projects
+serverUrl = prefs["str_prefServerURL"].rstrip('/')
+
+## RA sessions of remote repositories (see svnremote.py), opened on first use
+#   Stays None when the svn bindings are not available.
+remoteSessions = None
+remoteSessionsTried = False
+
+
+def setServerMode(mode, url):
+    global server_mode_in_use, serverUrl
+    server_mode_in_use = mode if mode in server_modes else server_modes[0]
+    serverUrl = url.strip().rstrip('/')
+    myLogger.info(f'Server mode \'{server_mode_in_use}\', server URL \'{serverUrl}\'.')
+
+
+## Repository root URL of the working copy of filepath, if it has RA sessions
+#   None for file:// repositories and when the bindings are not available;
+#   svn is run for those.
+def getRemoteRoot(filepath):
+    global remoteSessions, remoteSessionsTried
+    try:
+        db = wcdb.getWcDbFor(filepath)
+        info = db.reposInfo(filepath) if db is not None else None
+    except wcdb.SchemaMismatch:
+        info = None
+    if info is None or not svnremote.isRemoteUrl(info[0]):
+        return None
+
+    if not remoteSessionsTried:
+        remoteSessionsTried = True
+        remoteSessions = svnremote.createSessionPool()
+    return info[0] if remoteSessions is not None else None
+
+
+## The server to log in to for filepath
+#   Its working copy's repository if that is remote, else the server URL.
+def getLoginUrl(filepath):
+    try:
+        db = wcdb.getWcDbFor(filepath) if filepath else None
+        info = db.reposInfo(filepath) if db is not None else None
+    except wcdb.SchemaMismatch:
+        info = None
+    if info is not None and svnremote.isRemoteUrl(info[0]):
+        return info[0]
+    return serverUrl if svnremote.isRemoteUrl(serverUrl) else None
+
+
+## Log in to the server at url as username
+#   svn stores the credentials as it is configured (see svnremote.py). A
+#   second command without them checks that it did.
+def svnServerLogin(job, url, username, password):
+    job.setProgress(0.0, f'Connecting to {url}')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_info") + svnremote.loginOptions(username) + [url],
+                                                input=password.encode('utf-8'))
+    if returncode!=0:
+        stderr = stderr.decode('utf-8', errors='replace')
+        myLogger.error(f'Could not log in to \'{url}\' as \'{username}\': {stderr}')
+        return svnremote.explainError(stderr), None
+
+    job.setProgress(0.5, 'Checking the stored credentials')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_info") + [url])
+    if returncode!=0:
+        myLogger.error(f'svn did not store the credentials for \'{url}\': {stderr.decode("utf-8", errors="replace")}')
+        return ('The server accepted the password, but svn could not store it. '
+                'Set up a keyring for svn, or allow it to store passwords (store-plaintext-passwords in the svn \'servers\' file).'), None
+
+    # Sessions opened before keep the credentials they were opened with.
+    if remoteSessions is not None:
+        remoteSessions.closeAll()
+    myLogger.info(f'Logged in to \'{url}\' as \'{username}\'.')
+    return None, f'Logged in to {url} as {username}.'
+
+
+
+###########################
+###  Locks              ###
+###########################
+
+## Lock state of the files shown in the UI (see svnlocks.py)
+#   draw() and the commit operators read it; lockRefreshTimer keeps it fresh.
+lockCache = svnlocks.LockCache(ttl=prefs["int_prefLockCacheTTL"])
+
+## Runs the lock refreshes and the capability probe, so that they never keep
+#  jobEngine busy. Operators wait for jobEngine; these only update caches.
+lockEngine = svnjobs.JobEngine(max_workers=1)
+
+
+## Apply the svn timeout to every job engine
+#   A lock refresh runs 'svn status -u', which can hang on the network too.
+def setProcessTimeout(seconds):
+    jobEngine.process_timeout = seconds
+    lockEngine.process_timeout = seconds
+
+## Whether .blend files get svn:needs-lock when they are added
+useLocking = prefs["bln_prefNeedsLock"]
+
+
+def setLockingEnabled(enabled):
+    global useLocking
+    useLocking = enabled
+
+
+## Command setting svn:needs-lock on the .blend files among paths, or None
+#   Run right after 'svn add'. Once committed, the files are read-only until
+#   they are locked.
+def getNeedsLockCommand(paths):
+    blends = [path for path in paths if svnbatch.isBlend(path)]
+    if not useLocking or len(blends)<1:
+        return None
+    return generateSvnCommandLine("svn_propset_needs_lock") + blends
+
+
+## Why committing filepath now would be refused by the server, or None
+#   Answered from lockCache, so it may be up to its TTL old.
+def getCommitBlocker(filepath):
+    state = lockCache.peek(filepath)
+    return state.commitBlocker() if state is not None else None
+
+
+## Read the lock state of filepath from its working copy and the server
+#   Runs on lockEngine and stores the result in lockCache.
+def svnRefreshLock(job, filepath):
+    state = svnlocks.LockState(filepath)
+    try:
+        db = wcdb.getWcDbFor(filepath)
+        state.needs_lock = db is not None and b'svn:needs-lock' in db.properties(filepath)
+    except wcdb.SchemaMismatch as error:
+        myLogger.debug('Could not read the properties of %s from wc.db: %s', filepath, error)
+
+    collector = svnxml.RecordCollector("entry", svnxml.buildStatusEntry)
+    returncode, stderr = job.streamProcess(generateSvnCommandLine("svn_status_lock") + [filepath], collector)
+    entries = collector.close()
+
+    if returncode!=0 and len(entries)<1:
+        stderr = stderr.decode('utf-8', errors='replace')
+        myLogger.info(f'Could not read the lock state of \'{filepath}\': {stderr}')
+        state.error = svnremote.explainError(stderr) if len(stderr)>1 else f'Command returned code: {returncode}'
+    elif len(entries)>0:
+        entry = entries[0]
+        state.token = entry.lock.token if entry.lock is not None else None
+        if entry.repos_lock is not None:
+            state.repos_token = entry.repos_lock.token
+            state.owner       = entry.repos_lock.owner
+            state.comment     = entry.repos_lock.comment
+            state.created     = entry.repos_lock.created
+        state.out_of_date = entry.repos_item not in (None, 'none')
+
+    lockCache.put(state)
+    myLogger.debug('Lock state of %s: %s.', filepath, state.error or state.kind)
+    return state.error, state.label
+
+
+## bpy.app.timers callback keeping the lock state of the open file fresh
+#   Only the caches are read here; the server is asked by a job on lockEngine.
+def lockRefreshTimer():
+    lockEngine.pump()
+    filepath = bpy.data.filepath
+    if filepath and not lockEngine.isBusy() and lockCache.isStale(filepath):
+        state = stateCache.peek(filepath)
+        if state is not None and state.has_working_set and state.status not in ('?', 'I', None):
+            lockEngine.submit('lock_refresh', svnRefreshLock, filepath)
+    return svnlocks.LOCK_POLL_INTERVAL
+
+
+## Lock filepath in the repository
+#   With steal set the lock is taken from whoever holds it (--force).
+def svnLockFile(job, filepath, steal=False):
+    job.setProgress(0.0, f'{"Taking" if steal else "Requesting"} the lock on {Path(filepath).name}')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_lock") + (["--force"] if steal else []) + [filepath])
+
+    # A lock which could not be obtained is only a warning (W160035), then E200009.
+    stderr = stderr.decode('utf-8', errors='replace')
+    if returncode!=0 or len(svnremote.errorCodes(stderr))>0:
+        myLogger.error(f'Could not lock \'{filepath}\': {stderr}')
+        return svnremote.explainError(stderr, svnlocks.LOCK_HINTS) if len(stderr)>1 else f'Command returned code: {returncode}', None
+
+    result = stdout.decode('utf-8', errors='replace')
+    myLogger.info(result.replace('\n',' '))
+    return None, result.replace('\n',' ')
+
+
+## Release the lock this working copy holds on filepath
+def svnUnlockFile(job, filepath):
+    job.setProgress(0.0, f'Releasing the lock on {Path(filepath).name}')
+    returncode, stdout, stderr = job.runProcess(generateSvnCommandLine("svn_unlock") + [filepath])
+
+    stderr = stderr.decode('utf-8', errors='replace')
+    if returncode!=0 or len(svnremote.errorCodes(stderr))>0:
+        myLogger.error(f'Could not unlock \'{filepath}\': {stderr}')
+        return svnremote.explainError(stderr, svnlocks.LOCK_HINTS) if len(stderr)>1 else f'Command returned code: {returncode}', None
+
+    result = stdout.decode('utf-8', errors='replace')
+    myLogger.info(result.replace('\n',' '))
+    return None, result.replace('\n',' ')
 
 
 
@@ -395,9 +2102,9 @@ except FileNotFoundError as error:
 # o CREATE REPO
 # √ ADD
 # √ COMMIT
-#   VERSION HISTORY -> Move to info panel w/dismiss - svn log [-q] filename
+# √ VERSION HISTORY -> SVN History panel, svn log --xml paged into a local index
 # √ REVERT VERSION PREVIOUS
-#   REVERT VERSION N
+# √ REVERT VERSION N -> svnRevertToRevision(), from the command line (svncli.py)
 #   BRANCH (copy)
 #   MERGE BRANCH
 #   DELETE BRANCH
@@ -406,12 +2113,16 @@ except FileNotFoundError as error:
 ## Create Repo Operator
 #   Create a new repo of the current working directory.
 #   If necessary, create the repo root folder too.
+#   The svn work runs as a background job; see svnCreateAndImport().
 #   https://subversion.apache.org/quick-start#setting-up-a-local-repo
 #   https://docs.blender.org/manual/en/2.93/advanced/blender_directory_layout.html
-class CreateAndImportOperator(bpy.types.Operator):
+class CreateAndImportOperator(svnjobs.ModalJobMixin, Operator):
     bl_idname = "scop.create_import"
     bl_label  = "Create Repo & Add"
 
+    ## Import the whole folder of the file rather than just the file
+    bulk = False
+
 
     @classmethod
     def poll(self, context):
@@ -419,8 +2130,8 @@ class CreateAndImportOperator(bpy.types.Operator):
         self._filename = Path(self._filepath).stem
         self._working_dir = Path(self._filepath).parent
 
-        self._hasWorkingSet = getHasWorkingSet(self._working_dir)
-        return not self._hasWorkingSet
+        self._hasWorkingSet = getCachedFileState(self._filepath).has_working_set
+        return not self._hasWorkingSet and not jobEngine.isBusy()
 
 
     def execute(self, context):
@@ -434,207 +2145,52 @@ class CreateAndImportOperator(bpy.types.Operator):
 
         # Get paths for current file
         filepath = bpy.data.filepath
-        filename = Path(filepath).name
         working_dir = Path(filepath).parent
-        
-        # Check we are not already in a working set
-        # Confirm whether there is a working set available.
-        process = subprocess.Popen(generateSvnCommandLine("svn_info") + [working_dir],
-                     stdout=subprocess.PIPE, 
-                     stderr=subprocess.PIPE)
-        stdout, stderr = process.communicate()
-        if (len(stderr)<1) & (len(re.findall("Working Copy Root Path:", stdout.decode('utf-8')))>0):
-            self.report({'ERROR'}, "A working copy already exists for this directory. You can add or commit this file to the existing working copy.")
-            return {'FINISHED'}
-        
 
-        # Above confirms that file & working set status are OK to continue
         preferences = context.preferences
         addon_prefs = preferences.addons[__name__].preferences
 
         # Get locations via prefs
-        repoRoot = prefs['str_prefSVNRepoHome'] if addon_prefs.useDefaultRepoRoot else addon_prefs.repoRoot
-        repoRoot = Path(repoRoot)
-        if not repoRoot.is_absolute():
-            repoRoot = repoRoot.expanduser()
-            if not repoRoot.is_absolute():
-                try:
-                    repoRoot = working_dir.joinpath(repoRoot).resolve()
-                except ValueError as error:
-                    myLogger.error(f'Could not resolve repoRoot {repoRoot} against working_dir {working_dir}.')
-                    self.report({'ERROR'},'Could not resolve repsitory root folder.')
-
-                    return {'FINISHED'}
+        if server_mode_in_use == 'remote' and not svnremote.isRemoteUrl(serverUrl):
+            self.report({'ERROR'}, "Set a server URL (svn://, http://, ...) in the add-on preferences first.")
+            return {'FINISHED'}
+        err, repoRoot = resolveRepoRoot(serverUrl if server_mode_in_use == 'remote' else
+                                        prefs['str_prefSVNRepoHome'] if addon_prefs.useDefaultRepoRoot else addon_prefs.repoRoot,
+                                        working_dir)
+        if err:
+            self.report({'ERROR'}, err)
+            return {'FINISHED'}
 
         repoName = generateRepoName(filepath) if addon_prefs.useDefaultRepoName else addon_prefs.repoName
 
+        # Referenced files are collected here, as bpy is only usable on the main thread.
+        needed = getChangeSetPaths(filepath, working_dir) if addon_prefs.checkoutDepth != 'infinity' else []
 
-        #Start to create necessary paths
-        myLogger.info(f'Start creating repository at Root: \'{repoRoot}\', Name: \'{repoName}\'.')
-        # On Unix:
-        if platform.system() == "Darwin": # or "Linux"
-
-            # Check whether the repo home exists. If not, create it.
-            if not repoRoot.exists():
-                myLogger.info(f'Repositories home {repoRoot.as_posix()} not found. Attempting to create it.')
-                try:
-                    Path.mkdir(repoRoot, parents=True)
-                    myLogger.info(f'Successfully created repositories home.')
-                except OSError as error:
-                    myLogger.error(error)
-                    self.report({'ERROR'}, f'Error creating repositories home: {error}')
+        job = submitSvnJob('create_import', svnCreateAndImport, filepath, repoRoot, repoName, self.bulk,
+                           addon_prefs.repoProfile, addon_prefs.checkoutDepth, needed)
+        return self.startJob(context, job)
 
-                    return  {'FINISHED'}
-            else:
-                myLogger.info(f'Existing repo home was found.')
 
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
 
-            ## Check whether the repo already exists
-            #   If not create it
-            #   If so, error.
-            myLogger.info(f'Checking for repo \'{repoName}\'')
 
-            repoPath = Path(repoRoot,repoName)
-            if repoPath.exists():
-                myLogger.error(f'Repository {repoPath.as_posix()} already exists. Aborting.')
-                self.report({'ERROR'},f'Indicated repository {repoPath.as_posix()} already exists. Please choose another name or move this file to the related working set.')
-            
-                return {'FINISHED'}
+## Create Repo from Folder Operator
+#   Create a new repo and import everything in the current file's folder,
+#   e.g. to seed it from an existing project with many .blend files.
+#   Runs the same job as CreateAndImportOperator with bulk set.
+class CreateAndImportFolderOperator(CreateAndImportOperator):
+    bl_idname = "scop.create_import_folder"
+    bl_label  = "Create Repo & Import Folder"
 
-            # Create a new repository withing the repoRoot
-            myLogger.info(f'Attempting to create repository via SVNadmin.')
-            try:
-                process = subprocess.Popen(generateSvnCommandLine('svn_admin_create') + [repoPath.as_posix()],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-
-                if len(stderr)>1:
-                    error = stderr.decode("utf-8")
-                    myLogger.error(f'Error creating respository (svn_admin_create): {error}')
-                    self.report({'ERROR'},f'Error creating repository (svn_admin_create): {error}')
-
-                    return {'FINISHED'}   
-                myLogger.info('Successfully created repository with svnadmin.')
-
-
-                # Create a recommended project layout in the new repository:
-                myLogger.info('Creating repository structure with svn...')
-                process = subprocess.Popen(generateSvnCommandLine('svn_mkdir_repo') + [Path(repoPath,"trunk").as_uri()] + [Path(repoPath,"branches").as_uri()] + [Path(repoPath,"tags").as_uri()],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-                
-                if len(stderr)>1:
-                    error = stderr.decode("utf-8")
-                    myLogger.error(f'Error creating respository (svn_mkdir_repo): {error}')
-                    self.report({'ERROR'},f'Error creating repository (svn_mkdir_repo): {error}')
-
-                    return {'FINISHED'} 
-                myLogger.info('Successfully created repository structure')
-
-
-                # Convert the current directory into a working copy of the trunk/ in the repository:
-                #  svn checkout file://$HOME/.svnrepos/MyRepo/trunk ./
-                process = subprocess.Popen(generateSvnCommandLine('svn_checkout') + [Path(repoPath,"trunk").as_uri()] + [working_dir.as_posix()],
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-
-                if len(stderr)>1:
-                    error = stderr.decode("utf-8")
-                    myLogger.error(f'Error checking out new respository: {error}')
-                    self.report({'ERROR'},f'Error checking out new respository: {error}')
-
-                    return {'FINISHED'}
-                myLogger.info('Successfully checked out new repository.')
-
-
-                # Schedule your project's files to be added to the repository:
-                #  svn add --force ./
-                process = subprocess.Popen(generateSvnCommandLine('svn_add_single') + [filepath],
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-
-                if len(stderr)>1:
-                    error = stderr.decode("utf-8")
-                    myLogger.error(f'Error adding file to repository: {error}')
-                    self.report({'ERROR'},f'Error adding file to repository: {error}')
-
-                    return {'FINISHED'}
-                myLogger.info('Successfully added file to new repository.')
-
-
-                # Commit the project's files:
-                #  svn commit -m "Initial import."
-                process = subprocess.Popen(generateSvnCommandLine('svn_commit_single') + [filepath],
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-
-                if len(stderr)>1:
-                    error = stderr.decode("utf-8")
-                    myLogger.error(f'Error committing file to repository: {error}')
-                    self.report({'ERROR'},f'Error committing file to repository: {error}')
-
-                    return {'FINISHED'}
-                myLogger.info('Successfully committed file to new repository.')
-                
-                # Update your working copy:
-                #  svn update
-                process = subprocess.Popen(generateSvnCommandLine('svn_update') + [working_dir.as_posix()],
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-
-                if len(stderr)>1:
-                    error = stderr.decode("utf-8")
-                    myLogger.error(f'Error updating working copy: {error}')
-                    self.report({'ERROR'},f'Error updating working copy: {error}')
-
-                    return {'FINISHED'}
-                myLogger.info('Successfully updated working copy.')
-
-
-                myLogger.info('Completed importing {filename} to repository.')
-
-            except OSError as error:
-                myLogger.error(error)
-                self.report({'ERROR'},f'Error creating repository (OSError): {error}')
-
-                return {'FINISHED'}
-
-
-        #if platform.system() == "Windows":
-        #On Windows:
-            # Create a parent directory C:\Repositories where you will place your SVN repositories:
-            #  mkdir C:\Repositories
-            # Create a new repository MyRepo under C:\Repositories:
-            #  svnadmin create C:\Repositories\MyRepo
-            # Create a recommended project layout in the new repository:
-            #  svn mkdir -m "Create directory structure." ^
-            #  file:///C:/Repositories/MyRepo/trunk ^
-            #  file:///C:/Repositories/MyRepo/branches ^
-            #  file:///C:/Repositories/MyRepo/tags 
-            # Change directory to C:\MyProject where your unversioned project is located:
-            #  cd C:\MyProject
-            # Convert the current directory into a working copy of the trunk/ in the repository:
-            #  svn checkout file:///C:/Repositories/MyRepo/trunk .
-            # Schedule your project's files to be added to the repository:
-            #  svn add --force ./
-            # Commit the project's files:
-            #  svn commit -m "Initial import."
-            # Update your working copy:
-            #  svn update
-        
-        self.report({'INFO'}, f'Created repository at {repoPath} and comitted {filename}.')
-        return {'FINISHED'}
+    bulk = True
         
 
+
 ## ADD Operator
 ## ADD current file to working set
-class AddOperator(bpy.types.Operator):
+#   The svn work runs as a background job; see svnAddFile().
+class AddOperator(svnjobs.ModalJobMixin, Operator):
     bl_idname = "scop.add"
     bl_label  = "Add"
 
@@ -645,7 +2201,7 @@ class AddOperator(bpy.types.Operator):
         self._filename = Path(self._filepath).stem
         self._working_dir = Path(self._filepath).parent
 
-        return getHasWorkingSet(self._working_dir)
+        return getCachedFileState(self._filepath).has_working_set and not jobEngine.isBusy()
     
 
     def execute(self, context):
@@ -657,41 +2213,18 @@ class AddOperator(bpy.types.Operator):
 
         myLogger.info(f'Attempting to add file \'{self._filepath}\'.')
 
-        err, status = getSvnFileStatus(self._filepath)
-        if not err:
-            if status in [' ','A','C','M']:
-                self.report({'ERROR'},"File is already added to the working set.")
-            elif status == 'I':
-                self.report({'ERROR'},"File is currently ignored. Please remove it from the .svnignore file.")
-            elif status in ['?']:
-                process = subprocess.Popen(generateSvnCommandLine("svn_add_single") + [self._filepath],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-                if len(stdout)>0:
-                    result = stdout.decode('utf-8')
-                    myLogger.info(result.replace('\n',' '))
-                    myLogger.debug(f'Successfully committed. Return code: \'{process.returncode}\'.')
-                    self.report({'INFO'},result.replace('\n',' '))
-                elif len(stderr)>0:
-                    result = stderr.decode('utf-8')
-                    myLogger.error(result)
-                    self.report({'ERROR'},result)
-                else:
-                    myLogger.error(f'Error when committing file: {process.returncode}')
-                    self.report({'ERROR'},f'Error when committing file: {process.returncode}')
-            else:
-                myLogger.error(f'File has unsupported status \'{status}\'.')
-                self.report({'ERROR'},f'File has unsupported status \'{status}\'.')
-        else:
-            myLogger.error(err)
-            self.report({'ERROR'},err)
+        job = submitSvnJob('add', svnAddFile, self._filepath)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
 
-        return {'FINISHED'}
 
 ## Commit Operator
 ## Commit current file
-class CommitOperator(bpy.types.Operator):
+#   The svn work runs as a background job; see svnCommitFile().
+class CommitOperator(svnjobs.ModalJobMixin, Operator):
     bl_idname = "scop.commit"
     bl_label  = "Commit"
 
@@ -701,8 +2234,8 @@ class CommitOperator(bpy.types.Operator):
         self._filename = Path(self._filepath).stem
         self._working_dir = Path(self._filepath).parent
 
-        self._hasWorkingSet = getHasWorkingSet(self._working_dir)
-        return self._hasWorkingSet
+        self._hasWorkingSet = getCachedFileState(self._filepath).has_working_set
+        return self._hasWorkingSet and not jobEngine.isBusy()
 
 
     def execute(self, context):
@@ -717,84 +2250,30 @@ class CommitOperator(bpy.types.Operator):
             self.report({'ERROR'}, "This file has unsaved changes. Please save before committing.")
             return {'FINISHED'}
 
+        # Refused by the server anyway; do not upload the file for nothing.
+        blocker = getCommitBlocker(self._filepath)
+        if blocker:
+            self.report({'ERROR'}, blocker)
+            return {'FINISHED'}
+
         myLogger.info(f'Attempting to commit file \'{self._filepath}\'.')
 
-        # Confirm file status
-        # Acceptable for commit: 'A','M'
-        err, status = getSvnFileStatus(self._filepath)
-
-        if not err:
-            if status == ' ':
-                self.report({'ERROR'},"File has no oustanding changes to commit.")
-            elif status == '?':
-                self.report({'ERROR'},"File has not been added to the working set. Please add it before committing.")
-            elif status == 'I':
-                self.report({'ERROR'},"File is currently ignored. Please remove it from the .svnignore file.")
-            elif status in ['M','A']:
-                ## Try to commit single file individually
-                process = subprocess.Popen(generateSvnCommandLine("svn_commit_single") + [self._filepath],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-
-                #handle planned error cases
-                if process.returncode!=0:
-                    ## If the file was added from a sub-folder of the working copy
-                    #  which was created after the last commit, then we need to 
-                    #  include those parent folders of that file  in the next commit.
-                    if len( re.findall("E200009", stderr.decode('utf-8')) )>0:
-                        myLogger.debug("attempting to commit with parents.")
-                        err1, wc_root = getSVNWCRoot(self._filepath)
-                        if not err1:
-                            err2, svn_status = getSvnStatus(wc_root)
-
-                            if not(err2):
-                                commitlist = getCommitListWithParents(self._filepath,wc_root,svn_status)
-
-                                process = subprocess.Popen(generateSvnCommandLine("svn_commit_all") + commitlist,
-                                            stdout=subprocess.PIPE, 
-                                            stderr=subprocess.PIPE)
-                                stdout, stderr = process.communicate()
-
-                                if len(stdout)>0:
-                                    result = stdout.decode('utf-8')
-                                    myLogger.info(result.replace('\n',' '))
-                                    myLogger.debug(f'Successfully committed. Return code: \'{process.returncode}\'.')
-                                    self.report({'INFO'},result.replace('\n',' '))
-                                else:
-                                    myLogger.error(f'Error when committing file with parents \'{stderr}\'.')
-                                    myLogger.error(f'Error when committing commitlist \'{commitlist}\'.')
-                                    self.report({'ERROR'},f'Error committing file \'{stderr}\'.')
-                            else:
-                                myLogger.error([err1])
-                                self.report({'ERROR'},[err1])
-                    else:
-                        myLogger.error(f'Error when committing file: {stderr}')
-                        self.report({'ERROR'},f'Error when committing file: {stderr}')
-                else:
-                    result = stdout.decode('utf-8')
-                    myLogger.info(result.replace('\n',' '))
-                    myLogger.info(f'Successfully committed.')
-                    self.report({'INFO'},result.replace('\n',' '))
-            else:
-                myLogger.error(f'File has unsupported status \'{status}\'.')
-                self.report({'ERROR'},f'File has unsupported status \'{status}\'.')
-        else:           
-            myLogger.error('Aborting: File has error staus.')
-            myLogger.error(err)
-            self.report({'ERROR'},err)
+        job = submitSvnJob('commit', svnCommitFile, self._filepath)
+        return self.startJob(context, job)
 
-        return {'FINISHED'}
 
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
 
-## Revert Operator
-## Revert the file in the current working copy
-#  to that of the (todo: a) previous revision.
-#  I.e. undo changes for THIS file.
-class RevertPreviousOperator(bpy.types.Operator):
-    bl_idname = "scop.revert_previous"
-    bl_label  = "< Go Back One (Revert)"
 
+## Change Set Commit Operator
+## Commit the current file together with the files it references
+#   Textures, linked libraries, fonts, sounds etc. which live inside the
+#   working copy are added if needed and committed in one revision.
+#   The svn work runs as a background job; see svnCommitChangeSet().
+class CommitChangeSetOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.commit_changeset"
+    bl_label  = "Commit with linked files"
 
     @classmethod
     def poll(self, context):
@@ -802,95 +2281,293 @@ class RevertPreviousOperator(bpy.types.Operator):
         self._filename = Path(self._filepath).stem
         self._working_dir = Path(self._filepath).parent
 
-        self._hasWorkingSet = getHasWorkingSet(self._working_dir)
-        return self._hasWorkingSet
-    
+        self._hasWorkingSet = getCachedFileState(self._filepath).has_working_set
+        return self._hasWorkingSet and not jobEngine.isBusy()
 
-    def invoke(self, context, event):
-        wm = context.window_manager
-        return wm.invoke_confirm(self, event)
-    
 
     def execute(self, context):
 
-        myLogger.info(f'Attempting to revert file \'{self._filepath}\'.')
+        if not bpy.data.is_saved:
+            self.report({'ERROR'}, "This file has not been saved to your drive. Please save it before committing.")
+            return {'FINISHED'}
+        if bpy.data.is_dirty:
+            self.report({'ERROR'}, "This file has unsaved changes. Please save before committing.")
+            return {'FINISHED'}
 
-        # Confirm file status
-        # Acceptable for commit: ' ','M'
-        #  if 'M' -> Uncomitted changes, so:
-        #            svn revert filename
-        #  if ' ' -> Changes were previously comitted, so:
-        #            svn update -r N filename
-        #           old:
-        #              svn export --force -r PREV filename filename 
-        #           or svn merge -r HEAD:123 .
-        #         then svn commit -m "Reverted to revision 123"
-        err, status = getSvnFileStatus(self._filepath)
-        if not err:
-            if status == 'M':
-                process = subprocess.Popen(generateSvnCommandLine("svn_revert") + [self._filepath],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-                if len(stdout)>0:
-                    result = stdout.decode('utf-8')
-                    myLogger.info(result.replace('\n',' '))
-                    myLogger.debug(f'Successfully reverted. Return code: \'{process.returncode}\'.')
-                    self.report({'INFO'},result.replace('\n',' '))
-
-                    bpy.ops.wm.revert_mainfile()
-
-                elif len(stderr)>0:
-                    result = stderr.decode('utf-8')
-                    myLogger.error(result)
-                    self.report({'ERROR'},result)
-                else:
-                    myLogger.error(f'Error when reverting file with status {status}: {process.returncode}')
-                    self.report({'ERROR'},f'Error when reverting file with status {status}: {process.returncode}')
-            elif status == ' ':
-                #Get and adjust revision number
-                err, revnum = getSvnRevision(self._filepath)
-                if revnum > 2:
-                    revnum -= 1
-
-                    myLogger.info(f'Attempting to update file to revision {revnum}.')
-                    #execute update command
-                    process = subprocess.Popen(generateSvnCommandLine("svn_update_previous") + [str(revnum)] + [self._filepath],
-                                stdout=subprocess.PIPE, 
-                                stderr=subprocess.PIPE)
-                    stdout, stderr = process.communicate()
-                    if len(stdout)>0:
-                        result = stdout.decode('utf-8')
-                        myLogger.info(result.replace('\n',' '))
-                        myLogger.debug(f'Successfully reverted. Return code: \'{process.returncode}\'.')
-                        self.report({'INFO'},result.replace('\n',' '))
-
-                        bpy.ops.wm.revert_mainfile()
-                        
-                    elif len(stderr)>0:
-                        result = stderr.decode('utf-8')
-                        myLogger.error(result)
-                        self.report({'ERROR'},result)
-                else:
-                    myLogger.error(f'Could not revert: File is already at first revision.')
-                    self.report({'ERROR'},f'Could not revert: File is already at first revision.')
+        blocker = getCommitBlocker(self._filepath)
+        if blocker:
+            self.report({'ERROR'}, blocker)
+            return {'FINISHED'}
 
-            else:
-                myLogger.error(f'File has unsupported status \'{status}\'.')
-                self.report({'ERROR'},f'File has unsupported status \'{status}\'.')
-        else:
+        err, wc_root = getSVNWCRoot(self._filepath)
+        if err:
             myLogger.error(err)
-            self.report(err)
+            self.report({'ERROR'}, err)
+            return {'FINISHED'}
 
-        return {'FINISHED'}
+        paths = getChangeSetPaths(self._filepath, wc_root)
+        myLogger.info(f'Attempting to commit change set {paths}.')
+
+        job = submitSvnJob('commit_changeset', svnCommitChangeSet, self._filepath, paths)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+## Lock Operator
+## Lock the current file in the repository before editing it
+#   With svn:needs-lock set the file is read-only until it is locked. The
+#   lock is released by the next commit.
+#   The svn work runs as a background job; see svnLockFile().
+class LockOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.lock"
+    bl_label  = "Lock for Editing"
+
+    ## Take the lock from whoever holds it
+    steal = False
+
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+
+        state = getCachedFileState(self._filepath)
+        lock = lockCache.peek(self._filepath)
+        return (state.has_working_set and state.status not in ('?', 'A', 'I')
+                and self.canLock(lock) and not jobEngine.isBusy())
+
+
+    @classmethod
+    def canLock(cls, lock):
+        return lock is None or lock.kind in (svnlocks.LOCK_NONE, svnlocks.LOCK_BROKEN)
+
+
+    def execute(self, context):
+
+        myLogger.info(f'Attempting to lock file \'{self._filepath}\'.')
+
+        job = submitSvnJob('steal_lock' if self.steal else 'lock', svnLockFile, self._filepath, self.steal)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        # svn has made the file writable; Blender need not re-read it.
+        return reportJobResult(self, job)
+
+
+## Steal Lock Operator
+## Take the lock on the current file from the artist who holds it
+#   Their changes can then no longer be committed. Runs the same job as
+#   LockOperator with steal set.
+class StealLockOperator(LockOperator):
+    bl_idname = "scop.steal_lock"
+    bl_label  = "Steal Lock"
+
+    steal = True
+
+
+    @classmethod
+    def canLock(cls, lock):
+        return lock is not None and lock.kind in (svnlocks.LOCK_OTHER, svnlocks.LOCK_STOLEN)
+
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_confirm(self, event)
+
+
+## Unlock Operator
+## Release the lock on the current file without committing it
+#   The svn work runs as a background job; see svnUnlockFile().
+class UnlockOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.unlock"
+    bl_label  = "Release Lock"
+
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+
+        lock = lockCache.peek(self._filepath)
+        return (getCachedFileState(self._filepath).has_working_set and lock is not None
+                and lock.kind == svnlocks.LOCK_MINE and not jobEngine.isBusy())
+
+
+    def execute(self, context):
+
+        myLogger.info(f'Attempting to unlock file \'{self._filepath}\'.')
+
+        job = submitSvnJob('unlock', svnUnlockFile, self._filepath)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+## History Operators
+## Fetch revisions newer than those already in the local history index
+#   The svn work runs as a background job; see svnFetchHistory().
+class HistoryRefreshOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.history_refresh"
+    bl_label  = "Fetch History"
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+
+        return getCachedFileState(self._filepath).has_working_set and not jobEngine.isBusy()
+
+
+    def execute(self, context):
+        job = submitSvnJob('history_refresh', svnFetchHistory, self._filepath, False)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        result = reportJobResult(self, job)
+        reloadHistoryView(self._filepath, 0)
+        return result
+
+
+## Read the thumbnails of all indexed revisions for the history panel
+class HistoryThumbnailsOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.history_thumbnails"
+    bl_label  = "Load Thumbnails"
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+
+        return getCachedFileState(self._filepath).has_working_set and not jobEngine.isBusy()
+
+
+    def execute(self, context):
+        job = submitSvnJob('history_thumbnails', svnBuildThumbnails, self._filepath)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+## Compare each revision on the current history page with the one before it
+class HistoryCompareOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.history_compare"
+    bl_label  = "Compare Revisions"
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+
+        return getCachedFileState(self._filepath).has_working_set and not jobEngine.isBusy()
+
+
+    def execute(self, context):
+        view = getHistoryView(self._filepath)
+        self._offset = view.offset if view is not None else 0
+        job = submitSvnJob('history_compare', svnCompareRevisions, self._filepath, self._offset)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        result = reportJobResult(self, job)
+        reloadHistoryView(self._filepath, self._offset)
+        return result
+
+
+## Show the next older page of history, fetching it if it is not indexed yet
+class HistoryOlderOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.history_older"
+    bl_label  = "Older >"
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+
+        view = getHistoryView(self._filepath)
+        return view is not None and not (view.complete and view.offset + svnhistory.PAGE_SIZE >= view.total) and not jobEngine.isBusy()
+
+
+    def execute(self, context):
+        view = getHistoryView(self._filepath)
+        if not view.needsOlder():
+            reloadHistoryView(self._filepath, view.offset + svnhistory.PAGE_SIZE)
+            return {'FINISHED'}
+
+        job = submitSvnJob('history_older', svnFetchHistory, self._filepath, True)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        result = reportJobResult(self, job)
+        offset = historyView.offset
+        view = reloadHistoryView(self._filepath, offset)
+        if view is not None and offset + svnhistory.PAGE_SIZE < view.total:
+            reloadHistoryView(self._filepath, offset + svnhistory.PAGE_SIZE)
+        return result
+
+
+## Show the next newer page of history
+class HistoryNewerOperator(Operator):
+    bl_idname = "scop.history_newer"
+    bl_label  = "< Newer"
+
+    @classmethod
+    def poll(self, context):
+        view = getHistoryView(bpy.data.filepath)
+        return view is not None and view.offset > 0
+
+
+    def execute(self, context):
+        reloadHistoryView(bpy.data.filepath, historyView.offset - svnhistory.PAGE_SIZE)
+        return {'FINISHED'}
+
+
+## Revert Operator
+## Revert the file in the current working copy
+#  to that of the (todo: a) previous revision.
+#  I.e. undo changes for THIS file.
+#   The svn work runs as a background job; see svnRevertPrevious().
+class RevertPreviousOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.revert_previous"
+    bl_label  = "< Go Back One (Revert)"
+
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+        self._filename = Path(self._filepath).stem
+        self._working_dir = Path(self._filepath).parent
+
+        self._hasWorkingSet = getCachedFileState(self._filepath).has_working_set
+        return self._hasWorkingSet and not jobEngine.isBusy()
+    
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_confirm(self, event)
+    
+
+    def execute(self, context):
+
+        myLogger.info(f'Attempting to revert file \'{self._filepath}\'.')
+
+        job = submitSvnJob('revert_previous', svnRevertPrevious, self._filepath)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job, reload=True)
 
 
 ## Update (Uplift) Operator
 ## Update (uplift) the file to the latest version in the repo.
 #  I.e. return to most rececnt commit after browsing a previous one.
-#   Step 1) svn revert myfile.txt >> discard local changes and revert the file to its pristine (repository) version.
-#   Step 2) svn update myfile.txt >> update the working copy of the file to the latest version from the repository.
-class UpdateLatestOperator(bpy.types.Operator):
+#   The svn work runs as a background job; see svnUpdateLatest().
+class UpdateLatestOperator(svnjobs.ModalJobMixin, Operator):
     bl_idname = "scop.update_latest"
     bl_label  = "Return to Latest >>"
 
@@ -901,8 +2578,8 @@ class UpdateLatestOperator(bpy.types.Operator):
         self._filename = Path(self._filepath).stem
         self._working_dir = Path(self._filepath).parent
 
-        self._hasWorkingSet = getHasWorkingSet(self._working_dir)
-        return self._hasWorkingSet
+        self._hasWorkingSet = getCachedFileState(self._filepath).has_working_set
+        return self._hasWorkingSet and not jobEngine.isBusy()
     
 
     def invoke(self, context, event):
@@ -912,70 +2589,235 @@ class UpdateLatestOperator(bpy.types.Operator):
 
     def execute(self, context):
 
-        myLogger.info(f'Attempting to revert file \'{self._filepath}\'.')
+        myLogger.info(f'Attempting to update file \'{self._filepath}\'.')
 
-        # Confirm file status
-        # Acceptable for commit: ' ','M'
-        #  if 'M' -> Uncomitted changes, so:
-        #            svn revert filename
-        #  if ' ' -> Changes were previously comitted, so:
-        #            svn update -r N filename
-        #           old:
-        #              svn export --force -r PREV filename filename 
-        #           or svn merge -r HEAD:123 .
-        #         then svn commit -m "Reverted to revision 123"
-        err, status = getSvnFileStatus(self._filepath)
-        if not err:
-            if status == 'M':
-                process = subprocess.Popen(generateSvnCommandLine("svn_revert") + [self._filepath],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-                if len(stdout)>0:
-                    result = stdout.decode('utf-8')
-                    myLogger.info(result.replace('\n',' '))
-                    myLogger.debug(f'Successfully reverted. Return code: \'{process.returncode}\'.')
-                    self.report({'INFO'},result.replace('\n',' '))
-
-                    bpy.ops.wm.revert_mainfile()
-
-                elif len(stderr)>0:
-                    result = stderr.decode('utf-8')
-                    myLogger.error(result)
-                    self.report({'ERROR'},result)
-                else:
-                    myLogger.error(f'Error when reverting file with status {status}: {process.returncode}')
-                    self.report({'ERROR'},f'Error when reverting file with status {status}: {process.returncode}')
-            elif status == ' ':
-                #Get and adjust revision number
-
-                myLogger.info(f'Attempting to update file to latest revision.')
-                #execute update command
-                process = subprocess.Popen(generateSvnCommandLine("svn_update") + [self._filepath],
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE)
-                stdout, stderr = process.communicate()
-                if len(stdout)>0:
-                    result = stdout.decode('utf-8')
-                    myLogger.info(result.replace('\n',' '))
-                    myLogger.debug(f'Successfully reverted. Return code: \'{process.returncode}\'.')
-                    self.report({'INFO'},result.replace('\n',' '))
-
-                    bpy.ops.wm.revert_mainfile()
-                    
-                elif len(stderr)>0:
-                    result = stderr.decode('utf-8')
-                    myLogger.error(result)
-                    self.report({'ERROR'},result)
+        job = submitSvnJob('update_latest', svnUpdateLatest, self._filepath)
+        return self.startJob(context, job)
 
-            else:
-                myLogger.error(f'File has unsupported status \'{status}\'.')
-                self.report({'ERROR'},f'File has unsupported status \'{status}\'.')
-        else:
-            myLogger.error(err)
-            self.report(err)
 
-        return {'FINISHED'}
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job, reload=True)
+
+
+## Log in to Server Operator
+#   Asks for the user name and password once; svn keeps them for later
+#   commands (see svnremote.py). The password is not kept by the add-on.
+#   The svn work runs as a background job; see svnServerLogin().
+class ServerLoginOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.server_login"
+    bl_label  = "Log in to Server"
+
+    username: StringProperty(name="User name")
+    password: StringProperty(name="Password", subtype='PASSWORD', options={'SKIP_SAVE'})
+
+
+    @classmethod
+    def poll(self, context):
+        return server_mode_in_use == 'remote' and not jobEngine.isBusy()
+
+
+    def invoke(self, context, event):
+        if not self.username:
+            try:
+                self.username = getpass.getuser()
+            except (KeyError, OSError):
+                pass
+        return context.window_manager.invoke_props_dialog(self)
+
+
+    def execute(self, context):
+        url = getLoginUrl(bpy.data.filepath)
+        if url is None:
+            self.report({'ERROR'}, "Set a server URL (svn://, http://, ...) in the add-on preferences first.")
+            return {'FINISHED'}
+
+        myLogger.info(f'Logging in to \'{url}\' as \'{self.username}\'.')
+        job = submitSvnJob('server_login', svnServerLogin, url, self.username, self.password)
+        self.password = ''
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+## Sparse Expand Operator
+#   Check out the folders holding the textures, libraries and caches the open
+#   file references, in a sparse working copy.
+#   The svn work runs as a background job; see svnExpandReferenced().
+class SparseExpandOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.sparse_expand"
+    bl_label  = "Fetch Referenced Folders"
+
+
+    @classmethod
+    def poll(self, context):
+        self._filepath = bpy.data.filepath
+        self._hasWorkingSet = getCachedFileState(self._filepath).has_working_set
+        return self._hasWorkingSet and not jobEngine.isBusy()
+
+
+    def execute(self, context):
+        try:
+            wc_root = wcdb.findWcRoot(self._filepath)
+        except wcdb.SchemaMismatch as error:
+            self.report({'ERROR'}, f'Could not read the working copy: {error}')
+            return {'FINISHED'}
+
+        job = submitSvnJob('sparse_expand', svnExpandReferenced, wc_root, getReferencedPaths(self._filepath, wc_root))
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+## Set Depth Operator
+#   Change how much of one folder is checked out (svn update --set-depth).
+#   Making a folder shallower removes its files from disk, so that asks first.
+class SetDepthOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.set_depth"
+    bl_label  = "Set Folder Depth"
+
+    path: StringProperty(subtype='DIR_PATH', options={'SKIP_SAVE'})
+    depth: EnumProperty(items=svnsparse.depthItems(), default='files', options={'SKIP_SAVE'})
+    current: StringProperty(options={'SKIP_SAVE', 'HIDDEN'})
+
+
+    @classmethod
+    def poll(self, context):
+        return not jobEngine.isBusy()
+
+
+    @classmethod
+    def description(cls, context, properties):
+        return f'Check out \'{svnsparse.DEPTH_LABELS[properties.depth]}\' of {Path(properties.path).name or properties.path}'
+
+
+    def invoke(self, context, event):
+        if self.current in svnsparse.DEPTHS and svnsparse.isShallower(self.depth, self.current):
+            wm = context.window_manager
+            return wm.invoke_confirm(self, event)
+        return self.execute(context)
+
+
+    def execute(self, context):
+        myLogger.info(f'Setting depth of \'{self.path}\' to \'{self.depth}\'.')
+
+        job = submitSvnJob('set_depth', svnSetDepth, self.path, self.depth)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+
+## Project Status Operator
+#   Status of every versioned .blend file in the project, shown in the SVN
+#   Project panel. One recursive svn status per working copy.
+#   The svn work runs as a background job; see svnBatchStatus().
+#   From a script: bpy.ops.scop.batch_status(directory='/path/to/project')
+class BatchStatusOperator(svnjobs.ModalJobMixin, Operator):
+    bl_idname = "scop.batch_status"
+    bl_label  = "Project Status"
+
+    directory: StringProperty(subtype='DIR_PATH', options={'SKIP_SAVE'})
+
+
+    @classmethod
+    def poll(self, context):
+        return not jobEngine.isBusy()
+
+
+    def getDirectory(self):
+        if self.directory:
+            return os.path.abspath(bpy.path.abspath(self.directory))
+        if not bpy.data.filepath:
+            return None
+        return getProjectDirectory(bpy.data.filepath)
+
+
+    def execute(self, context):
+        directory = self.getDirectory()
+        if directory is None:
+            self.report({'ERROR'}, "Save this file in your project, or set a project folder, first.")
+            return {'FINISHED'}
+
+        myLogger.info(f'Reading the status of the project in \'{directory}\'.')
+        job = submitSvnJob('batch_status', svnBatchStatus, directory)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        return reportJobResult(self, job)
+
+
+## Project Commit Operator
+#   Commit every modified .blend file in the project, one change set per
+#   working copy. The svn work runs as a background job; see svnBatchCommit().
+class BatchCommitOperator(BatchStatusOperator):
+    bl_idname = "scop.batch_commit"
+    bl_label  = "Commit All Modified"
+
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_confirm(self, event)
+
+
+    def execute(self, context):
+        directory = self.getDirectory()
+        if directory is None:
+            self.report({'ERROR'}, "Save this file in your project, or set a project folder, first.")
+            return {'FINISHED'}
+        if bpy.data.is_dirty and bpy.data.filepath.startswith(os.path.join(directory, '')):
+            self.report({'ERROR'}, "This file has unsaved changes. Please save before committing.")
+            return {'FINISHED'}
+
+        myLogger.info(f'Committing the modified files of the project in \'{directory}\'.')
+        job = submitSvnJob('batch_commit', svnBatchCommit, directory)
+        return self.startJob(context, job)
+
+
+## Project Revert Operator
+#   Revert every versioned .blend file in the project to revision N,
+#   discarding uncommitted changes. The open file is reloaded if it changed.
+#   The svn work runs as a background job; see svnBatchRevert().
+class BatchRevertOperator(BatchStatusOperator):
+    bl_idname = "scop.batch_revert"
+    bl_label  = "Revert All to Revision"
+
+    revision: IntProperty(name="Revision", min=1, default=1)
+
+
+    def invoke(self, context, event):
+        if projectState is not None:
+            revisions = [revision for letter, revision in projectState.files.values() if revision]
+            self.revision = max(1, max(revisions, default=2) - 1)
+        return context.window_manager.invoke_props_dialog(self)
+
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "revision")
+        layout.label(text="WARNING: This will IRREVERSIBLY delete any un-committed changes.")
+
+
+    def execute(self, context):
+        directory = self.getDirectory()
+        if directory is None:
+            self.report({'ERROR'}, "Save this file in your project, or set a project folder, first.")
+            return {'FINISHED'}
+
+        myLogger.info(f'Reverting the project in \'{directory}\' to revision {self.revision}.')
+        job = submitSvnJob('batch_revert', svnBatchRevert, directory, self.revision)
+        return self.startJob(context, job)
+
+
+    def jobFinished(self, context, job):
+        reload = projectState is not None and os.path.normpath(bpy.data.filepath) in projectState.touched
+        return reportJobResult(self, job, reload=reload)
 
 
 #################################
@@ -1017,6 +2859,136 @@ class SVNConnectorAddonPreferences(AddonPreferences):
         subtype='NONE'
     )
 
+    serverMode: EnumProperty(
+        name="New repositories",
+        description="Where 'Commit to new repo' puts a new project. \n On a server, it becomes a folder under the server URL; log in with 'Log in to Server' first",
+        items=[('local', 'Local (file://)', 'Create a repository with svnadmin in the local SVN home'),
+               ('remote', 'Server (svn://, http://)', 'Import into a folder of a repository on a server')],
+        default=prefs["str_prefServerMode"],
+        update=lambda self, context: setServerMode(self.serverMode, self.serverUrl)
+    )
+
+    serverUrl: StringProperty(
+        name="Server URL",
+        description="Folder of a repository on a server which new projects are imported into, e.g. svn://server/projects",
+        default=prefs["str_prefServerURL"],
+        update=lambda self, context: setServerMode(self.serverMode, self.serverUrl)
+    )
+
+    useLocking: BoolProperty(
+        name="Require locks for .blend files",
+        description="'Include this file' sets svn:needs-lock on .blend files: once committed they are read-only until locked with 'Lock for Editing'. \n Use this when several artists work on the same files, as .blend files cannot be merged",
+        default=prefs["bln_prefNeedsLock"],
+        update=lambda self, context: setLockingEnabled(self.useLocking)
+    )
+
+    lockCacheTTL: IntProperty(
+        name="Lock refresh interval (seconds)",
+        description="How often the server is asked in the background who holds the lock on the open file. \n Lock, unlock and commit through this add-on refresh it straight away",
+        default=prefs["int_prefLockCacheTTL"],
+        min=5,
+        update=lambda self, context: setattr(lockCache, 'ttl', self.lockCacheTTL)
+    )
+
+    processTimeout: IntProperty(
+        name="svn timeout (seconds without output)",
+        description="Stop an svn command which has printed nothing for this long, e.g. on a hung network, and clean up the working copy. \n Uploading one very large file over a slow connection can be silent for a long time. 0 disables the timeout",
+        default=prefs["int_prefProcessTimeout"],
+        min=0,
+        update=lambda self, context: setProcessTimeout(self.processTimeout)
+    )
+
+    repoProfile: EnumProperty(
+        name="New repository profile",
+        description="Storage settings for repositories created by this add-on. \n The 'Large binaries' profiles suit .blend files better than the svn defaults",
+        items=svnprofiles.profileItems(),
+        default=prefs["str_prefRepoProfile"]
+    )
+
+    checkoutDepth: EnumProperty(
+        name="New working copy depth",
+        description="How much of a new repository is checked out. \n With less than 'Everything', only the folders the open file references are added; use the SVN Folders panel for more",
+        items=[(depth, svnsparse.DEPTH_LABELS[depth], f'--depth {depth}') for depth in ('empty', 'files', 'infinity')],
+        default=prefs["str_prefCheckoutDepth"]
+    )
+
+    projectDirectory: StringProperty(
+        name="Project folder",
+        description="Folder searched for working copies by the project-wide operators. \n Leave empty to use the working copy of the open file",
+        subtype='DIR_PATH',
+        default=prefs["str_prefProjectDir"],
+        update=lambda self, context: setProjectDirectory(self.projectDirectory)
+    )
+
+    traceFile: StringProperty(
+        name="Trace file",
+        description="Append every svn process the add-on runs to this file as a JSON line. \n Leave empty to only keep the statistics in the SVN Diagnostics panel",
+        subtype='FILE_PATH',
+        default=prefs["str_prefTraceFile"],
+        update=lambda self, context: svntrace.tracer.setTraceFile(bpy.path.abspath(self.traceFile))
+    )
+
+    logLevel: EnumProperty(
+        name="Log level",
+        description="Least important messages written to svnconnector.log in the add-on folder. \n 'Debug' logs every svn command line, which is useful for bug reports but slows the UI down a little",
+        items=[(level, level.title(), '') for level in svnlog.LEVELS],
+        default=prefs["str_prefLogLevel"],
+        update=lambda self, context: svnlog.setLevel(self.logLevel)
+    )
+
+    stateCacheTTL: IntProperty(
+        name="Status refresh interval (seconds)",
+        description="How long the file status shown in the UI is kept before asking svn again. \n Operations performed through this add-on always refresh the status immediately",
+        default=prefs["int_prefStateCacheTTL"],
+        min=1,
+        update=lambda self, context: setattr(stateCache, 'ttl', self.stateCacheTTL)
+    )
+
+    useRevisionCache: BoolProperty(
+        name="Restore older revisions from a local cache",
+        description="'Go Back One' puts the older revision's content in place from a local cache instead of running 'svn update'. \n The file then shows as modified until it is committed or 'Return to Latest' is used",
+        default=prefs["bln_prefUseRevisionCache"],
+        update=lambda self, context: setRevisionCacheEnabled(self.useRevisionCache)
+    )
+
+    revisionCacheSize: IntProperty(
+        name="Revision cache size (MB)",
+        description="Least recently used revisions are removed from the cache beyond this size",
+        default=prefs["int_prefRevisionCacheMB"],
+        min=64,
+        update=lambda self, context: setRevisionCacheBudget(self.revisionCacheSize)
+    )
+
+    autoCommit: BoolProperty(
+        name="Record save points automatically",
+        description="Commit the file in the background after it has been saved",
+        default=prefs["bln_prefAutoCommit"],
+        update=lambda self, context: setAutoCommitEnabled(self.autoCommit)
+    )
+
+    autoCommitDelay: IntProperty(
+        name="Save point delay (seconds)",
+        description="Wait this long after the last save before committing, so that several saves in a row become one save point",
+        default=prefs["int_prefAutoCommitDelay"],
+        min=1,
+        update=lambda self, context: setattr(savePointScheduler, 'delay', self.autoCommitDelay)
+    )
+
+    autoCommitInterval: IntProperty(
+        name="Minimum time between save points (seconds)",
+        default=prefs["int_prefAutoCommitInterval"],
+        min=0,
+        update=lambda self, context: setattr(savePointScheduler, 'min_interval', self.autoCommitInterval)
+    )
+
+    autoCommitMaxPending: IntProperty(
+        name="Maximum saves per save point",
+        description="Commit straight away once this many saves are waiting, regardless of the timings above",
+        default=prefs["int_prefAutoCommitMaxPending"],
+        min=1,
+        update=lambda self, context: setattr(savePointScheduler, 'max_pending', self.autoCommitMaxPending)
+    )
+
 
     def draw(self, context):
         layout = self.layout
@@ -1031,7 +3003,7 @@ class SVNConnectorAddonPreferences(AddonPreferences):
 
 ## SVN Connector main menu
 #   https://docs.blender.org/api/current/bpy.types.Menu.html#bpy.types.Menu.draw
-class SvnSubMenu(bpy.types.Menu):
+class SvnSubMenu(Menu):
     bl_idname = "OBJECT_MT_SVN_submenu"
     bl_label = "SVN Connector"
 
@@ -1040,15 +3012,23 @@ class SvnSubMenu(bpy.types.Menu):
 
         # Append in order of required execution for good flow.
         # Operators will be disabled according to state.
+        if server_mode_in_use == 'remote':
+            layout.operator("scop.server_login")
         layout.operator("scop.create_import", text="Commit to new repo")
+        layout.operator("scop.create_import_folder", text="Commit folder to new repo")
         layout.operator("scop.add", text="Include this file")
+        layout.operator("scop.lock")
         layout.operator("scop.commit", text="Commit your changes")
+        layout.operator("scop.commit_changeset", text="Commit with linked files")
+        layout.operator("scop.batch_commit", text="Commit all modified in project")
+        layout.operator("scop.unlock")
+        layout.operator("scop.steal_lock")
         #Versions sub-menu
         layout.menu("OBJECT_MT_SVN_submenu_sub")
 
 
 ## SVN Connector/Versions submenu
-class SvnVersionsSubMenu(bpy.types.Menu):
+class SvnVersionsSubMenu(Menu):
     bl_idname = "OBJECT_MT_SVN_submenu_sub"
     bl_label = "Revisions"
 
@@ -1056,6 +3036,7 @@ class SvnVersionsSubMenu(bpy.types.Menu):
         layout = self.layout
         layout.operator("scop.update_latest")
         layout.operator("scop.revert_previous")
+        layout.operator("scop.batch_revert", text="Revert project to revision")
 
 
 # Function to draw the menu item.
@@ -1065,8 +3046,19 @@ def menu_draw_svn(self, context):
     self.layout.menu("OBJECT_MT_SVN_submenu")
 
 
+## Diagnostics Reset Operator
+#   Start the SVN Diagnostics statistics afresh, e.g. before timing one action.
+class DiagnosticsResetOperator(Operator):
+    bl_idname = "scop.diagnostics_reset"
+    bl_label = "Reset Statistics"
+
+    def execute(self, context):
+        svntrace.tracer.reset()
+        return {'FINISHED'}
+
+
 # Warning and confirmation class
-class ConfirmOperator(bpy.types.Operator):
+class ConfirmOperator(Operator):
     bl_idname = "scop.confirm_operator"
     bl_label = "Confirmation"
 
@@ -1083,7 +3075,7 @@ class ConfirmOperator(bpy.types.Operator):
 
 
 ## INFO Panel
-class SvnInfoPanel(bpy.types.Panel):
+class SvnInfoPanel(Panel):
     bl_idname = "SVN_PT_InfoPanel"
     bl_label = "SVN Info"
     bl_space_type = 'VIEW_3D'
@@ -1095,24 +3087,89 @@ class SvnInfoPanel(bpy.types.Panel):
 
         layout = self.layout
 
+        # Read from the capability cache, or probed by a job after the first draw.
+        if requestSvnCapabilities():
+            row = layout.row()
+            row.label(text=f'svn_version: {svn_version}')
+            row = layout.row()
+            row.label(text=f'svn_ra_local: {svn_ra_local}')
+            row = layout.row()
+            row.label(text=f'svn_ra_svn: {svn_ra_svn}')
+
+            row =layout.row()
+            row.label(text=f'svnadmin_avail: {svnadmin_avail}') 
+            row = layout.row()
+            row.label(text=f'svnadmin_version: {svnadmin_version}') 
+        else:
+            row = layout.row()
+            row.label(text='svn capabilities: probing…')
+
         row = layout.row()
-        row.label(text=f'svn_version: {svn_version}')
+        row.label(text=f'svn_backend: {svnBackend.name}')
         row = layout.row()
-        row.label(text=f'svn_ra_local: {svn_ra_local}')
+        row.label(text=f'server_mode: {server_mode_in_use}')
+        if server_mode_in_use == 'remote':
+            row = layout.row()
+            row.label(text=f'server_url: {serverUrl}')
         row = layout.row()
-        row.label(text=f'svn_ra_svn: {svn_ra_svn}')
+        row.label(text=f'platform.system: {platform.system()}')
 
-        row =layout.row()
-        row.label(text=f'svnadmin_avail: {svnadmin_avail}') 
+
+## DIAGNOSTICS Panel
+#   What the add-on's svn processes cost, from svntrace.tracer. Nothing is
+#   measured here; the numbers are collected as the processes finish.
+class SvnDiagnosticsPanel(Panel):
+    bl_idname = "SVN_PT_DiagnosticsPanel"
+    bl_label = "SVN Diagnostics"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "SVNConnector"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    ## Commands and scopes listed at most
+    MAX_ROWS = 10
+
+
+    def draw(self, context):
+        tracer = svntrace.tracer
+
+        layout = self.layout
         row = layout.row()
-        row.label(text=f'svnadmin_version: {svnadmin_version}') 
+        row.label(text=f'Processes: {tracer.total} ({tracer.spawnRate():.1f}/s over {svntrace.RATE_WINDOW:.0f} s)')
+        row.operator("scop.diagnostics_reset", text='', icon='TRASH')
+
+        box = layout.box()
+        row = box.row()
+        row.label(text='Command')
+        row.label(text='Runs')
+        row.label(text='p50 ms')
+        row.label(text='p95 ms')
+        for key, count, p50, p95 in tracer.latencies()[:self.MAX_ROWS]:
+            row = box.row()
+            row.label(text=key)
+            row.label(text=str(count))
+            row.label(text=f'{p50*1000:.0f}')
+            row.label(text=f'{p95*1000:.0f}')
+
+        box = layout.box()
+        row = box.row()
+        row.label(text='Called by')
+        row.label(text='Calls')
+        row.label(text='ms/call')
+        row.label(text='Processes')
+        for scope, stats in tracer.scopeStats()[:self.MAX_ROWS]:
+            row = box.row()
+            row.label(text=scope)
+            row.label(text=str(stats.calls) if stats.calls else '-')
+            row.label(text=f'{stats.seconds*1000/stats.calls:.1f}' if stats.calls else '-')
+            row.label(text=str(stats.processes))
 
         row = layout.row()
-        row.label(text=f'platform.system: {platform.system()}')
+        row.label(text=f'Trace file: {tracer.trace_path or "off"}', icon='TEXT')
 
 
 ## INFO Panel
-class SvnStatusPanel(bpy.types.Panel):
+class SvnStatusPanel(Panel):
     bl_idname = "SVN_PT_StatusPanel"
     bl_label = "SVN Status"
     bl_space_type = 'VIEW_3D'
@@ -1122,26 +3179,190 @@ class SvnStatusPanel(bpy.types.Panel):
 
     def draw(self, context):
 
-        err_status, status = getSvnFileStatus(bpy.data.filepath)
-        err_revision, revision = getSvnRevision(bpy.data.filepath)
+        # Served from stateCache; svn is only asked on a miss or once the entry expires.
+        state = getCachedFileState(bpy.data.filepath)
 
         layout = self.layout
         row = layout.row()
-        row.label(text=f'File status: \'{"err" if err_status else status}\'')
+        row.label(text=f'File status: \'{"err" if state.status_err else state.status}\'')
         row =layout.row()
-        row.label(text=f'File revision: \'{"err" if err_revision else revision}\'')
+        row.label(text=f'File revision: \'{"err" if state.revision_err else state.revision}\'')
+        shown = getShownRevision(bpy.data.filepath) if state.status == 'M' else None
+        if shown is not None:
+            row = layout.row()
+            row.label(text=f'Showing revision: \'{shown}\'', icon='TIME')
+        if useAutoCommit:
+            row = layout.row()
+            row.label(text=f'Last save point: {lastSavePoint or "none yet"}', icon='REC')
+
+        # Served from lockCache; lockRefreshTimer asks the server in the background.
+        if state.has_working_set and state.status not in ('?', 'I'):
+            lock = lockCache.peek(bpy.data.filepath)
+            row = layout.row()
+            if lock is None:
+                row.label(text='Lock: checking...', icon='TIME')
+            elif lock.error:
+                row.label(text='Lock: unknown', icon='ERROR')
+                row = layout.row()
+                row.label(text=lock.error.strip().splitlines()[0][:60])
+            else:
+                row.label(text=f'Lock: {lock.label}', icon='LOCKED' if lock.kind != svnlocks.LOCK_NONE else 'UNLOCKED')
+                if lock.kind in (svnlocks.LOCK_OTHER, svnlocks.LOCK_STOLEN) and lock.comment.strip():
+                    row = layout.row()
+                    row.label(text=f'\'{lock.comment.strip()[:60]}\'')
+                if lock.needs_lock and lock.kind != svnlocks.LOCK_MINE:
+                    row = layout.row()
+                    row.label(text='Read-only until locked', icon='INFO')
+                if lock.out_of_date:
+                    row = layout.row()
+                    row.label(text='A newer revision is on the server', icon='INFO')
+
+
+
+## HISTORY Panel
+#   Served from the local history index. New revisions are only fetched on request.
+class SvnHistoryPanel(Panel):
+    bl_idname = "SVN_PT_HistoryPanel"
+    bl_label = "SVN History"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "SVNConnector"
+    bl_options = {'DEFAULT_CLOSED'}
 
 
-    @persistent
-    def fileUpdateHandler(self, arg0, arg1):
-        return
+    def draw(self, context):
+
+        layout = self.layout
+        row = layout.row()
+        row.operator("scop.history_refresh", text="Fetch new revisions", icon='FILE_REFRESH')
+        row.operator("scop.history_thumbnails", text="Thumbnails", icon='IMAGE_DATA')
+        row.operator("scop.history_compare", text="Changes", icon='ARROW_LEFTRIGHT')
+
+        view = getHistoryView(bpy.data.filepath)
+        if view is None or view.total < 1:
+            row = layout.row()
+            row.label(text='No history loaded for this file.')
+            return
+
+        for revision, author, date, message in view.rows:
+            box = layout.box()
+            row = box.row()
+            row.label(text=f'r{revision}')
+            row.label(text=author)
+            row.label(text=date[:10])
+            if message.strip():
+                row = box.row()
+                row.label(text=message.strip().splitlines()[0])
+            if revision in view.changes:
+                row = box.row()
+                row.label(text=blenddiff.describe(view.changes[revision]), icon='MODIFIER')
+            icon = getThumbnailIcon(view.uuid, view.path, revision)
+            if icon:
+                box.template_icon(icon_value=icon, scale=4.0)
+
+        row = layout.row()
+        row.operator("scop.history_newer")
+        row.label(text=f'{view.offset+1}-{view.offset+len(view.rows)} of {view.total}{"" if view.complete else "+"}')
+        row.operator("scop.history_older")
+
+
+## FOLDERS Panel
+#   Depth of the folders of a (sparse) working copy, read from wc.db.
+class SvnDepthPanel(Panel):
+    bl_idname = "SVN_PT_DepthPanel"
+    bl_label = "SVN Folders"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "SVNConnector"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    ## Folders listed at most
+    MAX_ROWS = 30
 
+    ## Buttons per folder: (depth, icon)
+    BUTTONS = (('files', 'FILE'), ('infinity', 'FILE_FOLDER'), ('exclude', 'X'))
 
-    def __init__(self) -> None:
-        super().__init__()
 
-        bpy.app.handlers.load_post.append(self.fileUpdateHandler)
-        bpy.app.handlers.save_post.append(self.fileUpdateHandler)
+    def draw(self, context):
+
+        layout = self.layout
+        row = layout.row()
+        row.operator("scop.sparse_expand", icon='IMPORT')
+
+        try:
+            db = wcdb.getWcDbFor(bpy.data.filepath) if bpy.data.filepath else None
+            folders = db.directoryDepths(db.wc_root, self.MAX_ROWS+1) if db is not None else []
+        except wcdb.SchemaMismatch as error:
+            myLogger.debug('Could not read folder depths: %s', error)
+            folders = []
+        if not folders:
+            row = layout.row()
+            row.label(text='No working copy folders to show.')
+            return
+
+        for relpath, depth in folders[:self.MAX_ROWS]:
+            row = layout.row(align=True)
+            row.label(text=relpath or '/', icon='FILE_FOLDER' if depth != 'exclude' else 'HIDE_ON')
+            row.label(text=svnsparse.DEPTH_LABELS.get(depth, depth or ''))
+            for target, icon in self.BUTTONS:
+                sub = row.row(align=True)
+                # The root of a working copy cannot be excluded.
+                sub.enabled = target != depth and (relpath != '' or target != 'exclude')
+                op = sub.operator("scop.set_depth", text='', icon=icon)
+                op.path = os.path.join(db.wc_root, *relpath.split('/')) if relpath else db.wc_root
+                op.depth = target
+                op.current = depth or ''
+
+        if len(folders) > self.MAX_ROWS:
+            row = layout.row()
+            row.label(text=f'Only the first {self.MAX_ROWS} folders are shown.')
+
+
+
+## PROJECT Panel
+#   The .blend files of the project as seen by the last project-wide job.
+#   Nothing is read here; svn only runs when a button is pressed.
+class SvnProjectPanel(Panel):
+    bl_idname = "SVN_PT_ProjectPanel"
+    bl_label = "SVN Project"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "SVNConnector"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    ## Files listed at most
+    MAX_ROWS = 30
+
+
+    def draw(self, context):
+
+        layout = self.layout
+        row = layout.row()
+        row.operator("scop.batch_status", text="Refresh", icon='FILE_REFRESH')
+        row.operator("scop.batch_commit", text="Commit All", icon='EXPORT')
+        row.operator("scop.batch_revert", text="Revert All", icon='LOOP_BACK')
+
+        state = projectState
+        if state is None:
+            row = layout.row()
+            row.label(text='Press Refresh to read the project.')
+            return
+
+        row = layout.row()
+        row.label(text=f'{len(state.files)} files, {state.count(svnbatch.COMMIT_LETTERS)} to commit', icon='FILE_FOLDER')
+        for wc_root, err in state.errors.items():
+            row = layout.row()
+            row.label(text=f'{Path(wc_root).name}: {err.strip().splitlines()[0] if err.strip() else err}', icon='ERROR')
+
+        rows = state.rows()
+        for path, (letter, revision) in rows[:self.MAX_ROWS]:
+            row = layout.row(align=True)
+            row.label(text=os.path.relpath(path, state.directory), icon='FILE_BLEND')
+            row.label(text=f'{letter}  r{revision if revision is not None else "?"}')
+
+        if len(rows) > self.MAX_ROWS:
+            row = layout.row()
+            row.label(text=f'Only the first {self.MAX_ROWS} files are shown.')
 
 
 
@@ -1163,23 +3384,92 @@ bl_info = {
 }
 
 def register():    
+    svnlog.startLogging(logPath, prefs["str_prefLogLevel"])
     myLogger.info(f'Registering classes defined in module {__name__}')
 
     # TODO: Check application state and register as appropriate.
 
     for name, cls in inspect.getmembers(sys.modules[__name__], lambda x: inspect.isclass(x) and (x.__module__ == __name__)):
-        myLogger.debug(f'Registering class {cls} with name {name}')
+        myLogger.debug('Registering class %s with name %s', cls, name)
+        svntrace.instrumentClass(cls)
         bpy.utils.register_class(cls)
     bpy.types.TOPBAR_MT_file.append(menu_draw_svn)
 
+    # Apply the saved cache and save point settings.
+    try:
+        addonPrefs = bpy.context.preferences.addons[__name__].preferences
+        stateCache.ttl = addonPrefs.stateCacheTTL
+        setProcessTimeout(addonPrefs.processTimeout)
+        setRevisionCacheEnabled(addonPrefs.useRevisionCache)
+        setRevisionCacheBudget(addonPrefs.revisionCacheSize)
+        setAutoCommitEnabled(addonPrefs.autoCommit)
+        setProjectDirectory(addonPrefs.projectDirectory)
+        setServerMode(addonPrefs.serverMode, addonPrefs.serverUrl)
+        setLockingEnabled(addonPrefs.useLocking)
+        lockCache.ttl = addonPrefs.lockCacheTTL
+        svnlog.setLevel(addonPrefs.logLevel)
+        svntrace.tracer.setTraceFile(bpy.path.abspath(addonPrefs.traceFile))
+        savePointScheduler.delay        = addonPrefs.autoCommitDelay
+        savePointScheduler.min_interval = addonPrefs.autoCommitInterval
+        savePointScheduler.max_pending  = addonPrefs.autoCommitMaxPending
+    except (AttributeError, KeyError):
+        myLogger.debug('Add-on preferences not available yet. Using default cache settings.')
+
+    if not bpy.app.timers.is_registered(lockRefreshTimer):
+        bpy.app.timers.register(lockRefreshTimer, first_interval=svnlocks.LOCK_POLL_INTERVAL, persistent=True)
+
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.save_post):
+        if svnStateFileHandler not in handlers:
+            handlers.append(svnStateFileHandler)
+
+    if svnSavePointHandler not in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.append(svnSavePointHandler)
+
+    global thumbnailPreviews
+    thumbnailPreviews = bpy.utils.previews.new()
+
 def unregister():
     myLogger.info(f'Unregistering classes defined in module {__name__}')
 
     for name, cls in inspect.getmembers(sys.modules[__name__], lambda x: inspect.isclass(x) and (x.__module__ == __name__)):
-        myLogger.debug(f'Unregistering class {cls} with name {name}')
+        myLogger.debug('Unregistering class %s with name %s', cls, name)
         bpy.utils.unregister_class(cls)
     bpy.types.TOPBAR_MT_file.remove(menu_draw_svn)
 
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.save_post):
+        if svnStateFileHandler in handlers:
+            handlers.remove(svnStateFileHandler)
+    if svnSavePointHandler in bpy.app.handlers.save_post:
+        bpy.app.handlers.save_post.remove(svnSavePointHandler)
+    if bpy.app.timers.is_registered(savePointTimer):
+        bpy.app.timers.unregister(savePointTimer)
+    savePointScheduler.clear()
+    if bpy.app.timers.is_registered(lockRefreshTimer):
+        bpy.app.timers.unregister(lockRefreshTimer)
+    lockEngine.cancelAll()
+    lockCache.clear()
+    stateCache.invalidate()
+    wcdb.closeAll()
+    svnhistory.closeAll()
+    if remoteSessions is not None:
+        remoteSessions.closeAll()
+    if revisionCache is not None:
+        revisionCache.close()
+
+    global thumbnailPreviews
+    if thumbnailPreviews is not None:
+        bpy.utils.previews.remove(thumbnailPreviews)
+        thumbnailPreviews = None
+
+    # Running svn processes are killed rather than left to outlive the add-on.
+    jobEngine.cancelAll()
+    svntrace.tracer.setTraceFile('')
+    if bpy.app.timers.is_registered(svnJobTimer):
+        bpy.app.timers.unregister(svnJobTimer)
+
+    # Writes out what is still queued and closes the log file.
+    svnlog.stopLogging()
+
 
 
 ##############
@@ -0,0 +1,12 @@
+## python -m svnconnector: see svncli.py
+
+import sys
+
+from .svncli import main
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        sys.exit(130)
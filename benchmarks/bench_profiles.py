@@ -0,0 +1,126 @@
+## Benchmark of the repository profiles in svnprofiles.py
+#
+#    For every profile a repository is created, a synthetic .blend-sized binary
+#    is committed and then changed and committed again a number of times.
+#    Reported per profile: the time of the first commit, the mean time of the
+#    later commits and the size of the repository afterwards.
+#
+#    The synthetic file is a 'BLENDER' header followed by blocks of partly
+#    compressible data. Between revisions a fraction of the blocks is
+#    rewritten, much like saving after editing a few datablocks. With
+#    --compressed each revision is zlib-compressed as a whole, like a .blend
+#    saved with compression, which defeats deltification.
+#
+#    Usage:
+#        python benchmarks/bench_profiles.py [--size-mb 256] [--revisions 5]
+#                                            [--change 0.05] [--compressed]
+#                                            [--profiles binary_fast,default]
+#                                            [--json results.json]
+#
+#    Needs svn and svnadmin on the PATH. Not part of the add-on build.
+
+import os, sys, time, json, random, shutil, zlib, tempfile, argparse, subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import svnprofiles
+
+
+BLOCK_SIZE = 64*1024
+
+
+def run(command):
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f'{" ".join(command)}: {result.stderr.decode("utf-8", errors="replace")}')
+
+
+def directorySize(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, dirs, files in os.walk(path) for name in files)
+
+
+## Blocks of the synthetic file: random bytes with runs of zeros, so they
+#  compress about as well as typical uncompressed .blend data.
+def makeBlocks(rng, count):
+    blocks = []
+    for index in range(count):
+        data = bytearray(rng.randbytes(BLOCK_SIZE))
+        for start in range(0, BLOCK_SIZE, 1024):
+            data[start:start+512] = bytes(512)
+        blocks.append(bytes(data))
+    return blocks
+
+
+def writeRevision(path, blocks, compressed):
+    data = b'BLENDER-v300' + b''.join(blocks)
+    with open(path, 'wb') as file:
+        file.write(zlib.compress(data, 1) if compressed else data)
+
+
+def benchProfile(name, work, args):
+    rng = random.Random(1)
+    blocks = makeBlocks(rng, max(1, args.size_mb*1024*1024//BLOCK_SIZE))
+
+    repo = work/f'repo-{name}'
+    wc = work/f'wc-{name}'
+    run(['svnadmin', 'create', str(repo)])
+    error = svnprofiles.applyProfile(str(repo), name)
+    if error:
+        raise RuntimeError(error)
+    run(['svn', 'checkout', '--quiet', repo.as_uri(), str(wc)])
+
+    blend = wc/'scene.blend'
+    writeRevision(blend, blocks, args.compressed)
+    run(['svn', 'add', '--quiet', str(blend)])
+
+    timings = []
+    for revision in range(args.revisions):
+        if revision:
+            for index in rng.sample(range(len(blocks)), max(1, int(len(blocks)*args.change))):
+                blocks[index] = makeBlocks(rng, 1)[0]
+            writeRevision(blend, blocks, args.compressed)
+        start = time.perf_counter()
+        run(['svn', 'commit', '--quiet', '-m', f'r{revision+1}', str(wc)])
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        'profile': name,
+        'file_mb': os.path.getsize(blend)/1024/1024,
+        'first_commit_s': timings[0],
+        'later_commit_s': sum(timings[1:])/max(1, len(timings)-1),
+        'repo_mb': directorySize(repo)/1024/1024,
+    }
+    shutil.rmtree(repo)
+    shutil.rmtree(wc)
+    return result
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Compare repository profiles on synthetic .blend files.')
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--revisions', type=int, default=5)
+    parser.add_argument('--change', type=float, default=0.05, help='fraction of blocks changed per revision')
+    parser.add_argument('--compressed', action='store_true', help='compress each revision like a compressed .blend')
+    parser.add_argument('--profiles', default=','.join(svnprofiles.PROFILES))
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv[1:])
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='svnprofiles-') as work:
+        for name in args.profiles.split(','):
+            results.append(benchProfile(name, Path(work), args))
+            result = results[-1]
+            print(f'{name:<18} file {result["file_mb"]:8.1f} MB  '
+                  f'first commit {result["first_commit_s"]:7.2f} s  '
+                  f'later commits {result["later_commit_s"]:7.2f} s  '
+                  f'repository {result["repo_mb"]:8.1f} MB', flush=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,202 @@
+## Fixtures for the benchmarks: local repositories holding synthetic content
+#
+#    Builds, under a work directory:
+#     - a repository created with svnadmin and reached through file://,
+#     - a working copy with a deep folder tree of small files (textures), and
+#     - synthetic .blend files of the requested sizes, each committed in a
+#       few revisions which change a fraction of their datablocks.
+#
+#    The synthetic files are valid enough for blendfile.py and blenddiff.py:
+#    a header, a thumbnail, ID blocks each followed by DATA blocks, a minimal
+#    DNA1 block and ENDB. They are written block by block, so 2 GB files do not
+#    need 2 GB of memory. The same seed gives the same bytes.
+#
+#    With server set, the repository is served by 'svnserve -d' on a free
+#    local port instead, and reached through svn:// as SERVER_USER. The svn
+#    config used (and the credentials svn caches) are kept in the work
+#    directory.
+#
+#    Needs svn and svnadmin (and svnserve for server) on the PATH.
+
+import time, socket, struct, random, hashlib, subprocess
+from collections import namedtuple
+from pathlib import Path
+
+
+## Payload size of the DATA blocks
+BLOCK_SIZE = 64*1024
+
+## DATA blocks per datablock
+BLOCKS_PER_ID = 16
+
+## Thumbnail size in pixels
+THUMBNAIL_SIZE = 32
+
+## The kinds of the synthetic datablocks
+ID_CODES = (b'OB', b'ME', b'MA', b'IM')
+
+BHEAD = struct.Struct('<4siQii')
+
+## SDNA with one struct, ID { ID *next; char name[64]; int session_uid; int tag; }
+_NAMES = ('*next', 'name[64]', 'session_uid', 'tag')
+_TYPES = ('char', 'int', 'ID')
+_LENGTHS = (1, 4, 80)
+
+## User name and password of the svnserve fixture
+SERVER_USER = ('bench', 'bench-password')
+
+Fixture = namedtuple('Fixture', ('repo', 'url', 'wc', 'blends', 'tree_files', 'revisions', 'server', 'config_dir'),
+                     defaults=(None, None))
+
+
+def run(command, cwd=None):
+    result = subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f'{" ".join(map(str, command))}: {result.stderr.decode("utf-8", errors="replace")}')
+
+
+def _align(data):
+    return data + bytes(-len(data) % 4)
+
+
+def _sdna():
+    data = b'SDNA'
+    data += _align(b'NAME' + struct.pack('<i', len(_NAMES)) + b''.join(name.encode() + b'\0' for name in _NAMES))
+    data += _align(b'TYPE' + struct.pack('<i', len(_TYPES)) + b''.join(name.encode() + b'\0' for name in _TYPES))
+    data += _align(b'TLEN' + struct.pack(f'<{len(_LENGTHS)}h', *_LENGTHS))
+    data += b'STRC' + struct.pack('<i', 1) + struct.pack('<10h', 2, 4, 2, 0, 0, 1, 1, 2, 1, 3)
+    return data
+
+
+def _block(code, payload, sdna_index=0, old=0):
+    return BHEAD.pack(code, len(payload), old, sdna_index, 1) + payload
+
+
+## Payload of DATA block `index` as of `revision`
+#   Each block changes in a revision with probability `change`. Half of every
+#   KB is zeros so the data compresses about as well as a typical .blend.
+def _payload(seed, index, revision, change):
+    version = 0
+    for candidate in range(1, revision+1):
+        if random.Random(f'{seed}:{index}:{candidate}').random() < change:
+            version = candidate
+    data = bytearray(random.Random(f'{seed}:{index}:v{version}').randbytes(BLOCK_SIZE))
+    for start in range(0, BLOCK_SIZE, 1024):
+        data[start:start+512] = bytes(512)
+    return bytes(data)
+
+
+## Write a synthetic .blend of about `size` bytes as of `revision`
+def writeBlend(path, size, seed=1, revision=0, change=0.05):
+    blocks = max(1, size // BLOCK_SIZE)
+    with open(path, 'wb') as file:
+        file.write(b'BLENDER-v300')
+
+        pixels = hashlib.sha256(f'{seed}:{revision}'.encode()).digest() * (THUMBNAIL_SIZE*THUMBNAIL_SIZE*4 // 32)
+        file.write(_block(b'TEST', struct.pack('<ii', THUMBNAIL_SIZE, THUMBNAIL_SIZE) + pixels))
+
+        for index in range(blocks):
+            if index % BLOCKS_PER_ID == 0:
+                number = index // BLOCKS_PER_ID
+                code = ID_CODES[number % len(ID_CODES)]
+                name = code + f'Block.{number:05}'.encode()
+                id_payload = bytes(8) + name.ljust(64, b'\0') + struct.pack('<ii', number, 0)
+                file.write(_block(code + b'\0\0', id_payload, old=number+1))
+            file.write(_block(b'DATA', _payload(seed, index, revision, change), old=index+1))
+
+        file.write(_block(b'DNA1', _sdna()))
+        file.write(BHEAD.pack(b'ENDB', 0, 0, 0, 0))
+
+
+## Create a folder tree `depth` levels deep, `fanout` folders wide, with
+#  `files` small files in each folder. Returns the file paths.
+def writeTree(root, depth, fanout, files, file_size=4096):
+    paths = []
+    folders = [Path(root)]
+    for level in range(depth):
+        folders = [folder/f'level{level}_{branch}' for folder in folders for branch in range(fanout)]
+        for folder in folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            for number in range(files):
+                path = folder/f'texture{number}.png'
+                path.write_bytes(random.Random(str(path.relative_to(root))).randbytes(file_size))
+                paths.append(str(path))
+    return paths
+
+
+## Serve the repositories under root with 'svnserve -d' on a free local port
+#   Only SERVER_USER may read or write repo. Returns (URL of root, process).
+def startSvnserve(root, repo):
+    conf = Path(repo)/'conf'
+    (conf/'svnserve.conf').write_text('[general]\nanon-access = none\nauth-access = write\npassword-db = passwd\n')
+    (conf/'passwd').write_text(f'[users]\n{SERVER_USER[0]} = {SERVER_USER[1]}\n')
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(['svnserve', '-d', '--foreground', '-r', str(root),
+                                '--listen-host', '127.0.0.1', '--listen-port', str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return f'svn://127.0.0.1:{port}', process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f'svnserve did not start: {process.stderr.read().decode("utf-8", errors="replace")}')
+            time.sleep(0.05)
+
+
+## Build the repository and working copy under workdir
+#   sizes are the .blend sizes in bytes. Each .blend gets `revisions` commits.
+#   With server set the caller stops fixture.server when done.
+def buildFixture(workdir, sizes, depth=6, fanout=2, files=3, revisions=3, change=0.05, server=False):
+    workdir = Path(workdir)
+    repo = workdir/'repo'
+    wc = workdir/'wc'
+    run(['svnadmin', 'create', str(repo)])
+
+    process = config_dir = None
+    options = []
+    if server:
+        # A config of our own, which lets svn cache the fixture's password.
+        config_dir = workdir/'svnconfig'
+        config_dir.mkdir()
+        (config_dir/'servers').write_text('[global]\nstore-plaintext-passwords = yes\n')
+        root, process = startSvnserve(workdir, repo)
+        url = f'{root}/repo'
+        options = ['--non-interactive', '--config-dir', str(config_dir),
+                   '--username', SERVER_USER[0], '--password', SERVER_USER[1]]
+    else:
+        url = repo.as_uri()
+
+    def svn(*args, cwd=None):
+        run(['svn', args[0]] + options + list(args[1:]), cwd=cwd)
+
+    try:
+        svn('mkdir', '-q', '-m', 'Create directory structure.', f'{url}/trunk', f'{url}/branches', f'{url}/tags')
+        svn('checkout', '-q', f'{url}/trunk', str(wc))
+
+        tree_files = writeTree(wc/'textures', depth, fanout, files)
+        blends = {}
+        for size in sizes:
+            blends[size] = str(wc/f'scene_{size // (1024*1024)}MB.blend')
+            writeBlend(blends[size], size, seed=size)
+        svn('add', '-q', 'textures', *[Path(path).name for path in blends.values()], cwd=wc)
+        svn('commit', '-q', '-m', 'Initial content.', cwd=wc)
+
+        for revision in range(1, revisions):
+            for size, path in blends.items():
+                writeBlend(path, size, seed=size, revision=revision, change=change)
+            svn('commit', '-q', '-m', f'Revision {revision}.', cwd=wc)
+        svn('update', '-q', cwd=wc)
+    except BaseException:
+        if process is not None:
+            process.kill()
+        raise
+
+    return Fixture(str(repo), url, str(wc), blends, tree_files, revisions, process,
+                   str(config_dir) if config_dir else None)
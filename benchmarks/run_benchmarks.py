@@ -0,0 +1,298 @@
+## Benchmark suite for the SVN Connector add-on
+#
+#    Runs the add-on outside Blender, with the bpy stand-in in stub/, against
+#    local file:// fixtures (see fixtures.py) and times:
+#     - helpers: the status, revision and working copy queries behind the UI,
+#     - ui: panel draws and operator polls, which Blender runs on every redraw,
+#     - jobs: the svn work of the operators (commit, save point, revert,
+#       update, history, thumbnails, changes), run on the add-on's job engine.
+#    Results are written as JSON. Pass an earlier result file as --baseline to
+#    print the change per scenario, e.g. between two versions of the add-on.
+#    With --server the repository is served by a local 'svnserve -d' and the
+#    add-on runs in remote mode, logged in as the fixture's user.
+#
+#    Usage:
+#        python benchmarks/run_benchmarks.py [--sizes 10,100] [--depth 6]
+#                                            [--repeat 5] [--only commit]
+#                                            [--out results.json]
+#                                            [--baseline old.json] [--server]
+#
+#    Sizes are in MB, from 10 to 2048. Needs svn and svnadmin on the PATH.
+#    The add-on is copied into the work directory and imported from there,
+#    like Blender installs it, so its log and caches stay out of the source
+#    tree.
+
+import os, sys, json, time, shutil, platform, statistics, subprocess, argparse, tempfile, importlib
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SOURCE_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR/'stub'))
+sys.path.insert(0, str(BENCH_DIR))
+
+import bpy
+import fixtures
+
+
+ADDON_NAME = 'svnconnector'
+MB = 1024*1024
+
+## Only scenarios whose name contains this are run (--only)
+scenarioFilter = None
+
+
+## Copy the add-on into workdir and import it with the bpy stand-in
+def loadAddon(workdir):
+    addons = Path(workdir)/'addons'
+    package = addons/ADDON_NAME
+    package.mkdir(parents=True)
+    for source in SOURCE_DIR.glob('*.py'):
+        shutil.copy2(source, package)
+    sys.path.insert(0, str(addons))
+    # Keep the caches in the work directory, not the user's cache folder.
+    os.environ['SVNCONNECTOR_CACHE_DIR'] = str(Path(workdir)/'cache')
+    addon = importlib.import_module(ADDON_NAME)
+
+    bpy.context.preferences.addons[ADDON_NAME] = type('Addon', (), {})()
+    bpy.context.preferences.addons[ADDON_NAME].preferences = addon.SVNConnectorAddonPreferences()
+    addon.register()
+    return addon
+
+
+## Run a job function on the add-on's job engine and wait for it
+#   Returns the job's (err, result); a failed job is reported as err.
+def runJob(addon, func, *args):
+    job = addon.jobEngine.submit(func.__name__, func, *args)
+    while not job.finished:
+        time.sleep(0.001)
+    addon.jobEngine.pump()
+    if job.error:
+        return job.error, None
+    return job.result
+
+
+## Time func `repeat` times, calling setup (untimed) before each run
+#   func may return an (err, result) pair, as the add-on's helpers do; the
+#   first err (or exception) is recorded with the result. Returns None for filtered out
+#   scenarios.
+def measure(group, scenario, size, func, repeat, setup=None):
+    if scenarioFilter and scenarioFilter not in scenario:
+        return None
+
+    times, error = [], None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        try:
+            value = func()
+        except Exception as exception:
+            error = f'{type(exception).__name__}: {exception}'
+            break
+        times.append(time.perf_counter() - start)
+        if error is None and isinstance(value, tuple) and len(value) == 2 and value[0]:
+            error = str(value[0])
+    if not times:
+        times = [float('nan')]
+
+    result = dict(group=group, scenario=scenario, size_mb=size, repeat=repeat,
+                  min_ms=min(times)*1000, median_ms=statistics.median(times)*1000,
+                  mean_ms=statistics.fmean(times)*1000, error=error)
+    print(f'{group:<8} {scenario:<42} {size:>6} MB  median {result["median_ms"]:10.2f} ms'
+          f'{"  ERROR: " + error.splitlines()[0] if error else ""}', flush=True)
+    return result
+
+
+def helperScenarios(addon, fixture, blend, size, repeat):
+    wc_root = fixture.wc
+    deepest = max(fixture.tree_files, key=lambda path: path.count(os.sep))
+    return [
+        measure('helpers', 'getHasWorkingSet', size, lambda: addon.getHasWorkingSet(os.path.dirname(blend)), repeat),
+        measure('helpers', 'getSvnFileStatus', size, lambda: addon.getSvnFileStatus(blend), repeat),
+        measure('helpers', 'getSvnRevision', size, lambda: addon.getSvnRevision(blend), repeat),
+        measure('helpers', 'getSVNWCRoot', size, lambda: addon.getSVNWCRoot(blend), repeat),
+        measure('helpers', 'getCachedFileState (cold)', size, lambda: addon.getCachedFileState(blend), repeat,
+                setup=addon.stateCache.invalidate),
+        measure('helpers', 'getCachedFileState (warm)', size, lambda: addon.getCachedFileState(blend), repeat),
+        measure('helpers', 'isUnchangedSinceCommit', size, lambda: addon.isUnchangedSinceCommit(blend), repeat),
+        measure('helpers', f'getSvnStatusBatch ({len(fixture.tree_files)} files)', size,
+                lambda: addon.getSvnStatusBatch(fixture.tree_files), repeat),
+        measure('helpers', 'getAddedParents (deepest file)', size,
+                lambda: addon.getAddedParents([deepest], wc_root), repeat),
+        measure('helpers', 'getSvnStatus (whole working copy)', size,
+                lambda: addon.getSvnStatus(wc_root), repeat),
+        measure('helpers', 'blendfile.readThumbnail', size,
+                lambda: addon.blendfile.readThumbnail(blend), repeat),
+        measure('helpers', 'blenddiff.summarizeFile', size,
+                lambda: addon.blenddiff.summarizeFile(blend), repeat),
+    ]
+
+
+def uiScenarios(addon, size, repeat):
+    results = []
+    classes = [klass for name, klass in sorted(vars(addon).items())
+               if isinstance(klass, type) and klass.__module__ == addon.__name__]
+
+    for klass in classes:
+        if issubclass(klass, bpy.types.Panel):
+            panel = klass()
+            results.append(measure('ui', f'{klass.__name__}.draw', size,
+                                   lambda klass=klass, panel=panel: klass.draw(panel, bpy.context), repeat))
+        elif issubclass(klass, bpy.types.Operator) and 'poll' in vars(klass):
+            results.append(measure('ui', f'{klass.__name__}.poll', size,
+                                   lambda klass=klass: klass.poll(bpy.context), repeat))
+    return results
+
+
+def jobScenarios(addon, fixture, blend, size, repeat):
+    revision = [fixture.revisions]
+
+    def modify():
+        fixtures.writeBlend(blend, size*MB, seed=size*MB, revision=revision[0])
+        revision[0] += 1
+
+    def modifyTextures():
+        for path in fixture.tree_files[:10]:
+            with open(path, 'ab') as file:
+                file.write(b'\0')
+
+    def latest():
+        runJob(addon, addon.svnUpdateLatest, blend)
+
+    def previous():
+        runJob(addon, addon.svnRevertPrevious, blend)
+
+    referenced = [blend] + fixture.tree_files[:10]
+    return [
+        measure('jobs', 'svnFetchHistory (first)', size, lambda: runJob(addon, addon.svnFetchHistory, blend), 1),
+        measure('jobs', 'svnFetchHistory (nothing new)', size, lambda: runJob(addon, addon.svnFetchHistory, blend), repeat),
+        measure('jobs', 'svnBuildThumbnails (first)', size, lambda: runJob(addon, addon.svnBuildThumbnails, blend), 1),
+        measure('jobs', 'svnBuildThumbnails (cached)', size, lambda: runJob(addon, addon.svnBuildThumbnails, blend), repeat),
+        measure('jobs', 'svnCompareRevisions', size, lambda: runJob(addon, addon.svnCompareRevisions, blend, 0), 1),
+        measure('jobs', 'svnCommitFile (unchanged)', size, lambda: runJob(addon, addon.svnCommitFile, blend), repeat),
+        measure('jobs', 'svnCommitFile', size, lambda: runJob(addon, addon.svnCommitFile, blend), repeat,
+                setup=modify),
+        measure('jobs', 'svnSavePoint', size, lambda: runJob(addon, addon.svnSavePoint, blend), repeat,
+                setup=modify),
+        measure('jobs', 'svnCommitChangeSet (11 files)', size,
+                lambda: runJob(addon, addon.svnCommitChangeSet, blend, referenced), repeat,
+                setup=lambda: (modify(), modifyTextures())),
+        measure('jobs', 'svnRevertPrevious', size, lambda: runJob(addon, addon.svnRevertPrevious, blend), repeat,
+                setup=latest),
+        measure('jobs', 'svnUpdateLatest', size, lambda: runJob(addon, addon.svnUpdateLatest, blend), repeat,
+                setup=previous),
+    ]
+
+
+def svnVersion():
+    try:
+        return subprocess.run(['svn', '--version', '--quiet'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def gitVersion():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=SOURCE_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+## Print the change of each scenario against an earlier result file
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = {(result['group'], result['scenario'], result['size_mb']): result
+                    for result in json.load(file)['results']}
+
+    print(f'\nChange against {baseline_path} (median):')
+    for result in results:
+        before = baseline.get((result['group'], result['scenario'], result['size_mb']))
+        if before is None or before['median_ms'] <= 0:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        print(f'{result["group"]:<8} {result["scenario"]:<42} {result["size_mb"]:>6} MB  '
+              f'{before["median_ms"]:10.2f} -> {result["median_ms"]:10.2f} ms  x{ratio:.2f}')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Time the SVN Connector add-on outside Blender.')
+    parser.add_argument('--sizes', default='10,100', help='.blend sizes in MB, comma separated')
+    parser.add_argument('--depth', type=int, default=6, help='folder depth of the working copy tree')
+    parser.add_argument('--fanout', type=int, default=2, help='subfolders per folder of the tree')
+    parser.add_argument('--files', type=int, default=3, help='files per folder of the tree')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='only run scenarios whose name contains this')
+    parser.add_argument('--out', default='bench_output.json')
+    parser.add_argument('--baseline', help='earlier result file to compare against')
+    parser.add_argument('--keep', action='store_true', help='keep the work directory')
+    parser.add_argument('--server', action='store_true',
+                        help='serve the repository with svnserve and run the add-on in remote mode')
+    args = parser.parse_args(argv[1:])
+
+    global scenarioFilter
+    scenarioFilter = args.only
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if any(size < 1 or size > 2048 for size in sizes):
+        parser.error('sizes must be between 1 and 2048 MB')
+
+    workdir = tempfile.mkdtemp(prefix='svnconnector-bench-')
+    fixture = None
+    try:
+        print(f'Building fixtures in {workdir} ...', flush=True)
+        start = time.perf_counter()
+        fixture = fixtures.buildFixture(Path(workdir)/'fixture', [size*MB for size in sizes],
+                                        args.depth, args.fanout, args.files, server=args.server)
+        print(f'Fixtures built in {time.perf_counter()-start:.1f} s.', flush=True)
+
+        addon = loadAddon(workdir)
+        if args.server:
+            addon.svnremote.configDir = fixture.config_dir
+            addon.setServerMode('remote', fixture.url)
+            err, message = runJob(addon, addon.svnServerLogin, fixture.url, *fixtures.SERVER_USER)
+            if err:
+                raise RuntimeError(f'Could not log in to svnserve: {err}')
+
+        results = []
+        for size in sizes:
+            blend = fixture.blends[size*MB]
+            bpy.data.filepath = blend
+            bpy.data.is_saved = True
+            bpy.utils.referenced_paths = fixture.tree_files[:10]
+            addon.stateCache.invalidate()
+
+            results += helperScenarios(addon, fixture, blend, size, args.repeat)
+            results += uiScenarios(addon, size, args.repeat)
+            results += jobScenarios(addon, fixture, blend, size, args.repeat)
+
+        results = [result for result in results if result is not None]
+        addon.unregister()
+    finally:
+        if fixture is not None and fixture.server is not None:
+            fixture.server.terminate()
+            fixture.server.wait()
+        if args.keep:
+            print(f'Kept {workdir}.')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = dict(
+        meta=dict(version=gitVersion(), svn=svnVersion(), backend=addon.svnBackend.name,
+                  server='svnserve' if args.server else None,
+                  python=platform.python_version(), platform=platform.platform(),
+                  time=time.strftime('%Y-%m-%dT%H:%M:%S'), sizes_mb=sizes, repeat=args.repeat,
+                  tree=dict(depth=args.depth, fanout=args.fanout, files=args.files,
+                            count=len(fixture.tree_files))),
+        results=results)
+    with open(args.out, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f'Wrote {len(results)} results to {args.out}.')
+
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,51 @@
+## Minimal stand-in for Blender's bpy module
+#
+#    Lets the add-on be imported and its operators, panels and helpers run
+#    outside Blender, for the benchmarks in this folder. Only what the add-on
+#    uses is provided. UI calls are recorded, not drawn.
+#
+#    Not used by the add-on itself and not part of the build.
+
+import types as _types
+
+from . import types, props, app, utils, path
+
+
+## The open file, as seen by the add-on
+data = _types.SimpleNamespace(filepath='', is_saved=False, is_dirty=False, libraries=[])
+
+
+## Operators called through bpy.ops; calls are counted in ops.calls
+class _Ops:
+
+    def __init__(self, prefix=''):
+        self._prefix = prefix
+        self.calls = {}
+
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if not self._prefix:
+            ops = _Ops(name)
+            ops.calls = self.calls
+            setattr(self, name, ops)
+            return ops
+
+        key = f'{self._prefix}.{name}'
+        def call(*args, **kwargs):
+            self.calls[key] = self.calls.get(key, 0) + 1
+            return {'FINISHED'}
+        return call
+
+
+ops = _Ops()
+
+
+## bpy.context: add-on preferences, window manager and workspace
+context = _types.SimpleNamespace(
+    preferences=_types.SimpleNamespace(addons={}),
+    window_manager=types.WindowManager(),
+    workspace=types.Workspace(),
+    window=None,
+)
@@ -0,0 +1,5 @@
+## bpy.app stand-ins
+
+from . import handlers, timers
+
+version = (3, 6, 0)
@@ -0,0 +1,8 @@
+## bpy.app.handlers stand-ins: handler lists are plain lists
+
+load_post = []
+save_post = []
+
+
+def persistent(func):
+    return func
@@ -0,0 +1,26 @@
+## bpy.app.timers stand-ins
+#   Timers are not run by themselves. Call run() to run the due ones once.
+
+_timers = {}
+
+
+def register(func, first_interval=0.0, persistent=False):
+    _timers[func] = first_interval
+
+
+def unregister(func):
+    _timers.pop(func, None)
+
+
+def is_registered(func):
+    return func in _timers
+
+
+## Call each registered timer once, dropping those which return None
+def run():
+    for func in list(_timers):
+        interval = func()
+        if interval is None:
+            _timers.pop(func, None)
+        else:
+            _timers[func] = interval
@@ -0,0 +1,7 @@
+## bpy.path stand-ins
+
+import os
+
+
+def abspath(path):
+    return os.path.abspath(path[2:] if path.startswith('//') else path)
@@ -0,0 +1,7 @@
+## bpy.props stand-ins: a property is the dict of its arguments
+
+def _property(**kwargs):
+    return kwargs
+
+StringProperty = IntProperty = FloatProperty = BoolProperty = EnumProperty = _property
+CollectionProperty = PointerProperty = _property
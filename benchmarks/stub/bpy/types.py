@@ -0,0 +1,99 @@
+## bpy.types stand-ins
+#   Any name not defined here is created on first use as an empty base class,
+#   e.g. Operator, Panel, Menu or TOPBAR_MT_file.
+
+
+## Recording UILayout: every call returns a child layout
+#   calls counts the calls made on a layout and all of its children.
+class UILayout:
+
+    def __init__(self, counter=None):
+        self._counter = counter if counter is not None else [0]
+
+
+    @property
+    def calls(self):
+        return self._counter[0]
+
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        def call(*args, **kwargs):
+            self._counter[0] += 1
+            return UILayout(self._counter)
+        return call
+
+
+class WindowManager:
+
+    def __init__(self):
+        self.progress = None
+
+    def progress_begin(self, low, high):
+        self.progress = low
+
+    def progress_update(self, value):
+        self.progress = value
+
+    def progress_end(self):
+        self.progress = None
+
+    def event_timer_add(self, interval, window=None):
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+    def modal_handler_add(self, operator):
+        pass
+
+    def invoke_confirm(self, operator, event):
+        return operator.execute(None)
+
+    def invoke_props_dialog(self, operator):
+        return {'RUNNING_MODAL'}
+
+
+class Workspace:
+
+    def __init__(self):
+        self.status_text = None
+
+    def status_text_set(self, text):
+        self.status_text = text
+
+
+## Base of Operator, Panel, Menu, AddonPreferences, ...
+#   Annotated properties start at their default; reports are kept in reports.
+class _Struct:
+
+    def __init__(self):
+        for klass in reversed(type(self).__mro__):
+            for name, prop in getattr(klass, '__annotations__', {}).items():
+                if isinstance(prop, dict):
+                    setattr(self, name, prop.get('default'))
+        self.layout = UILayout()
+        self.reports = []
+
+
+    def report(self, kind, message):
+        self.reports.append((set(kind), message))
+
+
+    @classmethod
+    def append(cls, func):
+        pass
+
+
+    @classmethod
+    def remove(cls, func):
+        pass
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    klass = type(name, (_Struct,), {})
+    globals()[name] = klass
+    return klass
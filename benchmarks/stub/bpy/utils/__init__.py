@@ -0,0 +1,18 @@
+## bpy.utils stand-ins
+
+from . import previews
+
+## Paths returned by blend_paths(); set by the caller to mimic a file's references
+referenced_paths = []
+
+
+def register_class(klass):
+    pass
+
+
+def unregister_class(klass):
+    pass
+
+
+def blend_paths(absolute=False, packed=False, local=False):
+    return list(referenced_paths)
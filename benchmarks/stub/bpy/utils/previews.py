@@ -0,0 +1,19 @@
+## bpy.utils.previews stand-ins
+
+import types
+
+
+class ImagePreviewCollection(dict):
+
+    def load(self, name, filepath, filetype):
+        preview = types.SimpleNamespace(icon_id=len(self)+1, filepath=filepath)
+        self[name] = preview
+        return preview
+
+
+def new():
+    return ImagePreviewCollection()
+
+
+def remove(collection):
+    collection.clear()
@@ -0,0 +1,227 @@
+## Datablock level comparison of two .blend files
+#
+#    The only change information svn has for a .blend is that the file
+#    differs. This walks the block layout of both files (see blendfile.py) and
+#    reports which datablocks (objects, meshes, materials, ...) were added,
+#    removed or changed, without loading them into Blender.
+#
+#    Notes:
+#     - Each datablock is an ID block followed by the DATA blocks it owns. Its
+#       fingerprint is a SHA-1 over those payloads. Pointer fields (located via
+#       SDNA) and runtime ID fields are zeroed first, as their values differ
+#       from save to save even when nothing changed.
+#     - Both files are mmapped; compressed files are first decompressed to a
+#       temporary file. Only the headers are walked to find the SDNA, then the
+#       payloads are hashed straight from the mapping.
+#     - Comparing multi-GB files takes a while, so the add-on runs this module
+#       as a separate Python process:
+#           python blenddiff.py OLD.blend NEW.blend
+#       prints the report as JSON. Use '-' for OLD to compare against nothing.
+
+import sys, json, mmap, hashlib, tempfile, contextlib, logging
+
+if __package__:
+    from . import blendfile
+else:
+    import blendfile
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Bytes decompressed at a time when unpacking a compressed file.
+CHUNK_SIZE = 1024*1024
+
+## Readable names of the ID codes
+ID_KINDS = {
+    'AC': 'Action',      'AR': 'Armature',     'BR': 'Brush',
+    'CA': 'Camera',      'CF': 'Cache File',   'CU': 'Curve',
+    'CV': 'Curves',      'GD': 'Grease Pencil', 'GP': 'Grease Pencil',
+    'GR': 'Collection',  'IM': 'Image',        'KE': 'Shape Key',
+    'LA': 'Light',       'LI': 'Library',      'LP': 'Light Probe',
+    'LS': 'Line Style',  'LT': 'Lattice',      'MA': 'Material',
+    'MB': 'Metaball',    'MC': 'Movie Clip',   'ME': 'Mesh',
+    'MK': 'Mask',        'NT': 'Node Group',   'OB': 'Object',
+    'PA': 'Particles',   'PC': 'Paint Curve',  'PL': 'Palette',
+    'PT': 'Point Cloud', 'SC': 'Scene',        'SO': 'Sound',
+    'SP': 'Speaker',     'TE': 'Texture',      'TX': 'Text',
+    'VF': 'Font',        'VO': 'Volume',
+    'WO': 'World',
+}
+
+## UI datablocks which change whenever the interface does; not reported.
+IGNORED_KINDS = ('SR', 'WM', 'WS')
+
+## Non-pointer fields of these structs hold runtime state and are not compared
+VOLATILE_FIELDS = {
+    'ID': ('session_uid', 'session_uuid', 'recalc', 'recalc_up_to_undo_push',
+           'recalc_after_undo_push', 'tag'),
+}
+
+
+## Map a .blend (or its decompressed copy) into memory
+@contextlib.contextmanager
+def openBlend(path):
+    with open(path, 'rb') as file:
+        decoder = blendfile.decoderFor(file.read(len(blendfile.ZSTD_MAGIC)))
+        file.seek(0)
+        if decoder is None:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+            return
+
+        with tempfile.TemporaryFile() as temp:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                temp.write(decoder.decode(chunk))
+            temp.flush()
+            with mmap.mmap(temp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+
+## Byte ranges of a struct to zero before hashing, including embedded structs
+class MaskBuilder:
+
+    def __init__(self, sdna):
+        self.sdna = sdna
+        self._masks = {}
+
+
+    def ranges(self, index):
+        masks = self._masks.get(index)
+        if masks is None:
+            masks = []
+            volatile = VOLATILE_FIELDS.get(self.sdna.structName(index), ())
+            for name, type_name, offset, size, pointer in self.sdna.fields(index):
+                if pointer or name in volatile:
+                    masks.append((offset, size))
+                elif type_name in self.sdna.struct_index:
+                    inner = self.sdna.struct_index[type_name]
+                    inner_size = self.sdna.structSize(inner)
+                    for element in range(0, size, inner_size or size):
+                        masks.extend((element+offset+start, length)
+                                     for start, length in self.ranges(inner))
+            self._masks[index] = masks
+        return masks
+
+
+    ## Feed a block payload to sha1 with its masked ranges zeroed
+    #   Only payloads holding whole structs of the block's SDNA type are
+    #   masked; anything else (raw arrays) is hashed as is.
+    def update(self, sha1, bhead, payload):
+        ranges = self.ranges(bhead.sdna_index) if bhead.sdna_index < len(self.sdna.structs) else ()
+        size = self.sdna.structSize(bhead.sdna_index) if ranges else 0
+        if not ranges or size <= 0 or bhead.count*size != bhead.length:
+            sha1.update(payload)
+            return
+
+        data = bytearray(payload)
+        for element in range(0, bhead.length, size):
+            for start, length in ranges:
+                data[element+start:element+start+length] = bytes(length)
+        sha1.update(data)
+
+
+## Return {(kind, name): fingerprint} for the datablocks of a .blend
+def summarizeFile(path):
+    with openBlend(path) as mapped:
+        view = memoryview(mapped)
+        try:
+            return _summarize(view)
+        finally:
+            view.release()
+
+
+def _summarize(view):
+    header = blendfile.readHeader(view)
+
+    dna = None
+    for bhead in blendfile.iterBlocks(view, header):
+        if bhead.code == blendfile.CODE_DNA1:
+            dna = bhead
+    if dna is None:
+        raise blendfile.BlendFileError('File has no DNA1 block.')
+
+    sdna = blendfile.SDNA(view[dna.offset:dna.offset+dna.length], header)
+    masks = MaskBuilder(sdna)
+    name_offset, name_size = sdna.fieldOffset('ID', 'name')
+
+    summary = {}
+    current = None
+
+    def close():
+        if current is not None:
+            kind, name, sha1 = current
+            key, number = (kind, name), 1
+            while key in summary:
+                # Same name in another library.
+                number += 1
+                key = (kind, f'{name} ({number})')
+            summary[key] = sha1.hexdigest()
+
+    for bhead in blendfile.iterBlocks(view, header):
+        payload = view[bhead.offset:bhead.offset+bhead.length]
+
+        if bhead.code[2:] == b'\0\0':
+            close()
+            code = bhead.code[:2].decode('ascii', errors='replace')
+            if code in IGNORED_KINDS:
+                current = None
+                continue
+            raw = bytes(payload[name_offset:name_offset+name_size])
+            name = raw.split(b'\0', 1)[0][2:].decode('utf-8', errors='replace')
+            current = (ID_KINDS.get(code, code), name, hashlib.sha1())
+        elif bhead.code != blendfile.CODE_DATA:
+            close()
+            current = None
+
+        if current is not None:
+            sha1 = current[2]
+            sha1.update(sdna.structName(bhead.sdna_index).encode('ascii')
+                        if bhead.sdna_index < len(sdna.structs) else b'?')
+            masks.update(sha1, bhead, payload)
+
+    close()
+    return summary
+
+
+## Compare two summaries
+#   Returns {'added': [...], 'removed': [...], 'changed': [...]} with
+#   [kind, name] pairs sorted by kind and name.
+def diffSummaries(old, new):
+    return {
+        'added':   sorted(list(key) for key in new.keys() - old.keys()),
+        'removed': sorted(list(key) for key in old.keys() - new.keys()),
+        'changed': sorted(list(key) for key in old.keys() & new.keys() if old[key] != new[key]),
+    }
+
+
+## Compare two .blend files. old_path may be None for "no previous file".
+def diffFiles(old_path, new_path):
+    old = summarizeFile(old_path) if old_path else {}
+    return diffSummaries(old, summarizeFile(new_path))
+
+
+## One line description of a report, e.g. '2 changed, 1 added: Cube, Suzanne, ...'
+def describe(report, names=3):
+    counts = [f'{len(report[key])} {key}' for key in ('changed', 'added', 'removed') if report[key]]
+    if not counts:
+        return 'No datablock changes'
+    listed = [name for key in ('changed', 'added', 'removed') for kind, name in report[key]]
+    more = ', ...' if len(listed) > names else ''
+    return f'{", ".join(counts)}: {", ".join(listed[:names])}{more}'
+
+
+def main(argv):
+    if len(argv) != 3:
+        sys.stderr.write('usage: blenddiff.py OLD.blend|- NEW.blend\n')
+        return 2
+    try:
+        report = diffFiles(None if argv[1] == '-' else argv[1], argv[2])
+    except (OSError, blendfile.BlendFileError) as error:
+        sys.stderr.write(f'{error}\n')
+        return 1
+    json.dump(report, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
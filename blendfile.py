@@ -0,0 +1,489 @@
+## Minimal reader for the block layout of .blend files
+#
+#    Loading an old revision into Blender just to look at it is far too slow
+#    for files of hundreds of MB. A .blend is a short file header followed by
+#    a flat list of blocks, each a BHead (code, length, ...) and its payload,
+#    so the parts we need can be found without loading any Blender data.
+#
+#    Notes:
+#     - BlockParser is push based: feed() it bytes as they arrive, whether from
+#       an mmap of a local file or from the stdout of 'svn cat'. A handler
+#       decides per block whether its payload is needed; skipped payloads are
+#       never copied. Parsing stops as soon as the handler calls finish().
+#     - gzip (Blender < 3.0) and zstd (Blender >= 3.0) compressed files are
+#       decompressed on the fly. zstd needs Python 3.14's compression.zstd or
+#       the zstandard module, which Blender bundles.
+#     - Both the 12 byte header (BHead4/BHead8) and the 17 byte header of
+#       Blender 5.0 (large BHead8) are understood.
+#
+#    Ref: https://developer.blender.org/docs/features/core/blend_file/
+
+import os, mmap, struct, zlib, logging
+
+from collections import namedtuple
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Bytes handed to the parser at a time when reading a local file.
+CHUNK_SIZE = 256*1024
+
+BLEND_MAGIC = b'BLENDER'
+GZIP_MAGIC  = b'\x1f\x8b'
+ZSTD_MAGIC  = b'\x28\xb5\x2f\xfd'
+
+## Block codes
+CODE_REND = b'REND'
+CODE_TEST = b'TEST'
+CODE_GLOB = b'GLOB'
+CODE_DATA = b'DATA'
+CODE_DNA1 = b'DNA1'
+CODE_ENDB = b'ENDB'
+
+
+## Raised for data which is not a .blend file or cannot be read
+class BlendFileError(Exception):
+    pass
+
+
+## One block header
+#   offset is the position of the payload in the uncompressed file.
+BHead = namedtuple('BHead', ('code', 'length', 'old', 'sdna_index', 'count', 'offset'))
+
+
+## Layout of the file as given by its header
+class BlendHeader:
+
+    def __init__(self, size, pointer_size, endian, version, large_bhead):
+        self.size         = size
+        self.pointer_size = pointer_size
+        self.endian       = endian          # '<' or '>'
+        self.version      = version         # e.g. 402 for Blender 4.2
+        self.large_bhead  = large_bhead
+
+        if large_bhead:
+            # code, SDNAnr, old, len, nr
+            self._bhead = struct.Struct(endian + '4siQqq')
+        elif pointer_size == 8:
+            # code, len, old, SDNAnr, nr
+            self._bhead = struct.Struct(endian + '4siQii')
+        else:
+            self._bhead = struct.Struct(endian + '4siIii')
+        self.bhead_size = self._bhead.size
+
+
+    def unpackBHead(self, data, offset):
+        if self.large_bhead:
+            code, sdna_index, old, length, count = self._bhead.unpack(data)
+        else:
+            code, length, old, sdna_index, count = self._bhead.unpack(data)
+        if length < 0:
+            raise BlendFileError(f'Invalid block length {length} in block {code!r}.')
+        return BHead(code, length, old, sdna_index, count, offset)
+
+
+## Parse a file header from its first bytes
+#   Returns None if more bytes are needed.
+def parseHeader(data):
+    if len(data) < 12:
+        return None
+    if data[:7] != BLEND_MAGIC:
+        raise BlendFileError('Not a .blend file.')
+
+    if data[7:8] in (b'_', b'-'):
+        # 'BLENDER' pointer-size endian version, e.g. 'BLENDER-v402'
+        pointer_size = 8 if data[7:8] == b'-' else 4
+        endian, version = data[8:9], data[9:12]
+        size, large_bhead = 12, False
+    else:
+        # 'BLENDER' header-size '-' format-version endian version, e.g. 'BLENDER17-01v0500'
+        try:
+            size = int(data[7:9])
+        except ValueError:
+            raise BlendFileError('Unknown .blend header.')
+        if len(data) < size:
+            return None
+        if data[9:10] != b'-' or data[10:12] != b'01':
+            raise BlendFileError(f'Unsupported .blend format version {bytes(data[10:12])!r}.')
+        pointer_size, endian, version = 8, data[12:13], data[13:size]
+        large_bhead = True
+
+    if endian not in (b'v', b'V'):
+        raise BlendFileError(f'Unknown endianness {bytes(endian)!r}.')
+    try:
+        version = int(version)
+    except ValueError:
+        raise BlendFileError(f'Unknown .blend version {bytes(version)!r}.')
+
+    return BlendHeader(size, pointer_size, '<' if endian == b'v' else '>', version, large_bhead)
+
+
+#########################
+###  Decompression    ###
+#########################
+
+def _zstdDecompressor():
+    try:
+        from compression import zstd
+        return zstd.ZstdDecompressor()
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj()
+    except ImportError:
+        raise BlendFileError('Reading zstd compressed .blend files needs the zstandard module.')
+
+
+## Incremental decompressor which continues across frames
+#   Blender writes zstd files as many independent frames.
+class StreamDecoder:
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = factory()
+
+
+    def decode(self, data):
+        out = []
+        while data:
+            out.append(self._obj.decompress(data))
+            if not self._obj.eof:
+                break
+            data = self._obj.unused_data
+            self._obj = self._factory()
+        return b''.join(out)
+
+
+## Return a StreamDecoder for data starting with magic, or None if it is uncompressed
+def decoderFor(magic):
+    if magic.startswith(GZIP_MAGIC):
+        return StreamDecoder(lambda: zlib.decompressobj(wbits=31))
+    if magic.startswith(ZSTD_MAGIC):
+        return StreamDecoder(_zstdDecompressor)
+    return None
+
+
+#########################
+###  Block Parser     ###
+#########################
+
+## Push parser walking the blocks of a (possibly compressed) .blend
+#   handler(parser, bhead) is called for every block. It returns None to skip
+#   the payload, or a sink which is called with the payload in pieces
+#   (memoryviews, only valid during the call) followed by None. Either may call
+#   parser.finish() to stop early.
+class BlockParser:
+
+    def __init__(self, handler):
+        self.handler  = handler
+        self.header   = None
+        self.done     = False
+
+        self._magic   = bytearray()
+        self._decoder = None
+        self._buf     = bytearray()
+        self._offset  = 0       # Position in the uncompressed stream
+        self._remaining = 0     # Payload bytes left in the current block
+        self._sink    = None
+
+
+    def finish(self):
+        self.done = True
+
+
+    ## Feed the next bytes of the file. Returns True once no more are needed.
+    def feed(self, data):
+        if self.done:
+            return True
+
+        if self._magic is not None:
+            # The first bytes decide whether the file is compressed.
+            self._magic += data
+            if len(self._magic) < len(ZSTD_MAGIC):
+                return False
+            data, self._magic = bytes(self._magic), None
+            self._decoder = decoderFor(data)
+
+        if self._decoder is not None:
+            data = self._decoder.decode(data)
+
+        self._parse(memoryview(data))
+        return self.done
+
+
+    def _parse(self, view):
+        pos, end = 0, len(view)
+
+        while pos < end and not self.done:
+            if self._remaining > 0:
+                count = min(self._remaining, end-pos)
+                if self._sink is not None:
+                    self._sink(view[pos:pos+count])
+                pos += count
+                self._offset += count
+                self._remaining -= count
+                if self._remaining == 0:
+                    self._endBlock()
+                continue
+
+            if self.header is None:
+                need = self._headerSize() - len(self._buf)
+                self._buf += view[pos:pos+need]
+                pos += min(need, end-pos)
+                if len(self._buf) < self._headerSize():
+                    continue
+                self.header = parseHeader(self._buf)
+                self._offset = self.header.size
+                self._buf.clear()
+                continue
+
+            need = self.header.bhead_size - len(self._buf)
+            self._buf += view[pos:pos+need]
+            pos += min(need, end-pos)
+            if len(self._buf) < self.header.bhead_size:
+                continue
+
+            self._offset += self.header.bhead_size
+            bhead = self.header.unpackBHead(bytes(self._buf), self._offset)
+            self._buf.clear()
+            self._startBlock(bhead)
+
+
+    ## Length of the file header, as far as the bytes seen so far tell
+    def _headerSize(self):
+        size = self._buf[7:9]
+        if len(size) == 2 and size.isdigit():
+            return int(size)
+        return 12
+
+
+    def _startBlock(self, bhead):
+        if bhead.code == CODE_ENDB:
+            self.finish()
+            return
+        self._sink = self.handler(self, bhead)
+        self._remaining = bhead.length
+        if self._remaining == 0:
+            self._endBlock()
+
+
+    def _endBlock(self):
+        sink, self._sink = self._sink, None
+        if sink is not None:
+            sink(None)
+
+
+## Feed a local .blend to parser until it is done
+#   Uncompressed files are mmapped so that skipped payloads are never read.
+def parseFile(path, parser):
+    with open(path, 'rb') as file:
+        magic = file.read(len(ZSTD_MAGIC))
+        file.seek(0)
+
+        if decoderFor(magic) is None and os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, len(view), CHUNK_SIZE):
+                        if parser.feed(view[start:start+CHUNK_SIZE]):
+                            break
+                finally:
+                    view.release()
+        else:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                if parser.feed(chunk):
+                    break
+    return parser
+
+
+#########################
+###  Thumbnails       ###
+#########################
+
+## The preview image Blender stores in the TEST block
+#   pixels are RGBA bytes, rows bottom to top.
+Thumbnail = namedtuple('Thumbnail', ('width', 'height', 'pixels'))
+
+
+## Parser collecting the embedded thumbnail
+#   Blender writes REND blocks, then TEST, then everything else, so parsing
+#   stops at the first block which is neither. thumbnail stays None if the
+#   file has none.
+class ThumbnailReader(BlockParser):
+
+    def __init__(self):
+        super().__init__(self._handleBlock)
+        self.thumbnail = None
+        self._data = bytearray()
+
+
+    def _handleBlock(self, parser, bhead):
+        if bhead.code == CODE_REND:
+            return None
+        if bhead.code != CODE_TEST:
+            self.finish()
+            return None
+        return self._collect
+
+
+    def _collect(self, piece):
+        if piece is not None:
+            self._data += piece
+            return
+
+        self.finish()
+        if len(self._data) < 8:
+            return
+        width, height = struct.unpack(self.header.endian + 'ii', self._data[:8])
+        if width <= 0 or height <= 0 or len(self._data) < 8 + width*height*4:
+            myLogger.debug('Ignoring malformed thumbnail block (%sx%s).', width, height)
+            return
+        self.thumbnail = Thumbnail(width, height, bytes(self._data[8:8+width*height*4]))
+
+
+## Return the Thumbnail embedded in a local .blend, or None
+def readThumbnail(path):
+    return parseFile(path, ThumbnailReader()).thumbnail
+
+
+#########################
+###  Random Access    ###
+#########################
+
+## Parse the header of an uncompressed .blend held in a buffer (e.g. an mmap)
+def readHeader(view):
+    header = parseHeader(bytes(view[:17]))
+    if header is None:
+        raise BlendFileError('File is too short for a .blend header.')
+    return header
+
+
+## Yield the BHeads of an uncompressed .blend held in a buffer
+#   Only the headers are read; payloads are view[bhead.offset:bhead.offset+bhead.length].
+def iterBlocks(view, header):
+    pos, end = header.size, len(view)
+    while pos + header.bhead_size <= end:
+        bhead = header.unpackBHead(view[pos:pos+header.bhead_size], pos+header.bhead_size)
+        if bhead.code == CODE_ENDB:
+            return
+        pos = bhead.offset + bhead.length
+        if pos > end:
+            raise BlendFileError(f'Block {bhead.code!r} runs past the end of the file.')
+        yield bhead
+
+
+#########################
+###  SDNA             ###
+#########################
+
+## The struct layout description stored in the DNA1 block
+#   Blender's DNA structs have no implicit padding, so field offsets are the
+#   sums of the preceding field sizes.
+class SDNA:
+
+    def __init__(self, data, header):
+        self.endian       = header.endian
+        self.pointer_size = header.pointer_size
+        self.names   = []
+        self.types   = []
+        self.lengths = []
+        self.structs = []    # (type index, [(type index, name index), ...])
+        self._parse(bytes(data))
+
+        self.struct_index = {self.types[type_index]: index
+                             for index, (type_index, fields) in enumerate(self.structs)}
+        self._layouts = {}
+
+
+    def _parse(self, data):
+        pos = 0
+
+        def tag(expected):
+            nonlocal pos
+            pos = (pos + 3) & ~3
+            if data[pos:pos+4] != expected:
+                raise BlendFileError(f'Expected {expected!r} in DNA1 block.')
+            pos += 4
+
+        def integers(fmt, count):
+            nonlocal pos
+            values = struct.unpack_from(f'{self.endian}{count}{fmt}', data, pos)
+            pos += struct.calcsize(f'{count}{fmt}')
+            return values
+
+        def strings(count):
+            nonlocal pos
+            result = []
+            for _ in range(count):
+                stop = data.index(b'\0', pos)
+                result.append(data[pos:stop].decode('ascii', errors='replace'))
+                pos = stop + 1
+            return result
+
+        if data[:4] != b'SDNA':
+            raise BlendFileError('DNA1 block does not start with SDNA.')
+        pos = 4
+        tag(b'NAME')
+        self.names = strings(integers('i', 1)[0])
+        tag(b'TYPE')
+        self.types = strings(integers('i', 1)[0])
+        tag(b'TLEN')
+        self.lengths = list(integers('h', len(self.types)))
+        tag(b'STRC')
+        for _ in range(integers('i', 1)[0]):
+            type_index, count = integers('h', 2)
+            values = integers('h', count*2)
+            self.structs.append((type_index, list(zip(values[0::2], values[1::2]))))
+
+
+    def structName(self, index):
+        return self.types[self.structs[index][0]]
+
+
+    def structSize(self, index):
+        return self.lengths[self.structs[index][0]]
+
+
+    ## (name, type, offset, size, is_pointer) of each field of a struct
+    def fields(self, index):
+        layout = self._layouts.get(index)
+        if layout is None:
+            layout = []
+            offset = 0
+            for type_index, name_index in self.structs[index][1]:
+                name = self.names[name_index]
+                pointer = name.startswith('*') or name.startswith('(*')
+                size = (self.pointer_size if pointer else self.lengths[type_index]) * arrayLength(name)
+                layout.append((fieldName(name), self.types[type_index], offset, size, pointer))
+                offset += size
+            self._layouts[index] = layout
+        return layout
+
+
+    ## (offset, size) of a field of the named struct
+    def fieldOffset(self, struct_name, field):
+        for name, type_name, offset, size, pointer in self.fields(self.struct_index[struct_name]):
+            if name == field:
+                return offset, size
+        raise BlendFileError(f'No field {field} in struct {struct_name}.')
+
+
+## Plain name of a DNA field, e.g. 'mat' for '*mat[4]' or 'func' for '(*func)()'
+def fieldName(name):
+    name = name.lstrip('(*')
+    for stop in '[)':
+        if stop in name:
+            name = name[:name.index(stop)]
+    return name
+
+
+## Number of elements of a DNA field, e.g. 16 for 'mat[4][4]'
+def arrayLength(name):
+    if '(' in name:
+        # Function pointer
+        return 1
+    count = 1
+    for part in name.split('[')[1:]:
+        count *= int(part[:part.index(']')])
+    return count
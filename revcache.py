@@ -0,0 +1,293 @@
+## Local cache of file revisions for the SVN Connector add-on
+#
+#    Stepping back and forth between revisions of a large .blend reads the
+#    whole file from the repository each time. Recently visited revisions are
+#    kept here instead so that switching to one again is a local file copy, or
+#    a reflink (copy-on-write clone) where the file system supports it.
+#
+#    Notes:
+#     - Content is stored once per SHA-1 (content-addressed). The index maps
+#       (repository UUID, repository path, revision) to a SHA-1, so revisions
+#       in which the file did not change share one blob.
+#     - The total size of the blobs is kept within a budget by evicting the
+#       least recently used ones.
+#     - Index access is serialised with a lock; blobs are written to a
+#       temporary name and renamed into place.
+
+import os, sys, stat, shutil, sqlite3, hashlib, tempfile, threading, time, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS blobs (
+    sha1      TEXT PRIMARY KEY,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    uuid     TEXT NOT NULL,
+    path     TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    sha1     TEXT NOT NULL REFERENCES blobs(sha1),
+    PRIMARY KEY (uuid, path, revision)
+);
+CREATE INDEX IF NOT EXISTS revisions_sha1 ON revisions(sha1);
+'''
+
+
+#########################
+###  Reflink / Copy   ###
+#########################
+
+## Linux FICLONE ioctl request number
+FICLONE = 0x40049409
+
+_clonefile = None
+
+
+## Clone src to dst (which must not exist) without copying data, if possible
+#   Returns False when the platform or file system cannot do it.
+def reflink(src, dst):
+    global _clonefile
+
+    if sys.platform == 'darwin':
+        try:
+            if _clonefile is None:
+                import ctypes
+                libc = ctypes.CDLL(None, use_errno=True)
+                _clonefile = libc.clonefile
+                _clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+            return _clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        except (OSError, AttributeError):
+            return False
+
+    if sys.platform.startswith('linux'):
+        try:
+            import fcntl
+            with open(src, 'rb') as source, open(dst, 'xb') as target:
+                try:
+                    fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+                    return True
+                except OSError:
+                    pass
+            os.unlink(dst)
+        except (ImportError, OSError):
+            pass
+
+    return False
+
+
+## Place a copy of src at dst, replacing dst atomically
+#   dst keeps its permissions, e.g. read-only while svn:needs-lock is set and
+#   the file is not locked. A dst with other hard links is overwritten in
+#   place instead, so that they all see the new content.
+def reflinkOrCopy(src, dst):
+    try:
+        existing = os.stat(dst)
+    except FileNotFoundError:
+        existing = None
+    if existing is not None and existing.st_nlink > 1:
+        copyInPlace(src, dst, stat.S_IMODE(existing.st_mode))
+        return
+
+    directory = os.path.dirname(os.path.abspath(dst))
+    fd, temp = tempfile.mkstemp(prefix='.svnconnector-', dir=directory)
+    os.close(fd)
+    os.unlink(temp)
+    try:
+        if not reflink(src, temp):
+            shutil.copyfile(src, temp)
+        if existing is not None:
+            os.chmod(temp, stat.S_IMODE(existing.st_mode))
+        os.replace(temp, dst)
+    except BaseException:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        raise
+
+
+## Overwrite the content of dst with src, keeping its inode and mode
+def copyInPlace(src, dst, mode):
+    os.chmod(dst, mode | stat.S_IWUSR)
+    try:
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            shutil.copyfileobj(source, target)
+    finally:
+        os.chmod(dst, mode)
+
+
+
+#########################
+###  Revision Cache   ###
+#########################
+
+## A blob being written to a temporary file in the cache
+#   The SHA-1 is computed while writing so the content is read only once.
+class IncomingBlob:
+
+    def __init__(self, blob_dir):
+        fd, self.temp = tempfile.mkstemp(prefix='.incoming-', dir=blob_dir)
+        self._file = os.fdopen(fd, 'wb')
+        self.sha1 = hashlib.sha1()
+        self.size = 0
+
+
+    def write(self, chunk):
+        self.sha1.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.temp):
+            os.unlink(self.temp)
+
+
+class RevisionCache:
+
+    def __init__(self, cache_dir, budget):
+        self.cache_dir = cache_dir
+        self.blob_dir  = os.path.join(cache_dir, 'blobs')
+        self.budget    = budget
+        self._lock = threading.Lock()
+        self._pinned = {}  # sha1 -> number of pin() calls not yet undone
+
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'revisions.sqlite'),
+                                     check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+    def _blobPath(self, sha1):
+        return os.path.join(self.blob_dir, sha1[:2], sha1[2:])
+
+
+    ## Return the blob path holding (uuid, path, revision), or None on a miss
+    def lookup(self, uuid, path, revision):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT sha1 FROM revisions WHERE uuid = ? AND path = ? AND revision = ?',
+                (uuid, path, revision)).fetchone()
+            if row is None:
+                return None
+            blob = self._blobPath(row[0])
+            if not os.path.isfile(blob):
+                # Removed behind our back; forget it.
+                self._forget(row[0])
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE blobs SET last_used = ? WHERE sha1 = ?', (time.time(), row[0]))
+        myLogger.debug('Revision cache hit for %s@%s.', path, revision)
+        return blob
+
+
+    ## Start receiving a new blob; write chunks to it, then insert() or discard() it
+    def incoming(self):
+        return IncomingBlob(self.blob_dir)
+
+
+    ## Index a fully written IncomingBlob as (uuid, path, revision)
+    #   Returns the blob path.
+    def insert(self, uuid, path, revision, incoming):
+        incoming.close()
+        try:
+            return self._add(uuid, path, revision, incoming.sha1.hexdigest(), incoming.size, incoming.temp)
+        except BaseException:
+            incoming.discard()
+            raise
+
+
+    ## Move a finished temporary file into place and index it
+    def _add(self, uuid, path, revision, sha1, size, temp):
+        blob = self._blobPath(sha1)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.isfile(blob):
+            os.unlink(temp)
+        else:
+            os.replace(temp, blob)
+
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO blobs (sha1, size, last_used) VALUES (?, ?, ?)',
+                               (sha1, size, time.time()))
+            self._conn.execute('INSERT OR REPLACE INTO revisions (uuid, path, revision, sha1) VALUES (?, ?, ?, ?)',
+                               (uuid, path, revision, sha1))
+        myLogger.debug('Cached %s@%s as %s (%d bytes).', path, revision, sha1, size)
+
+        self.evict(keep=sha1)
+        return blob
+
+
+    ## Keep blob from being evicted until a matching unpin()
+    #   For blobs read by another process, e.g. the two revisions of a comparison.
+    def pin(self, blob):
+        sha1 = self._blobSha1(blob)
+        with self._lock:
+            self._pinned[sha1] = self._pinned.get(sha1, 0) + 1
+
+
+    def unpin(self, blob):
+        sha1 = self._blobSha1(blob)
+        with self._lock:
+            count = self._pinned.get(sha1, 0) - 1
+            if count > 0:
+                self._pinned[sha1] = count
+            else:
+                self._pinned.pop(sha1, None)
+
+
+    def _blobSha1(self, blob):
+        head, tail = os.path.split(blob)
+        return os.path.basename(head) + tail
+
+
+    ## Copy (or reflink) a cached blob over dst
+    def materialize(self, blob, dst):
+        reflinkOrCopy(blob, dst)
+
+
+    def totalSize(self):
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+
+    ## Drop least recently used blobs until the cache fits its budget
+    #   The blob keep and pinned blobs are never evicted, even if they alone
+    #   exceed the budget.
+    def evict(self, keep=None):
+        with self._lock:
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            if total <= self.budget:
+                return
+            rows = self._conn.execute('SELECT sha1, size FROM blobs ORDER BY last_used ASC').fetchall()
+            for sha1, size in rows:
+                if total <= self.budget:
+                    break
+                if sha1 == keep or sha1 in self._pinned:
+                    continue
+                self._forget(sha1)
+                total -= size
+                myLogger.debug('Evicted %s (%d bytes) from revision cache.', sha1, size)
+
+
+    ## Remove a blob and every revision pointing at it. Caller holds the lock.
+    def _forget(self, sha1):
+        with self._conn:
+            self._conn.execute('DELETE FROM revisions WHERE sha1 = ?', (sha1,))
+            self._conn.execute('DELETE FROM blobs WHERE sha1 = ?', (sha1,))
+        try:
+            os.unlink(self._blobPath(sha1))
+        except FileNotFoundError:
+            pass
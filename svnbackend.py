@@ -0,0 +1,317 @@
+## SVN backends for the SVN Connector add-on
+#
+#    The queries the UI makes most often (working copy check, file status,
+#    revision and wc-root) are answered by a backend. Two are available:
+#
+#     - SubprocessBackend runs the svn executable, as the add-on always has.
+#     - BindingsBackend uses Subversion's SWIG Python bindings (svn.client,
+#       svn.wc) in-process. It keeps one client context, and with it the
+#       working copy context, open across calls so that each query costs a
+#       library call rather than a fork/exec plus config and wc.db opens.
+#
+#    createBackend() picks BindingsBackend when the bindings can be imported and
+#    wraps it in WcDbBackend, which answers from .svn/wc.db directly when it can.
+#    All return (error, result) pairs matching the add-on's svn utility funcs.
+#
+#    Ref: https://svnbook.red-bean.com/en/1.7/svn.developer.usingapi.html#svn.developer.usingapi.otherlangs
+
+import os, re, threading, logging
+
+from . import svnxml, wcdb
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## svn error codes we need to tell apart
+SVN_ERR_WC_NOT_WORKING_COPY = 155007
+SVN_ERR_WC_PATH_NOT_FOUND   = 155010
+
+
+## Interface of a backend
+#   commandLine(key) returns the full svn command line for a key of the
+#   add-on's svn_commands dictionary.
+class SvnBackend:
+    name = 'none'
+
+    def __init__(self, commandLine):
+        self.commandLine = commandLine
+
+    ## Return whether there is a working set available for the directory
+    def hasWorkingSet(self, working_dir):
+        raise NotImplementedError
+
+    ## Return (error, status letter) of a single file as shown by 'svn status'
+    def fileStatus(self, filepath):
+        raise NotImplementedError
+
+    ## Return (error, revision number) of a file or directory
+    def revision(self, filepath):
+        raise NotImplementedError
+
+    ## Return (error, wc-root path) of the working copy containing filepath
+    def wcRoot(self, filepath):
+        raise NotImplementedError
+
+
+## Backend running the svn executable for every query
+#   Output is requested with --xml and parsed incrementally by svnxml.
+class SubprocessBackend(SvnBackend):
+    name = 'subprocess'
+
+    def hasWorkingSet(self, working_dir):
+        returncode, entries, stderr = svnxml.runInfo(self.commandLine("svn_info") + [working_dir])
+        if (len(entries)<1) & (len(re.findall("E155007", stderr))>0):
+            return False
+        else:
+            return True
+
+
+    def fileStatus(self, filepath):
+        returncode, entries, stderr = svnxml.runStatus(self.commandLine("svn_status") + [filepath])
+
+        if len(entries)>0:
+            return None, entries[0].letter
+        elif len(stderr)>1:
+            # Warnings will be returned on stderr.
+            # We want to allow 'warning: W155010: The node ... was not found.'
+            # This just means that the parents are not added.
+            if len(re.findall("W155010", stderr))>0:
+                return None, '?'
+            else:
+                return stderr, None
+        else:
+            return f'Command returned code: {returncode}', None
+
+
+    def revision(self, filepath):
+        returncode, entries, stderr = svnxml.runInfo(self.commandLine("svn_revision") + [filepath])
+
+        if len(entries)>0:
+            return None, entries[0].revision
+        elif len(stderr)>1:
+            # Warnings will be returned on stderr.
+            # We want to allow 'warning: W155010: The node ... was not found.'
+            # This just means that the parents are not added.
+            if len(re.findall("W155010", stderr))>0:
+                return None, '?'
+            else:
+                return stderr, None
+        else:
+            return f'Command returned code: {returncode}', None
+
+
+    def wcRoot(self, filepath):
+        returncode, entries, stderr = svnxml.runInfo(self.commandLine("svn_info") + [filepath])
+
+        if len(entries)>0 and entries[0].wc_root:
+            return None, entries[0].wc_root
+        elif len(stderr)>1:
+            # Warnings will be returned on stderr.
+            return stderr, None
+        else:
+            return f'Command returned code: {returncode}', None
+
+
+## Backend calling libsvn in-process through the SWIG bindings
+#   The bindings are not thread safe, so calls are serialised. Anything the
+#   installed bindings cannot do (e.g. a missing wrapper in an old build) is
+#   passed on to a SubprocessBackend.
+class BindingsBackend(SvnBackend):
+    name = 'bindings'
+
+    def __init__(self, commandLine):
+        super().__init__(commandLine)
+
+        from svn import core, client, wc
+        self._core   = core
+        self._client = client
+        self._wc     = wc
+
+        self._lock = threading.Lock()
+        self._pool = core.Pool()
+        self._ctx  = client.svn_client_create_context(self._pool)
+        self._ctx.config = core.svn_config_get_config(None, self._pool)
+
+        self._fallback = SubprocessBackend(commandLine)
+
+        # Map node status to the first column of 'svn status'
+        self._status_letters = {
+            wc.svn_wc_status_none:        ' ',
+            wc.svn_wc_status_normal:      ' ',
+            wc.svn_wc_status_added:       'A',
+            wc.svn_wc_status_conflicted:  'C',
+            wc.svn_wc_status_deleted:     'D',
+            wc.svn_wc_status_ignored:     'I',
+            wc.svn_wc_status_modified:    'M',
+            wc.svn_wc_status_replaced:    'R',
+            wc.svn_wc_status_external:    'X',
+            wc.svn_wc_status_unversioned: '?',
+            wc.svn_wc_status_missing:     '!',
+            wc.svn_wc_status_incomplete:  '!',
+            wc.svn_wc_status_obstructed:  '~',
+        }
+
+        myLogger.info(f'Using svn bindings version {core.SVN_VER_MAJOR}.{core.SVN_VER_MINOR}.{core.SVN_VER_PATCH}.')
+
+
+    def _abspath(self, path):
+        return self._core.svn_dirent_internal_style(os.path.abspath(str(path)))
+
+
+    ## Run func(scratch_pool) under the lock with a scratch pool cleared afterwards
+    def _call(self, func):
+        with self._lock:
+            scratch = self._core.Pool(self._pool)
+            try:
+                return func(scratch)
+            finally:
+                scratch.destroy()
+
+
+    ## Get the status record of a single node
+    def _status(self, path, scratch):
+        found = []
+
+        def receiver(local_abspath, status, pool=None):
+            found.append(status)
+
+        revision = self._core.svn_opt_revision_t()
+        revision.kind = self._core.svn_opt_revision_working
+        self._client.svn_client_status6(self._ctx, self._abspath(path), revision,
+                                        self._core.svn_depth_empty,
+                                        True,   # get_all
+                                        False,  # check_out_of_date
+                                        True,   # check_working_copy
+                                        False,  # no_ignore
+                                        True,   # ignore_externals
+                                        False,  # depth_as_sticky
+                                        None,   # changelists
+                                        receiver, scratch)
+        return found[0] if found else None
+
+
+    def hasWorkingSet(self, working_dir):
+        try:
+            self._call(lambda scratch: self._client.svn_client_get_wc_root(
+                            self._abspath(working_dir), self._ctx, scratch, scratch))
+            return True
+        except self._core.SubversionException as error:
+            return error.apr_err != SVN_ERR_WC_NOT_WORKING_COPY
+        except (AttributeError, TypeError) as error:
+            myLogger.debug('Bindings could not check working copy (%s). Using subprocess.', error)
+            return self._fallback.hasWorkingSet(working_dir)
+
+
+    def fileStatus(self, filepath):
+        try:
+            status = self._call(lambda scratch: self._status(filepath, scratch))
+        except self._core.SubversionException as error:
+            if error.apr_err == SVN_ERR_WC_PATH_NOT_FOUND:
+                return None, '?'
+            return str(error), None
+        except (AttributeError, TypeError) as error:
+            myLogger.debug('Bindings could not get status (%s). Using subprocess.', error)
+            return self._fallback.fileStatus(filepath)
+
+        if status is None:
+            return None, '?'
+        return None, self._status_letters.get(status.node_status, ' ')
+
+
+    def revision(self, filepath):
+        try:
+            status = self._call(lambda scratch: self._status(filepath, scratch))
+        except self._core.SubversionException as error:
+            if error.apr_err == SVN_ERR_WC_PATH_NOT_FOUND:
+                return None, '?'
+            return str(error), None
+        except (AttributeError, TypeError) as error:
+            myLogger.debug('Bindings could not get revision (%s). Using subprocess.', error)
+            return self._fallback.revision(filepath)
+
+        if status is None or status.revision < 0 or not status.versioned:
+            return None, '?'
+        return None, int(status.revision)
+
+
+    def wcRoot(self, filepath):
+        try:
+            wc_root = self._call(lambda scratch: self._client.svn_client_get_wc_root(
+                            self._abspath(filepath), self._ctx, scratch, scratch))
+            return None, self._core.svn_dirent_local_style(wc_root)
+        except self._core.SubversionException as error:
+            return str(error), None
+        except (AttributeError, TypeError) as error:
+            myLogger.debug('Bindings could not get wc-root (%s). Using subprocess.', error)
+            return self._fallback.wcRoot(filepath)
+
+
+## Backend answering from wc.db where it can
+#   Anything wc.db cannot answer (unversioned files, ambiguous timestamps,
+#   unsupported schema formats) is passed on to the wrapped backend.
+class WcDbBackend(SvnBackend):
+
+    def __init__(self, backend):
+        super().__init__(backend.commandLine)
+        self.backend = backend
+        self.name = f'wc.db+{backend.name}'
+
+
+    def _db(self, path):
+        try:
+            return wcdb.getWcDbFor(path)
+        except wcdb.SchemaMismatch:
+            return None
+
+
+    def hasWorkingSet(self, working_dir):
+        try:
+            return wcdb.findWcRoot(working_dir) is not None
+        except wcdb.SchemaMismatch:
+            return self.backend.hasWorkingSet(working_dir)
+
+
+    def fileStatus(self, filepath):
+        db = self._db(filepath)
+        if db is not None:
+            try:
+                status = db.status(filepath)
+                if status is not None:
+                    return None, status
+            except wcdb.SchemaMismatch as error:
+                myLogger.debug('wc.db status failed (%s).', error)
+        return self.backend.fileStatus(filepath)
+
+
+    def revision(self, filepath):
+        db = self._db(filepath)
+        if db is not None:
+            try:
+                revision = db.revision(filepath)
+                if revision is not None:
+                    return None, revision
+            except wcdb.SchemaMismatch as error:
+                myLogger.debug('wc.db revision failed (%s).', error)
+        return self.backend.revision(filepath)
+
+
+    def wcRoot(self, filepath):
+        db = self._db(filepath)
+        if db is not None:
+            return None, db.wc_root
+        return self.backend.wcRoot(filepath)
+
+
+## Return the fastest backend available
+#   The chosen engine is wrapped so that wc.db is read directly where possible.
+def createBackend(commandLine):
+    try:
+        backend = BindingsBackend(commandLine)
+    except ImportError:
+        myLogger.info('svn bindings not available. Using svn executable.')
+        backend = SubprocessBackend(commandLine)
+    except Exception as error:
+        myLogger.warning(f'svn bindings could not be initialised ({error}). Using svn executable.')
+        backend = SubprocessBackend(commandLine)
+
+    return WcDbBackend(backend)
@@ -0,0 +1,178 @@
+## Project-wide batch operations for the SVN Connector add-on
+#
+#    A project holds hundreds of shot .blend files, often spread over several
+#    working copies (e.g. one checkout per sequence). The batch jobs find every
+#    working copy under a project folder and, for each one, read the state of
+#    all its .blend files with a single recursive 'svn status', then commit or
+#    revert them with a single svn command. A commit is one change set per
+#    working copy; svn cannot commit across working copies.
+#
+#    Notes:
+#     - svn locks a working copy while it works on it, so a working copy is
+#       handled by one thread at a time. Separate working copies are handled
+#       in parallel, by at most BATCH_WORKERS threads. The threads mostly wait
+#       for svn, so they do not hold up Blender.
+#     - Working copies are found by walking the project folder down to the
+#       first .svn of each branch. Checkouts nested inside a working copy are
+#       reported by its status as unversioned folders holding a .svn, and are
+#       scanned in turn.
+#     - The svn commands themselves are run by the job funcs in __init__.py.
+
+import os, logging
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from . import svnjobs, svntrace, wcdb
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Working copies handled at once
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+
+## Statuses of the files 'Commit All Modified' commits
+COMMIT_LETTERS = ('M', 'A', 'R')
+
+
+def isBlend(path):
+    return path.endswith('.blend')
+
+
+## Find the working copies under directory
+#   Returns (wc_root, target) pairs, target being the folder to scan. If
+#   directory is inside a working copy only that part of it is scanned.
+def findWorkingCopies(directory):
+    directory = os.path.normpath(os.path.abspath(directory))
+    wc_root = wcdb.findWcRoot(directory)
+    if wc_root is not None:
+        return [(wc_root, directory)]
+
+    found = []
+    for folder, dirs, files in os.walk(directory):
+        if wcdb.WC_ADM_DIR in dirs:
+            found.append((folder, folder))
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+    return found
+
+
+## Entries of the recursive status worth keeping
+#   .blend files, added folders (committed along with the files in them) and
+#   nested working copies. Everything else is dropped while svn streams.
+def keepForScan(entry):
+    if isBlend(entry.path) or entry.item == 'added':
+        return True
+    return entry.item == 'unversioned' and os.path.isdir(os.path.join(entry.path, wcdb.WC_ADM_DIR))
+
+
+## The state of one working copy, from one recursive status
+class WcScan:
+    __slots__ = ("wc_root", "target", "blends", "added_dirs", "nested")
+
+    def __init__(self, wc_root, target, entries):
+        self.wc_root    = wc_root
+        self.target     = target
+        self.blends     = {}
+        self.added_dirs = set()
+        self.nested     = []
+
+        for entry in entries:
+            path = os.path.normpath(entry.path)
+            if entry.item == 'unversioned' and os.path.isdir(path):
+                self.nested.append(path)
+            elif isBlend(path) and entry.letter not in ('?', 'I'):
+                self.blends[path] = entry
+            elif entry.item == 'added':
+                self.added_dirs.add(path)
+
+
+    def withLetters(self, letters):
+        return sorted(path for path, entry in self.blends.items() if entry.letter in letters)
+
+
+    ## Added folders which have to be committed with paths (E200009)
+    def addedParents(self, paths):
+        parents = set()
+        for path in paths:
+            parent = os.path.dirname(path)
+            while parent in self.added_dirs and parent not in parents:
+                parents.add(parent)
+                parent = os.path.dirname(parent)
+        return sorted(parents)
+
+
+## The .blend files of a project, as last seen by a batch job
+#   Built on a job thread and then handed to the UI whole.
+class ProjectState:
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files     = {}    # path -> (status letter, revision or None)
+        self.errors    = {}    # wc_root -> error
+        self.touched   = set() # Paths changed on disk by the last job
+
+
+    def add(self, scan):
+        for path, entry in scan.blends.items():
+            self.files[path] = (entry.letter, entry.revision)
+
+
+    ## Record the state of paths after a commit or update
+    def mark(self, paths, letter, revision=None):
+        for path in paths:
+            self.files[path] = (letter, revision)
+
+
+    def rows(self):
+        return sorted(self.files.items())
+
+
+    def count(self, letters):
+        return sum(1 for letter, revision in self.files.values() if letter in letters)
+
+
+## Run task(wc_root, target) for each working copy, BATCH_WORKERS at a time
+#   task returns (err, result, nested working copy roots) and the nested ones
+#   are queued too. Returns {wc_root: (err, result)}. A working copy which
+#   fails, or times out, does not stop the others; a cancel stops them all.
+def runParallel(job, targets, task, workers=BATCH_WORKERS):
+    results = {}
+    scope = svntrace.currentScope()
+
+    # The pool threads work for the same scope as the job.
+    def run(wc_root, target):
+        with svntrace.scoped(scope):
+            return task(wc_root, target)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='svnconnector-batch') as pool:
+        pending = {pool.submit(run, wc_root, target): wc_root for wc_root, target in targets}
+        queued = set(pending.values())
+        try:
+            while pending:
+                done, running = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    wc_root = pending.pop(future)
+                    try:
+                        err, result, nested = future.result()
+                    except svnjobs.ProcessTimeout as error:
+                        err, result, nested = str(error), None, []
+                    except svnjobs.JobCancelled:
+                        raise
+                    except Exception as error:
+                        myLogger.exception(f'Batch task failed for \'{wc_root}\'.')
+                        err, result, nested = f'{type(error).__name__}: {error}', None, []
+                    results[wc_root] = (err, result)
+
+                    for root in nested:
+                        if root not in queued:
+                            queued.add(root)
+                            pending[pool.submit(run, root, root)] = root
+
+                job.setProgress(len(results)/len(queued), f'{len(results)} of {len(queued)} working copies done')
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            job.cancel()
+            raise
+    return results
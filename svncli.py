@@ -0,0 +1,304 @@
+## Command line interface of the SVN Connector add-on
+#
+#    Runs the add-on's save point logic without Blender's UI, e.g. on a render
+#    farm or from pipeline scripts:
+#
+#        python -m svnconnector status    shots/
+#        python -m svnconnector commit    [--save-point] shots/
+#        python -m svnconnector revert    -r 12 [--discard] shots/sh010.blend
+#        python -m svnconnector history   [--limit 20] shots/sh010.blend
+#        python -m svnconnector bootstrap [--folder] [--profile binary_fast] new/sh010.blend
+#
+#    Notes:
+#     - Folders are searched for .blend files. Numbered backups (.blend1) and
+#       .svn folders are skipped.
+#     - The work is done by the job funcs of __init__.py, called directly
+#       rather than through the job engine. bpy is not needed, and not used
+#       when it is importable (e.g. under 'blender -b').
+#     - Files are grouped by working copy (by folder for bootstrap). svn locks
+#       a working copy while it works on it, so each group is handled by one
+#       process, in order. Groups are handled in parallel by a process pool
+#       with one worker per CPU, or --jobs.
+#     - Results are printed as they arrive, or as JSON lines with --json. The
+#       exit status is 1 if anything failed.
+#     - svn runs with --non-interactive, so working copies on a server need
+#       credentials svn has cached, e.g. from 'Log in to Server' in Blender or
+#       one 'svn info --username NAME URL' in a terminal.
+
+import os, sys, json, logging, argparse, importlib
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import svnjobs, svnhistory, svnprofiles, svnsparse, wcdb
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## The add-on package, imported without bpy when run from the command line
+addon = importlib.import_module(__package__)
+
+
+## Collect the files to work on
+#   Folders are searched for .blend files. Returns (paths, missing).
+def expandPaths(paths):
+    found, missing = [], []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if name != wcdb.WC_ADM_DIR)
+                found += [os.path.join(root, name) for name in sorted(files) if name.endswith('.blend')]
+        elif os.path.isfile(path):
+            found.append(path)
+        else:
+            missing.append(path)
+    return list(dict.fromkeys(found)), missing
+
+
+## Group paths by working copy root, or by folder for bootstrap
+#   Paths outside any working copy are grouped under None.
+def groupPaths(paths, command):
+    groups = {}
+    for path in paths:
+        if command == 'bootstrap':
+            key = os.path.dirname(path)
+        else:
+            try:
+                key = wcdb.findWcRoot(path)
+            except wcdb.SchemaMismatch:
+                key = os.path.dirname(path)
+        groups.setdefault(key, []).append(path)
+    return groups
+
+
+## Run func(job, *args) in this process and return its (err, result)
+def runJob(settings, name, func, *args):
+    job = svnjobs.Job(name, func, args, timeout=settings['timeout'] or None)
+    job.run()
+    if job.error:
+        return job.error, None
+    return job.result
+
+
+## Apply the command line settings in this process
+#   Pool workers start with the add-on's defaults.
+def applySettings(settings):
+    if settings['svn_dir']:
+        addon.prefs["str_prefSVNExecutableDir"] = settings['svn_dir']
+    addon.setRevisionCacheEnabled(settings['revision_cache'])
+    if settings['verbose'] and not any(getattr(handler, 'svncli', False) for handler in myLogger.handlers):
+        console = logging.StreamHandler(stream=sys.stderr)
+        console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(process)d]: %(message)s'))
+        console.setLevel(logging.INFO)
+        console.svncli = True
+        myLogger.addHandler(console)
+
+
+def statusGroup(settings, key, paths):
+    if key is None:
+        return [(path, 'Not in a working copy.', None, None) for path in paths]
+
+    # One 'svn status' for the whole group.
+    err, statuses = addon.getSvnStatusBatch(paths)
+    if err:
+        return [(path, err, None, None) for path in paths]
+
+    results = []
+    for path in paths:
+        entry = statuses.get(os.path.normpath(path))
+        if entry is None:
+            results.append((path, 'Not reported by svn.', None, None))
+        else:
+            results.append((path, None, f'{entry.letter} r{entry.revision}',
+                            {'status': entry.letter, 'revision': entry.revision,
+                             'commit_revision': entry.commit_revision}))
+    return results
+
+
+def commitGroup(settings, key, paths):
+    if key is None:
+        return [(path, 'Not in a working copy.', None, None) for path in paths]
+
+    func = addon.svnSavePoint if settings['save_point'] else addon.svnCommitFile
+    return [(path,) + runJob(settings, 'commit', func, path) + (None,) for path in paths]
+
+
+def revertGroup(settings, key, paths):
+    if key is None:
+        return [(path, 'Not in a working copy.', None, None) for path in paths]
+
+    return [(path,) + runJob(settings, 'revert', addon.svnRevertToRevision, path,
+                             settings['revision'], settings['discard']) + (None,)
+            for path in paths]
+
+
+def historyGroup(settings, key, paths):
+    if key is None:
+        return [(path, 'Not in a working copy.', None, None) for path in paths]
+
+    results = []
+    for path in paths:
+        err, message = runJob(settings, 'history', addon.svnFetchHistory, path)
+        if err:
+            results.append((path, err, None, None))
+            continue
+
+        uuid, repos_path = addon.historyRepos[path]
+        index = svnhistory.getHistoryIndex(addon.cacheDir, uuid)
+        # Each fetch adds a page of older revisions until the limit is reached.
+        while index.count(repos_path) < settings['limit'] and not index.coverage(repos_path)[2]:
+            count = index.count(repos_path)
+            err, message = runJob(settings, 'history', addon.svnFetchHistory, path, True)
+            if err or index.count(repos_path) == count:
+                break
+        if err:
+            results.append((path, err, None, None))
+            continue
+
+        rows = index.page(repos_path, 0, settings['limit'])
+        entries = [{'revision': revision, 'author': author, 'date': date, 'message': text}
+                   for revision, author, date, text in rows]
+        lines = [f'  r{entry["revision"]}  {entry["author"]}  {entry["date"][:19]}  {entry["message"].strip()}'
+                 for entry in entries]
+        results.append((path, None, '\n'.join([f'{len(rows)} revisions'] + lines), entries))
+    svnhistory.closeAll()
+    return results
+
+
+def bootstrapGroup(settings, key, paths):
+    first, rest = paths[0], paths[1:]
+    err, repoRoot = addon.resolveRepoRoot(settings['repo_root'], key)
+    if err:
+        return [(path, err, None, None) for path in paths]
+
+    err, message = runJob(settings, 'create_import', addon.svnCreateAndImport, first, repoRoot,
+                          settings['repo_name'] or addon.generateRepoName(first), settings['folder'],
+                          settings['profile'], settings['depth'], rest)
+    results = [(first, err, message, None)]
+
+    if rest and not settings['folder']:
+        # The other files of the folder are committed on top of the import.
+        if err:
+            results += [(path, f'Not committed: {err}', None, None) for path in rest]
+        else:
+            err, message = runJob(settings, 'commit_changeset', addon.svnCommitChangeSet, first, rest)
+            results += [(path, err, message, None) for path in rest]
+    else:
+        results += [(path, err, message, None) for path in rest]
+    return results
+
+
+GROUP_FUNCS = {
+    'status':    statusGroup,
+    'commit':    commitGroup,
+    'revert':    revertGroup,
+    'history':   historyGroup,
+    'bootstrap': bootstrapGroup,
+}
+
+
+## Work on one group of paths. Run in a pool worker, or in this process.
+def runGroup(settings, key, paths):
+    applySettings(settings)
+    try:
+        return GROUP_FUNCS[settings['command']](settings, key, paths)
+    except Exception as error:
+        myLogger.exception(f'Command \'{settings["command"]}\' failed for {key}.')
+        return [(path, f'{type(error).__name__}: {error}', None, None) for path in paths]
+
+
+def printResult(path, err, message, data, as_json):
+    if as_json:
+        print(json.dumps({'path': path, 'error': err, 'message': message, 'data': data}), flush=True)
+    elif err:
+        print(f'{path}: ERROR: {err.strip()}', flush=True)
+    else:
+        print(f'{path}: {message.strip()}', flush=True)
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(prog='python -m svnconnector',
+                                     description='Save points for .blend files without the Blender UI.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='working copies handled in parallel (default: one per CPU)')
+    parser.add_argument('--svn-dir', help='folder of the svn executables')
+    parser.add_argument('--timeout', type=int, default=addon.prefs['int_prefProcessTimeout'],
+                        help='seconds an svn command may print nothing before it is stopped (0: no limit)')
+    parser.add_argument('--json', action='store_true', help='print one JSON object per file')
+    parser.add_argument('-v', '--verbose', action='store_true', help='also log to stderr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('status', help='show the status and revision of files')
+    command.add_argument('paths', nargs='+', help='.blend files, or folders to search for them')
+
+    command = commands.add_parser('commit', help='commit changed files')
+    command.add_argument('paths', nargs='+')
+    command.add_argument('--save-point', action='store_true',
+                         help='log as save points and skip unchanged or unversioned files quietly')
+
+    command = commands.add_parser('revert', help='restore files to an earlier revision')
+    command.add_argument('paths', nargs='+')
+    command.add_argument('-r', '--revision', type=int, required=True)
+    command.add_argument('--discard', action='store_true', help='throw away uncommitted changes first')
+    command.add_argument('--no-revision-cache', dest='revision_cache', action='store_false',
+                         help='use \'svn update -r N\' instead of restoring the content from the revision cache')
+
+    command = commands.add_parser('history', help='list the commits of files')
+    command.add_argument('paths', nargs='+')
+    command.add_argument('--limit', type=int, default=svnhistory.PAGE_SIZE)
+
+    command = commands.add_parser('bootstrap', help='create a repository for the folder of each file and commit it')
+    command.add_argument('paths', nargs='+')
+    command.add_argument('--folder', action='store_true', help='import the whole folder rather than the files')
+    command.add_argument('--repo-root', default=addon.prefs['str_prefSVNRepoHome'],
+                         help=f'folder holding the repositories, or a server URL to import into '
+                              f'(default: {addon.prefs["str_prefSVNRepoHome"]})')
+    command.add_argument('--repo-name', help='repository name (default: the name of the folder)')
+    command.add_argument('--profile', choices=list(svnprofiles.PROFILES), default=addon.prefs['str_prefRepoProfile'])
+    command.add_argument('--depth', choices=svnsparse.DEPTHS[1:], default=addon.prefs['str_prefCheckoutDepth'])
+    return parser
+
+
+def main(argv):
+    args = buildParser().parse_args(argv)
+    settings = dict(save_point=False, revision=None, discard=False, revision_cache=addon.useRevisionCache,
+                    limit=svnhistory.PAGE_SIZE, folder=False, repo_root=None, repo_name=None,
+                    profile=None, depth=None)
+    settings.update(vars(args))
+
+    paths, missing = expandPaths(args.paths)
+    failed = len(missing)
+    for path in missing:
+        printResult(path, 'No such file or folder.', None, None, args.json)
+    if not paths:
+        if not missing:
+            printResult(' '.join(args.paths), 'No .blend files found.', None, None, args.json)
+        return 1
+
+    groups = groupPaths(paths, args.command)
+    if args.command == 'bootstrap' and args.repo_name and len(groups)>1:
+        printResult(' '.join(args.paths), '--repo-name needs all files to be in one folder.', None, None, args.json)
+        return 1
+    myLogger.info(f'Command line: {args.command} on {len(paths)} files in {len(groups)} groups.')
+
+    def report(results):
+        nonlocal failed
+        for path, err, message, data in results:
+            failed += 1 if err else 0
+            printResult(path, err, message, data, args.json)
+
+    workers = max(1, min(args.jobs, len(groups)))
+    if workers == 1:
+        for key, group in groups.items():
+            report(runGroup(settings, key, group))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(runGroup, settings, key, group) for key, group in groups.items()]
+            try:
+                for future in as_completed(futures):
+                    report(future.result())
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    return 1 if failed else 0
@@ -0,0 +1,184 @@
+## Local index of svn log entries for the SVN Connector add-on
+#
+#    Fetching a file's history with 'svn log' every time the history panel is
+#    opened is slow on large repositories. Log entries are instead stored in a
+#    small SQLite database per repository UUID, so reopening the history is a
+#    local query and only revisions newer than what is already known have to
+#    be fetched.
+#
+#    Notes:
+#     - History is fetched in pages of --limit entries. For each path the index
+#       remembers the newest (high-water) and oldest (low-water) revision it
+#       holds; the range between them is complete.
+#     - The index is written from worker threads and read on the main thread,
+#       so each database has one connection guarded by a lock.
+
+import os, json, sqlite3, threading, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Log entries fetched per page.
+PAGE_SIZE = 20
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS log (
+    path     TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    author   TEXT,
+    date     TEXT,
+    message  TEXT,
+    PRIMARY KEY (path, revision)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    path     TEXT PRIMARY KEY,
+    high     INTEGER NOT NULL,
+    low      INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS changes (
+    path     TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    report   TEXT NOT NULL,
+    PRIMARY KEY (path, revision)
+) WITHOUT ROWID;
+'''
+
+
+## Index of log entries for one repository
+#   Paths are repository-relative (e.g. '/trunk/shot.blend').
+class HistoryIndex:
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+    ## Return (high, low, complete) for path, or (None, None, False) if unknown
+    def coverage(self, path):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT high, low, complete FROM coverage WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return None, None, False
+        return row[0], row[1], bool(row[2])
+
+
+    def count(self, path):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM log WHERE path = ?', (path,)).fetchone()[0]
+
+
+    ## Return up to limit entries for path, newest first, starting at offset
+    #   Each entry is a (revision, author, date, message) tuple.
+    def page(self, path, offset=0, limit=PAGE_SIZE):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT revision, author, date, message FROM log WHERE path = ? '
+                'ORDER BY revision DESC LIMIT ? OFFSET ?', (path, limit, offset)).fetchall()
+
+
+    ## Store log entries fetched for the revision range high..low of path
+    #   complete marks that nothing older than low exists.
+    def store(self, path, entries, high, low, complete=False):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO log (path, revision, author, date, message) VALUES (?, ?, ?, ?, ?)',
+                [(path, entry.revision, entry.author, entry.date, entry.message) for entry in entries])
+
+            row = self._conn.execute(
+                'SELECT high, low, complete FROM coverage WHERE path = ?', (path,)).fetchone()
+            if row is not None:
+                high = max(high, row[0])
+                low = min(low, row[1])
+                complete = complete or bool(row[2])
+            self._conn.execute(
+                'INSERT OR REPLACE INTO coverage (path, high, low, complete) VALUES (?, ?, ?, ?)',
+                (path, high, low, int(complete)))
+
+        myLogger.debug('Stored %d log entries for %s (%s:%s, complete %s).', len(entries), path, high, low, complete)
+
+
+    ## Store the datablock change report (see blenddiff.py) of a revision
+    def storeChanges(self, path, revision, report):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO changes (path, revision, report) VALUES (?, ?, ?)',
+                (path, revision, json.dumps(report)))
+
+
+    ## Return {revision: report} for those of revisions which have one
+    def changes(self, path, revisions):
+        revisions = list(revisions)
+        if not revisions:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT revision, report FROM changes WHERE path = ? AND revision IN ({",".join("?"*len(revisions))})',
+                [path] + revisions).fetchall()
+        return {revision: json.loads(report) for revision, report in rows}
+
+
+## What the history panel currently shows
+#   Kept in memory so that draw() does not query the index.
+class HistoryView:
+
+    def __init__(self):
+        self.filepath  = None
+        self.uuid      = None
+        self.path      = None
+        self.offset    = 0
+        self.rows      = []
+        self.total     = 0
+        self.complete  = False
+        self.changes   = {}
+
+
+    ## Re-read the current page from index
+    def load(self, index, offset=None):
+        if offset is not None:
+            self.offset = max(0, offset)
+        self.rows = index.page(self.path, self.offset, PAGE_SIZE)
+        self.total = index.count(self.path)
+        self.complete = index.coverage(self.path)[2]
+        self.changes = index.changes(self.path, [row[0] for row in self.rows])
+
+
+    ## Whether showing the next older page needs a fetch from the repository
+    def needsOlder(self):
+        return not self.complete and self.offset + PAGE_SIZE >= self.total
+
+
+#########################
+###  Connection Pool  ###
+#########################
+
+_pool = {}
+_pool_lock = threading.Lock()
+
+
+## Return the HistoryIndex for the repository with the given UUID
+def getHistoryIndex(cache_dir, uuid):
+    with _pool_lock:
+        index = _pool.get(uuid)
+        if index is None:
+            os.makedirs(cache_dir, exist_ok=True)
+            index = HistoryIndex(os.path.join(cache_dir, f'history_{uuid}.sqlite'))
+            _pool[uuid] = index
+        return index
+
+
+def closeAll():
+    with _pool_lock:
+        for index in _pool.values():
+            index.close()
+        _pool.clear()
@@ -0,0 +1,440 @@
+## Background job engine for the SVN Connector add-on
+#
+#    svn operations on large .blend files can take minutes (e.g. committing
+#    a multi-hundred-MB binary). Running them inside Operator.execute() freezes
+#    Blender until svn finishes, so the work is run on worker threads instead.
+#
+#    Notes:
+#     - Worker functions take the Job as their first argument and must not touch
+#       bpy. They use Job.runProcess() so that a cancel can kill the child.
+#     - Output is read as it arrives. A child which prints nothing for
+#       Job.timeout seconds is killed (a hung network, a locked working copy).
+#       Commands which change the working copy pass a cleanup command, which
+#       is run after such a kill so no stale wc lock is left behind.
+#     - Finished jobs are handed back to the main thread by JobEngine.pump(),
+#       which the add-on calls from a bpy.app.timers callback.
+#     - A job may run several children at once from its own threads (see
+#       svnbatch.py); a cancel kills all of them.
+#     - ModalJobMixin provides the modal() loop shared by the operators which
+#       run jobs. It only uses the context it is given so this module does not
+#       need to import bpy. Without a window (e.g. an operator called from a
+#       script in background mode) it waits for the job and delivers it itself.
+
+import threading, subprocess, tempfile, queue, time, logging
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import svntrace
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Seconds between checks for finished jobs while any are running.
+PUMP_INTERVAL = 0.1
+
+## Bytes read at a time by Job.streamProcess().
+STREAM_CHUNK_SIZE = 1024*1024
+
+## Default seconds a child may go without output before it is killed.
+PROCESS_TIMEOUT = 600
+
+## Seconds allowed for the cleanup command run after a kill.
+CLEANUP_TIMEOUT = 120
+
+## Seconds between checks of the output timeout.
+WATCHDOG_INTERVAL = 0.5
+
+
+## Raised inside a worker when its job has been cancelled
+class JobCancelled(Exception):
+    pass
+
+
+## Raised inside a worker when a child process went quiet for too long
+class ProcessTimeout(Exception):
+    pass
+
+
+## Calls expire() once touch() has not been called for timeout seconds
+#   With timeout None (or 0) it never expires and no thread is started.
+class Watchdog:
+
+    def __init__(self, timeout, expire):
+        self.timeout = timeout
+        self.expire  = expire
+        self.expired = False
+
+        self._touched = time.monotonic()
+        self._stopped = threading.Event()
+        if timeout:
+            threading.Thread(target=self._run, name='svnconnector-watchdog', daemon=True).start()
+
+
+    def touch(self):
+        self._touched = time.monotonic()
+
+
+    def stop(self):
+        self._stopped.set()
+
+
+    def _run(self):
+        while not self._stopped.wait(WATCHDOG_INTERVAL):
+            if time.monotonic() - self._touched > self.timeout:
+                self.expired = True
+                self.expire()
+                return
+
+
+## Progress of an svn command, read from its text output
+#   svn prints a line per path it sends, adds or updates and, while it is
+#   'Transmitting file data', a dot per file on one line. Each line and each
+#   dot is a step of total. Only the line count is used, so this works
+#   whatever language svn prints in. With total None only the message changes.
+class SvnProgress:
+
+    def __init__(self, job, total=None, start=0.0, end=1.0, label=''):
+        self.job   = job
+        self.total = total
+        self.start = start
+        self.end   = end
+        self.label = label
+        self.lines = 0
+
+        self._partial = b''
+        self._last    = ''
+
+
+    def __call__(self, chunk):
+        lines = (self._partial + chunk).split(b'\n')
+        self._partial = lines.pop()
+        lines = [line for line in lines if line.strip()]
+        self.lines += len(lines)
+        if lines:
+            self._last = lines[-1].decode('utf-8', errors='replace').strip()
+
+        dots = len(self._partial) - len(self._partial.rstrip(b'.'))
+        current = self._partial.decode('utf-8', errors='replace').strip() or self._last
+
+        fraction = self.job.progress
+        if self.total:
+            fraction = self.start + (self.end-self.start)*min((self.lines+dots)/self.total, 1.0)
+        self.job.setProgress(fraction, f'{self.label}{current}' if self.label else current)
+
+
+## A unit of svn work run on a worker thread
+#   func(job, *args) is called on the worker and its return value is stored in
+#   result. Progress is reported through setProgress() and read by the UI.
+class Job:
+
+    def __init__(self, name, func, args=(), on_done=None, timeout=None):
+        self.name      = name
+        self.func      = func
+        self.args      = args
+        self.on_done   = on_done
+        self.timeout   = timeout  # Seconds without output before a child is killed
+
+        self.progress  = 0.0
+        self.message   = ''
+        self.result    = None
+        self.error     = None
+        self.finished  = False   # Set on the worker thread
+        self.delivered = False   # Set on the main thread by JobEngine.pump() or deliver()
+        self.engine    = None    # The JobEngine running it
+
+        self._cancel    = threading.Event()
+        self._done      = threading.Event()
+        self._processes = set()
+        self._lock      = threading.Lock()
+
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+
+    ## Request cancellation and kill any running child processes
+    def cancel(self):
+        myLogger.info(f'Cancelling job \'{self.name}\'.')
+        self._cancel.set()
+        with self._lock:
+            for process in self._processes:
+                if process.poll() is None:
+                    process.kill()
+
+
+    ## Block until the job has finished. Returns False on timeout.
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+    ## Raise JobCancelled if cancel() has been called
+    #   Workers should call this between steps.
+    def checkCancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+
+    def setProgress(self, fraction, message=''):
+        self.progress = max(0.0, min(1.0, fraction))
+        self.message = message
+        myLogger.debug('Job \'%s\' progress %.0f%%: %s', self.name, self.progress*100, message)
+
+
+    ## Run a command on behalf of this job
+    #   Returns (returncode, stdout, stderr) with the outputs as bytes.
+    #   progress(chunk), e.g. an SvnProgress, sees stdout as it arrives.
+    #   cleanup is a command run if the child has to be killed.
+    #   timeout overrides self.timeout for this child; 0 means no limit.
+    #   input (bytes) is written to the child's stdin, e.g. a password.
+    def runProcess(self, command, progress=None, cleanup=None, timeout=None, input=None):
+        chunks = []
+
+        def collect(chunk):
+            chunks.append(chunk)
+            if progress is not None:
+                progress(chunk)
+
+        returncode, stderr = self.streamProcess(command, collect, cleanup=cleanup, timeout=timeout, input=input)
+        return returncode, b''.join(chunks), stderr
+
+
+    ## Run a command and pass its stdout to write() in chunks as it arrives
+    #   For outputs too large to hold in memory (e.g. 'svn cat' of a .blend).
+    #   If write() returns True the rest is not needed and the process is
+    #   killed. Returns (returncode, stderr) with stderr as bytes.
+    #   Raises ProcessTimeout if the child printed nothing for self.timeout
+    #   (or timeout) seconds; it is then killed and cleanup run, as on a cancel.
+    #   Without input the child's stdin is empty, so it cannot wait on Blender's console.
+    def streamProcess(self, command, write, chunk_size=STREAM_CHUNK_SIZE, cleanup=None, timeout=None, input=None):
+        self.checkCancelled()
+        # stderr goes to a file so that a chatty stderr cannot block the child
+        # while we are still reading stdout.
+        with tempfile.TemporaryFile() as errfile:
+            with self._lock:
+                process = svntrace.Popen(command,
+                                    stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+                                    stdout=subprocess.PIPE,
+                                    stderr=errfile)
+                self._processes.add(process)
+            if input is not None:
+                # Small enough for the pipe buffer, so it cannot block on the child.
+                try:
+                    process.stdin.write(input)
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            watchdog = Watchdog(self.timeout if timeout is None else timeout, process.kill)
+            try:
+                for chunk in iter(lambda: process.stdout.read1(chunk_size), b''):
+                    watchdog.touch()
+                    process.countOutput(len(chunk))
+                    if write(chunk):
+                        process.kill()
+                        break
+                    self.checkCancelled()
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                watchdog.stop()
+                process.stdout.close()
+                process.wait()
+                with self._lock:
+                    self._processes.discard(process)
+                if cleanup is not None and (self.cancelled or watchdog.expired):
+                    self._cleanup(cleanup)
+
+            errfile.seek(0)
+            stderr = errfile.read()
+
+        if watchdog.expired:
+            raise ProcessTimeout(f'\'{" ".join(command[:2])}\' printed nothing for {watchdog.timeout} seconds and was stopped.')
+        self.checkCancelled()
+        return process.returncode, stderr
+
+
+    ## Run a cleanup command after a child was killed, e.g. 'svn cleanup'
+    def _cleanup(self, command):
+        myLogger.info(f'Running \'{" ".join(command)}\' after stopping job \'{self.name}\'.')
+        try:
+            with svntrace.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as process:
+                try:
+                    stdout, stderr = process.communicate(timeout=CLEANUP_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    raise
+            if process.returncode!=0:
+                myLogger.error(f'Cleanup failed: {stderr.decode("utf-8", errors="replace")}')
+        except (OSError, subprocess.TimeoutExpired) as error:
+            myLogger.error(f'Cleanup failed: {error}')
+
+
+    ## Run func in the calling thread and record its outcome
+    #   JobEngine calls this on a worker thread. The command line (svncli.py)
+    #   calls it directly, as there is no UI to keep responsive.
+    def run(self):
+        try:
+            scope, start = f'job:{self.name}', time.perf_counter()
+            with svntrace.scoped(scope):
+                try:
+                    self.result = self.func(self, *self.args)
+                finally:
+                    svntrace.tracer.entered(scope, time.perf_counter() - start)
+        except JobCancelled:
+            self.error = 'Cancelled.'
+            myLogger.info(f'Job \'{self.name}\' was cancelled.')
+        except ProcessTimeout as error:
+            self.error = str(error)
+            myLogger.error(f'Job \'{self.name}\' timed out: {error}')
+        except Exception as error:
+            self.error = f'{type(error).__name__}: {error}'
+            myLogger.exception(f'Job \'{self.name}\' failed.')
+        finally:
+            self.finished = True
+            self._done.set()
+
+
+## Runs Jobs on a thread pool and collects them for delivery to the main thread
+class JobEngine:
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='svnconnector')
+        self._finished = queue.Queue()
+        self._active = set()
+        self._lock = threading.Lock()
+
+        ## Output timeout given to new jobs; 0 disables it
+        self.process_timeout = PROCESS_TIMEOUT
+
+
+    def submit(self, name, func, *args, on_done=None):
+        job = Job(name, func, args, on_done, timeout=self.process_timeout or None)
+        job.engine = self
+        with self._lock:
+            self._active.add(job)
+        myLogger.info(f'Submitting job \'{name}\'.')
+        self._executor.submit(self._runJob, job)
+        return job
+
+
+    def _runJob(self, job):
+        job.run()
+        self._finished.put(job)
+
+
+    def isBusy(self):
+        with self._lock:
+            return len(self._active)>0
+
+
+    ## Deliver finished jobs. Must be called on the main thread.
+    #   Returns the interval until the next call, or None when idle, so that it
+    #   can be used directly as a bpy.app.timers callback.
+    def pump(self):
+        while True:
+            try:
+                job = self._finished.get_nowait()
+            except queue.Empty:
+                break
+
+            self._deliver(job)
+
+        return PUMP_INTERVAL if self.isBusy() else None
+
+
+    ## Wait for job and deliver it at once. Must be called on the main thread.
+    #   For callers which cannot wait for pump(), e.g. an operator run without
+    #   a window, where timers do not run.
+    def deliver(self, job):
+        job.wait()
+        self._deliver(job)
+
+
+    def _deliver(self, job):
+        # A job is delivered once, by whichever of pump() and deliver() gets it first.
+        with self._lock:
+            if job not in self._active:
+                return
+            self._active.discard(job)
+        job.delivered = True
+
+        if job.on_done is not None:
+            try:
+                job.on_done(job)
+            except Exception:
+                myLogger.exception(f'Completion callback for job \'{job.name}\' failed.')
+
+
+    def cancelAll(self):
+        with self._lock:
+            jobs = list(self._active)
+        for job in jobs:
+            job.cancel()
+
+
+## Shared modal loop for operators which run a Job
+#   The operator calls startJob() from execute() and implements
+#   jobFinished(context, job) to report the outcome.
+class ModalJobMixin:
+    _job   = None
+    _timer = None
+
+
+    def startJob(self, context, job):
+        self._job = job
+        if context.window is None:
+            # No timers run without a window, so nothing else would deliver it.
+            if job.engine is not None:
+                job.engine.deliver(job)
+            else:
+                job.wait()
+            return self.jobFinished(context, job)
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(PUMP_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+        return {'RUNNING_MODAL'}
+
+
+    def modal(self, context, event):
+        job = self._job
+
+        if event.type == 'ESC' and not job.cancelled:
+            job.cancel()
+            self.setStatusText(context, f'{self.bl_label}: cancelling...')
+            return {'RUNNING_MODAL'}
+
+        if event.type == 'TIMER':
+            if job.delivered:
+                self.endJob(context)
+                return self.jobFinished(context, job)
+
+            context.window_manager.progress_update(int(job.progress*100))
+            if not job.cancelled:
+                self.setStatusText(context, f'{self.bl_label}: {job.message} (Esc to cancel)')
+
+        return {'PASS_THROUGH'}
+
+
+    def cancel(self, context):
+        # Called by Blender if the operator is aborted, e.g. when the file is closed.
+        if self._job is not None and not self._job.finished:
+            self._job.cancel()
+        self.endJob(context)
+
+
+    def endJob(self, context):
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+        wm.progress_end()
+        self.setStatusText(context, None)
+
+
+    def setStatusText(self, context, text):
+        if context.workspace is not None:
+            context.workspace.status_text_set(text)
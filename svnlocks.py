@@ -0,0 +1,155 @@
+## Lock state cache for the SVN Connector add-on
+#
+#    .blend files are binary, so two artists' changes to one file cannot be
+#    merged. With several artists a file is locked ('svn lock') before it is
+#    edited, and svn:needs-lock keeps it read-only on disk until it is. Who
+#    holds a lock is only known to the server, so every answer costs a round
+#    trip. The last answer for each file is kept here and refreshed by a job
+#    in the background; draw() and the check before a commit only read it.
+#
+#    Notes:
+#     - One 'svn status -u -v --xml --depth empty' per file gives the lock
+#       token in the working copy, the lock in the repository and whether a
+#       newer revision is on the server.
+#     - An expired state is still shown until its refresh has finished.
+#     - A refresh that fails (e.g. offline) is stored too, with its error, so
+#       it is only retried once it has expired in turn.
+#     - This module must not import bpy so that it can be used off the main
+#       thread and outside of Blender.
+#
+#    Ref: https://svnbook.red-bean.com/en/1.7/svn.advanced.locking.html
+
+import threading, time, logging
+
+from . import svnremote
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Seconds before a lock state is refreshed from the server
+LOCK_TTL = 60
+
+## Seconds between checks for an expired lock state of the open file
+LOCK_POLL_INTERVAL = 2.0
+
+## svn error codes of the lock commands
+SVN_ERR_FS_PATH_ALREADY_LOCKED = 160035
+SVN_ERR_FS_BAD_LOCK_TOKEN      = 160038
+SVN_ERR_FS_LOCK_OWNER_MISMATCH = 160039
+SVN_ERR_FS_NO_SUCH_LOCK        = 160040
+SVN_ERR_FS_OUT_OF_DATE         = 160042
+
+## What to tell the user for the usual errors of a lock, unlock or commit
+LOCK_HINTS = {
+    **svnremote.ERROR_HINTS,
+    SVN_ERR_FS_PATH_ALREADY_LOCKED: 'Someone else holds the lock on this file. Ask them to commit or release it, or use "Steal Lock".',
+    SVN_ERR_FS_BAD_LOCK_TOKEN:      'The file is locked by someone else. It cannot be committed until the lock is released.',
+    SVN_ERR_FS_LOCK_OWNER_MISMATCH: 'The lock belongs to someone else. Use "Steal Lock" to take it.',
+    SVN_ERR_FS_NO_SUCH_LOCK:        'The file is not locked any more.',
+    SVN_ERR_FS_OUT_OF_DATE:         'A newer revision of the file is on the server. Return to Latest before locking it.',
+}
+
+## Kinds of lock, as the sixth column of 'svn status -u' shows them
+LOCK_NONE   = 'none'    # ' ' Nobody holds a lock
+LOCK_MINE   = 'mine'    # 'K' Locked through this working copy
+LOCK_OTHER  = 'other'   # 'O' Locked by someone else, or from another working copy
+LOCK_STOLEN = 'stolen'  # 'T' Locked through this working copy, then stolen
+LOCK_BROKEN = 'broken'  # 'B' Locked through this working copy, then released by someone else
+
+LOCK_LABELS = {
+    LOCK_NONE:   'Not locked',
+    LOCK_MINE:   'Locked by you',
+    LOCK_OTHER:  'Locked by {owner}',
+    LOCK_STOLEN: 'Your lock was taken by {owner}',
+    LOCK_BROKEN: 'Your lock was released by someone else',
+}
+
+
+## Last known lock state of a single file
+#   Errors are kept alongside values in the same way the svn helper
+#   functions return them as (error, result) pairs.
+class LockState:
+    __slots__ = ("filepath", "needs_lock", "token", "repos_token", "owner", "comment",
+                 "created", "out_of_date", "error", "timestamp")
+
+    def __init__(self, filepath):
+        self.filepath    = filepath
+        self.needs_lock  = False  # svn:needs-lock is set
+        self.token       = None   # Lock token held by the working copy
+        self.repos_token = None   # Lock token in the repository
+        self.owner       = ''     # Of the lock in the repository
+        self.comment     = ''
+        self.created     = ''
+        self.out_of_date = False  # A newer revision is on the server
+        self.error       = None
+        self.timestamp   = time.monotonic()
+
+
+    @property
+    def kind(self):
+        if self.token is None:
+            return LOCK_NONE if self.repos_token is None else LOCK_OTHER
+        if self.repos_token is None:
+            return LOCK_BROKEN
+        return LOCK_MINE if self.repos_token == self.token else LOCK_STOLEN
+
+
+    @property
+    def label(self):
+        return LOCK_LABELS[self.kind].format(owner=self.owner or 'someone else')
+
+
+    ## Why a commit of the file would be refused by the server, or None
+    def commitBlocker(self):
+        if self.error:
+            return None
+        kind = self.kind
+        if kind in (LOCK_OTHER, LOCK_STOLEN):
+            comment = f' ({self.comment.strip()})' if self.comment.strip() else ''
+            return f'{self.label}{comment}. It cannot be committed until the lock is released.'
+        if self.out_of_date:
+            return 'A newer revision of the file is on the server. Return to Latest before committing.'
+        return None
+
+
+## Cache of LockState entries keyed by file path
+#   Filled by put() from the refresh jobs; nothing here starts svn.
+class LockCache:
+
+    def __init__(self, ttl=LOCK_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+
+    def peek(self, filepath):
+        with self._lock:
+            return self._entries.get(filepath)
+
+
+    def put(self, state):
+        with self._lock:
+            self._entries[state.filepath] = state
+
+
+    ## Whether filepath has no state yet or its state has expired
+    def isStale(self, filepath):
+        with self._lock:
+            state = self._entries.get(filepath)
+        return state is None or (time.monotonic() - state.timestamp) >= self.ttl
+
+
+    ## Let the entry for filepath, or every entry, be refreshed at the next chance
+    #   The old state is kept, and shown, until then.
+    def expire(self, filepath=None):
+        with self._lock:
+            states = list(self._entries.values()) if filepath is None else [self._entries.get(filepath)]
+            for state in states:
+                if state is not None:
+                    state.timestamp = float('-inf')
+        myLogger.debug('Expired cached lock state for %s.', filepath or 'all files')
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,111 @@
+## Logging of the SVN Connector add-on
+#
+#    Records are written to the log file by a QueueListener thread. Logging
+#    calls on Blender's UI thread only put the record on a queue, so a draw or
+#    poll never waits for the disk.
+#
+#    Notes:
+#     - The log file is appended to and rotated at LOG_MAX_BYTES, keeping
+#       LOG_BACKUPS older files (svnconnector.log.1, ...). Each session starts
+#       with a 'Started session' line.
+#     - Messages below the level set in the add-on preferences are dropped by
+#       the logger before they are formatted. Pass the values as arguments,
+#       myLogger.debug('Got %d entries.', count), rather than formatting them
+#       into the message, and a disabled level costs one method call.
+#     - Only the add-on's own logger is configured; other loggers in Blender
+#       are left alone.
+#     - Several processes (e.g. the command line's workers) may append to the
+#       same file. Their lines interleave, and after one of them rotates the
+#       file the others keep writing to the rotated one until they rotate too.
+
+import os, queue, logging, logging.handlers, atexit
+
+
+LOGGER_NAME = 'com.codetestdummy.blender.svnconnector'
+
+myLogger = logging.getLogger(LOGGER_NAME)
+
+## Size at which the log file is rotated
+LOG_MAX_BYTES = 2*1024*1024
+
+## Rotated log files kept
+LOG_BACKUPS = 3
+
+## Levels offered in the add-on preferences
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+DEFAULT_LEVEL = 'INFO'
+
+LOG_FORMAT = '%(asctime)s %(name)s: %(levelname)s [%(threadName)s] %(message)s'
+
+
+## The add-on's queue handlers
+#   Found on the logger rather than kept here, so that a reload of this module
+#   still finds the handlers the previous one installed.
+def _queueHandlers():
+    return [handler for handler in myLogger.handlers if getattr(handler, 'svnlog_listener', None) is not None]
+
+
+## Start writing the add-on's log to path through a background thread
+#   Does nothing if it is already running, e.g. on a second register().
+def startLogging(path, level=DEFAULT_LEVEL):
+    if _queueHandlers():
+        setLevel(level)
+        return
+
+    logFile = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                   encoding='utf-8', delay=True)
+    logFile.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    records = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    handler.svnlog_listener = logging.handlers.QueueListener(records, logFile, respect_handler_level=True)
+    handler.svnlog_listener.start()
+
+    myLogger.addHandler(handler)
+    setLevel(level)
+
+
+## Write out the queued records and close the log file
+def stopLogging():
+    for handler in _queueHandlers():
+        myLogger.removeHandler(handler)
+        listener, handler.svnlog_listener = handler.svnlog_listener, None
+        listener.stop()
+        for target in listener.handlers:
+            target.close()
+
+
+def setLevel(level):
+    if level not in LEVELS:
+        myLogger.warning('Unknown log level \'%s\'. Using %s.', level, DEFAULT_LEVEL)
+        level = DEFAULT_LEVEL
+    myLogger.setLevel(level)
+
+
+## Stands in for the queue in a forked child: records are written at once
+class _DirectWriter:
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+
+
+    def put_nowait(self, record):
+        for target in self.handlers:
+            if record.levelno >= target.level:
+                target.handle(record)
+
+
+## A forked child (e.g. a command line worker) has the queue but not the thread
+#   reading it. Pool workers also leave through os._exit(), which skips atexit,
+#   so a child writes its records itself; it is not Blender's UI thread.
+def _writeDirectlyAfterFork():
+    for handler in _queueHandlers():
+        handler.queue = _DirectWriter(handler.svnlog_listener.handlers)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_writeDirectlyAfterFork)
+
+# The listener thread is a daemon; write out what is queued when Blender quits.
+atexit.register(stopLogging)
@@ -0,0 +1,126 @@
+## Repository creation profiles for the SVN Connector add-on
+#
+#    'svnadmin create' gives every repository the default FSFS settings, which
+#    are tuned for source code: small text files with long delta chains. A
+#    .blend is a large binary which is committed in full many times, so the
+#    profiles below trade some of that for faster commits and checkouts.
+#
+#    Notes:
+#     - Settings are written into the fsfs.conf created by svnadmin, keeping
+#       its comments; see that file for what each option does.
+#     - The shard size lives in db/format. It can only be changed while the
+#       repository holds nothing but r0, i.e. straight after creation.
+#     - Run benchmarks/bench_profiles.py to compare the profiles on your disk.
+#
+#    Ref: https://svn.apache.org/repos/asf/subversion/trunk/subversion/libsvn_fs_fs/fsfs.conf
+
+import os, re, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Profile name -> (label, description, fsfs.conf settings, shard size or None)
+#   Settings are {section: {option: value}}.
+PROFILES = {
+    "default": (
+        "svn defaults",
+        "Leave the repository as svnadmin creates it",
+        {},
+        None),
+    "binary_fast": (
+        "Large binaries, fast",
+        "lz4 compression and short delta chains. Quick commits and checkouts of old revisions, larger repository",
+        {"rep-sharing":  {"enable-rep-sharing": "true"},
+         "deltification": {"max-deltification-walk": "64",
+                           "max-linear-deltification": "4",
+                           "compression": "lz4"}},
+        1000),
+    "binary_compact": (
+        "Large binaries, compact",
+        "zlib compression and the default delta chains. Smallest repository, slower commits",
+        {"rep-sharing":  {"enable-rep-sharing": "true"},
+         "deltification": {"max-deltification-walk": "1023",
+                           "max-linear-deltification": "16",
+                           "compression": "zlib-5"}},
+        1000),
+    "binary_fulltext": (
+        "Compressed .blend files",
+        "Store every revision in full without recompressing. For .blend files saved with compression, which neither delta nor compress well",
+        {"rep-sharing":  {"enable-rep-sharing": "true"},
+         "deltification": {"max-deltification-walk": "0",
+                           "compression": "none"}},
+        100),
+}
+
+DEFAULT_PROFILE = "binary_fast"
+
+FSFS_CONF = os.path.join('db', 'fsfs.conf')
+FSFS_FORMAT = os.path.join('db', 'format')
+
+
+## Items for a bpy EnumProperty
+def profileItems():
+    return [(name, label, description) for name, (label, description, settings, shards) in PROFILES.items()]
+
+
+## Set options in an svn config file, keeping its layout and comments
+#   A commented-out option of the same name ('# option = ...') is replaced in
+#   place; anything else is added at the top of its section.
+def updateConfigFile(path, settings):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        lines = []
+
+    for section, options in settings.items():
+        header = f'[{section}]'
+        if header not in lines:
+            lines += ['', header]
+        start = lines.index(header) + 1
+        end = next((i for i in range(start, len(lines)) if lines[i].startswith('[')), len(lines))
+
+        for option, value in options.items():
+            pattern = re.compile(rf'^#?\s*{re.escape(option)}\s*=')
+            line = f'{option} = {value}'
+            for i in range(start, end):
+                if pattern.match(lines[i]):
+                    lines[i] = line
+                    break
+            else:
+                lines.insert(start, line)
+                end += 1
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+
+
+## Change the shard size of a freshly created FSFS repository
+def setShardSize(repoPath, shards):
+    path = os.path.join(repoPath, FSFS_FORMAT)
+    with open(path, 'r', encoding='ascii') as file:
+        text = file.read()
+    if not re.search(r'^layout sharded \d+$', text, re.MULTILINE):
+        myLogger.info(f'Repository {repoPath} is not sharded. Keeping its layout.')
+        return
+    with open(path, 'w', encoding='ascii') as file:
+        file.write(re.sub(r'^layout sharded \d+$', f'layout sharded {shards}', text, flags=re.MULTILINE))
+
+
+## Apply a profile to a repository created moments ago by 'svnadmin create'
+#   Returns an error message, or None.
+def applyProfile(repoPath, name):
+    if name not in PROFILES:
+        return f'Unknown repository profile \'{name}\'.'
+    label, description, settings, shards = PROFILES[name]
+
+    try:
+        if settings:
+            updateConfigFile(os.path.join(repoPath, FSFS_CONF), settings)
+        if shards is not None:
+            setShardSize(repoPath, shards)
+    except OSError as error:
+        return f'Could not apply repository profile \'{label}\': {error}'
+
+    myLogger.info(f'Applied repository profile \'{label}\' to {repoPath}.')
+    return None
@@ -0,0 +1,236 @@
+## Remote repositories for the SVN Connector add-on
+#
+#    In remote mode new projects are imported into a folder of a repository on
+#    a server (svn://, svn+ssh://, http:// or https://) rather than into a
+#    repository created locally with svnadmin.
+#
+#    Notes:
+#     - Every svn command runs with --non-interactive. svn never waits for an
+#       answer on Blender's console; a missing password is an error instead.
+#     - Credentials are cached by svn itself, in its auth area (keyring,
+#       keychain, Windows credential store or ~/.subversion/auth, as svn is
+#       built and configured). 'Log in to Server' runs one svn command with
+#       the user name and the password, the password fed on stdin, and svn
+#       stores them. Later commands, and the RA sessions below, find them
+#       there.
+#     - Each svn process opens a connection of its own and pays the handshake
+#       and authentication again. Two things save most of them:
+#        - With the SWIG bindings, RaSessionPool keeps one RA session per
+#          repository open in-process. The history and 'is there anything
+#          newer' checks go through it instead of starting svn.
+#        - With an svn+ssh:// server URL, svn's ssh tunnels share one
+#          connection through OpenSSH's connection multiplexing, kept open
+#          SSH_PERSIST seconds after the last command.
+#     - Nothing here imports bpy.
+#
+#    Ref: https://svnbook.red-bean.com/en/1.7/svn.serverconfig.netmodel.html#svn.serverconfig.netmodel.credcache
+
+import os, re, threading, logging, urllib.parse
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+REMOTE_SCHEMES = ('svn', 'svn+ssh', 'http', 'https')
+
+## Seconds a shared ssh connection stays open after its last command
+SSH_PERSIST = 300
+
+## svn error codes we need to tell apart
+SVN_ERR_RA_ILLEGAL_URL             = 170000
+SVN_ERR_RA_NOT_AUTHORIZED          = 170001
+SVN_ERR_RA_CANNOT_CREATE_SESSION   = 170013
+SVN_ERR_RA_SVN_CONNECTION_CLOSED   = 210002
+SVN_ERR_RA_SVN_IO_ERROR            = 210003
+SVN_ERR_AUTHN_FAILED               = 215004
+SVN_ERR_RA_DAV_REQUEST_FAILED      = 175002
+SVN_ERR_RA_SERF_SSL_CERT_UNTRUSTED = 230001
+
+## Errors after which an idle RA session is reopened and the call retried once
+RECONNECT_ERRORS = (SVN_ERR_RA_SVN_CONNECTION_CLOSED, SVN_ERR_RA_SVN_IO_ERROR, SVN_ERR_RA_DAV_REQUEST_FAILED)
+
+## What to tell the user for the usual errors of a remote command
+ERROR_HINTS = {
+    SVN_ERR_RA_NOT_AUTHORIZED:          'The server refused the user name or password. Use "Log in to Server".',
+    SVN_ERR_AUTHN_FAILED:               'The server wants a user name and password. Use "Log in to Server".',
+    SVN_ERR_RA_CANNOT_CREATE_SESSION:   'Could not connect to the server. Check the server URL and your network.',
+    SVN_ERR_RA_SVN_CONNECTION_CLOSED:   'The server closed the connection. Check the server URL and your network.',
+    SVN_ERR_RA_SERF_SSL_CERT_UNTRUSTED: 'The server\'s certificate is not trusted. Accept it once with \'svn info URL\' in a terminal.',
+}
+
+## svn config folder (--config-dir), None for svn's default
+#   The benchmarks point it at their work directory, so that the credentials
+#   they use are not stored in the user's own svn config.
+configDir = None
+
+
+def isRemoteUrl(url):
+    return urllib.parse.urlsplit(str(url)).scheme in REMOTE_SCHEMES
+
+
+def isSshUrl(url):
+    return urllib.parse.urlsplit(str(url)).scheme == 'svn+ssh'
+
+
+## base with the path segments names appended, quoted for a URL
+def joinUrl(base, *names):
+    return '/'.join([base.rstrip('/')] + [urllib.parse.quote(name) for name in names])
+
+
+## Options added to every svn command (not svnadmin)
+#   With share_ssh, svn+ssh:// commands share one ssh connection.
+def commandOptions(share_ssh):
+    options = ['--non-interactive']
+    if configDir:
+        options += ['--config-dir', configDir]
+    if share_ssh and os.name != 'nt':
+        # svn splits the tunnel command at spaces, so the control path must not
+        # contain any; ssh expands ~ and %C (a hash of host, port and user).
+        options += ['--config-option', 'config:tunnels:ssh=ssh -q -o ControlMaster=auto '
+                    f'-o ControlPath=~/.ssh/svnconnector-%C -o ControlPersist={SSH_PERSIST}']
+    return options
+
+
+## Options logging in as username; the password goes to svn's stdin
+#   svn keeps the credentials in its auth area, as configured, for later commands.
+def loginOptions(username):
+    return ['--username', username, '--password-from-stdin',
+            '--config-option', 'servers:global:store-auth-creds=yes',
+            '--config-option', 'servers:global:store-passwords=yes']
+
+
+## The svn error codes in stderr, e.g. [170001, 215004]
+def errorCodes(stderr):
+    return [int(code) for code in re.findall(r'\b[EW](\d{6}):', stderr)]
+
+
+## A message for the user for the stderr of a failed remote command
+#   hints maps error codes to the message, as ERROR_HINTS does.
+def explainError(stderr, hints=ERROR_HINTS):
+    for code in errorCodes(stderr):
+        if code in hints:
+            return f'{hints[code]}\n{stderr.strip()}'
+    return stderr
+
+
+def _text(value):
+    return value.decode('utf-8', errors='replace') if isinstance(value, bytes) else (value or '')
+
+
+## One log entry read through an RA session, shaped like svnxml.LogEntry
+class RaLogEntry:
+    __slots__ = ("revision", "author", "date", "message")
+
+    def __init__(self, revision, author, date, message):
+        self.revision = revision
+        self.author   = author
+        self.date     = date
+        self.message  = message
+
+
+## RA sessions kept open across calls, one per repository root URL
+#   The bindings are not thread safe, so calls are serialised. Credentials
+#   come from svn's auth area and nothing is ever prompted for. Every method
+#   returns (error, result); a result of None with no error means the
+#   installed bindings could not answer (e.g. a missing wrapper in an old
+#   build) and svn should be run instead.
+class RaSessionPool:
+
+    def __init__(self):
+        from svn import core, ra, client
+        self._core   = core
+        self._ra     = ra
+        self._client = client
+
+        self._lock     = threading.Lock()
+        self._pool     = core.Pool()
+        self._sessions = {}
+
+        core.svn_config_ensure(configDir, self._pool)
+        self._config = core.svn_config_get_config(configDir, self._pool)
+
+        providers = core.svn_auth_get_platform_specific_client_providers(
+                        self._config.get(core.SVN_CONFIG_CATEGORY_CONFIG), self._pool)
+        providers += [client.get_simple_provider(self._pool),
+                      client.get_username_provider(self._pool),
+                      client.get_ssl_server_trust_file_provider(self._pool),
+                      client.get_ssl_client_cert_file_provider(self._pool),
+                      client.get_ssl_client_cert_pw_file_provider(self._pool)]
+        self._auth = core.svn_auth_open(providers, self._pool)
+        core.svn_auth_set_parameter(self._auth, core.SVN_AUTH_PARAM_NON_INTERACTIVE, '')
+        if configDir:
+            core.svn_auth_set_parameter(self._auth, core.SVN_AUTH_PARAM_CONFIG_DIR, configDir)
+
+        myLogger.info('Keeping RA sessions open for remote repositories.')
+
+
+    def _open(self, root):
+        callbacks = self._ra.Callbacks()
+        callbacks.auth_baton = self._auth
+        session = self._ra.open2(root, callbacks, self._config, self._pool)
+        myLogger.info(f'Opened RA session for \'{root}\'.')
+        return session
+
+
+    ## Run func(session) on the session for root, opening it if needed
+    #   A session the server has closed meanwhile is reopened once.
+    def _call(self, root, func):
+        with self._lock:
+            for attempt in (1, 2):
+                session = self._sessions.get(root)
+                try:
+                    if session is None:
+                        session = self._sessions[root] = self._open(root)
+                    return None, func(session)
+                except self._core.SubversionException as error:
+                    self._sessions.pop(root, None)
+                    if attempt == 1 and session is not None and error.apr_err in RECONNECT_ERRORS:
+                        myLogger.info(f'RA session for \'{root}\' was closed ({error}). Reconnecting.')
+                        continue
+                    return explainError(f'E{error.apr_err}: {error}'), None
+                except (AttributeError, TypeError) as error:
+                    myLogger.debug('Bindings could not use an RA session (%s). Using svn.', error)
+                    return None, None
+
+
+    ## Youngest revision of the repository at root
+    def latestRevision(self, root):
+        return self._call(root, lambda session: int(self._ra.get_latest_revnum(session)))
+
+
+    ## Log entries of repos_path (e.g. '/trunk/shot.blend'), newest first
+    #   start None is HEAD. limit None is no limit.
+    def log(self, root, repos_path, start, end, limit=None):
+        def run(session):
+            # Made here, as _call() runs this again on a fresh session after a failure.
+            entries = []
+
+            def receiver(log_entry, pool=None):
+                revprops = {_text(name): _text(value) for name, value in (log_entry.revprops or {}).items()}
+                entries.append(RaLogEntry(int(log_entry.revision), revprops.get('svn:author', ''),
+                                          revprops.get('svn:date', ''), revprops.get('svn:log', '')))
+
+            head = self._ra.get_latest_revnum(session) if start is None else start
+            self._ra.get_log2(session, [repos_path.lstrip('/')], head, end, limit or 0,
+                              False,  # discover_changed_paths
+                              False,  # strict_node_history, as 'svn log' follows copies
+                              False,  # include_merged_revisions
+                              ['svn:author', 'svn:date', 'svn:log'], receiver)
+            return entries
+
+        return self._call(root, run)
+
+
+    def closeAll(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+## Return a RaSessionPool, or None if the bindings are not available
+def createSessionPool():
+    try:
+        return RaSessionPool()
+    except ImportError:
+        myLogger.info('svn bindings not available. Remote queries run svn.')
+    except Exception as error:
+        myLogger.warning(f'RA sessions could not be initialised ({error}). Remote queries run svn.')
+    return None
@@ -0,0 +1,116 @@
+## Scheduling of automatic save points for the SVN Connector add-on
+#
+#    With auto-commit enabled, every save of a .blend is noted here and a
+#    commit is made once the saves have settled down. The add-on drives the
+#    scheduler from a save_post handler and a bpy.app.timers callback; the
+#    commits themselves run as background jobs.
+#
+#    Rules, per file:
+#     - A commit is due once no save has happened for `delay` seconds (so a
+#       burst of Ctrl+S is one save point) and at least `min_interval` seconds
+#       have passed since the last save point.
+#     - Once `max_pending` saves are waiting, a commit is due immediately, so
+#       a long session of frequent saves still gets save points.
+#     - A failed commit is retried after `min_interval`.
+
+import time, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+
+## Saves of one file which have not been committed yet
+class PendingSaves:
+    __slots__ = ("first", "last", "count")
+
+    def __init__(self, now):
+        self.first = now
+        self.last  = now
+        self.count = 0
+
+
+class SavePointScheduler:
+
+    def __init__(self, delay, min_interval, max_pending, clock=time.monotonic):
+        self.delay        = delay
+        self.min_interval = min_interval
+        self.max_pending  = max_pending
+        self.clock        = clock
+
+        self._pending     = {}    # filepath -> PendingSaves
+        self._running     = {}    # filepath -> PendingSaves being committed
+        self._last_commit = {}    # filepath -> time of the last save point
+        self._retry_at    = {}    # filepath -> earliest retry after a failure
+
+
+    ## Record a save of filepath
+    def noteSave(self, filepath):
+        now = self.clock()
+        pending = self._pending.get(filepath)
+        if pending is None:
+            pending = self._pending[filepath] = PendingSaves(now)
+        pending.last = now
+        pending.count += 1
+        myLogger.debug('Save point pending for %s (%s saves).', filepath, pending.count)
+
+
+    def hasPending(self):
+        return len(self._pending)>0
+
+
+    ## Seconds until filepath is due (0 if it is), ignoring files being committed
+    def _wait(self, filepath, pending, now):
+        retry = self._retry_at.get(filepath, now) - now
+        if pending.count >= self.max_pending:
+            return max(0.0, retry)
+        settled = pending.last + self.delay
+        allowed = self._last_commit.get(filepath, float('-inf')) + self.min_interval
+        return max(0.0, retry, settled - now, allowed - now)
+
+
+    ## Return a file whose save point is due, or None
+    def due(self):
+        now = self.clock()
+        for filepath, pending in self._pending.items():
+            if filepath not in self._running and self._wait(filepath, pending, now) <= 0.0:
+                return filepath
+        return None
+
+
+    ## Seconds until the next file will be due, or None if nothing is pending
+    def nextCheck(self):
+        now = self.clock()
+        waits = [self._wait(filepath, pending, now) for filepath, pending in self._pending.items()
+                 if filepath not in self._running]
+        return min(waits) if waits else None
+
+
+    ## A commit of filepath has been started
+    #   Saves made while it runs are collected for the next save point.
+    def started(self, filepath):
+        self._running[filepath] = self._pending.pop(filepath)
+
+
+    ## A commit of filepath has finished
+    def finished(self, filepath, success):
+        pending = self._running.pop(filepath, None)
+        now = self.clock()
+        if success:
+            self._last_commit[filepath] = now
+            self._retry_at.pop(filepath, None)
+            return
+
+        self._retry_at[filepath] = now + self.min_interval
+        if pending is None:
+            return
+
+        # Put the saves back so the save point is retried.
+        newer = self._pending.get(filepath)
+        if newer is not None:
+            pending.last = newer.last
+            pending.count += newer.count
+        self._pending[filepath] = pending
+
+
+    def clear(self):
+        self._pending.clear()
@@ -0,0 +1,89 @@
+## Sparse working copies for the SVN Connector add-on
+#
+#    Projects keep large texture, cache and render folders next to their
+#    .blend files. A sparse working copy (svn's --depth) holds only the folders
+#    an artist needs, which keeps checkout, update and status fast and saves
+#    disk space.
+#
+#    Notes:
+#     - Depths are read from wc.db (see wcdb.py). svn only runs to change them.
+#     - Folders are only deepened automatically, to 'files'. Making a folder
+#       shallower or excluding it removes files from disk and is left to the
+#       user. Excluded folders stay excluded.
+#
+#    Ref: https://svnbook.red-bean.com/en/1.8/svn.advanced.sparsedirs.html
+
+import os, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## svn depths, shallowest first
+DEPTHS = ('exclude', 'empty', 'files', 'immediates', 'infinity')
+
+DEPTH_LABELS = {
+    'exclude':    'Excluded',
+    'empty':      'Folder only',
+    'files':      'Files',
+    'immediates': 'Files and folders',
+    'infinity':   'Everything',
+}
+
+## Depth given to folders which hold a referenced file
+EXPAND_DEPTH = 'files'
+
+
+## Items for a bpy EnumProperty
+def depthItems():
+    return [(depth, DEPTH_LABELS[depth], f'--depth {depth}') for depth in DEPTHS]
+
+
+def isShallower(depth, other):
+    return DEPTHS.index(depth) < DEPTHS.index(other)
+
+
+## Path of abspath relative to wc_root in wc.db form ('' is the root)
+def relpath(abspath, wc_root):
+    path = os.path.relpath(abspath, wc_root)
+    return '' if path == '.' else path.replace(os.sep, '/')
+
+
+## relpath and each of its parents up to the root, innermost first
+def _chain(path):
+    chain = [path]
+    while path:
+        path = path.rpartition('/')[0]
+        chain.append(path)
+    return chain
+
+
+## Folders to deepen so that the files at paths are in the working copy
+#   depthsOf(relpaths) returns {relpath: depth} for those relpaths which are
+#   versioned directories (see wcdb.WcDb.depthsOf). Returns absolute folder
+#   paths for 'svn update --parents --set-depth files'.
+def foldersToExpand(paths, wc_root, depthsOf):
+    root = os.path.join(os.path.normpath(wc_root), '')
+    folders = {relpath(os.path.dirname(os.path.normpath(path)), wc_root)
+               for path in paths if os.path.normpath(path).startswith(root)}
+    if not folders:
+        return []
+
+    depths = depthsOf({parent for folder in folders for parent in _chain(folder)})
+
+    expand = []
+    for folder in sorted(folders):
+        depth = depths.get(folder)
+        if depth is not None:
+            if depth == 'empty':
+                expand.append(folder)
+            continue
+
+        # Not in the working copy. Whether it may exist in the repository
+        # depends on the innermost folder which is.
+        nearest = next((depths[parent] for parent in _chain(folder)[1:] if parent in depths), None)
+        if nearest in ('empty', 'files'):
+            expand.append(folder)
+        elif nearest == 'exclude':
+            myLogger.debug('Not expanding %s: excluded by the user.', folder)
+
+    return [os.path.join(wc_root, *folder.split('/')) for folder in expand]
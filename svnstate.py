@@ -0,0 +1,98 @@
+## Working copy state cache for the SVN Connector add-on
+#
+#    Panel draw() and operator poll() are called by Blender on every redraw
+#    of the viewport and menus. Asking svn for the state of the open file each
+#    time means several processes per redraw on the UI thread, so the last
+#    known state of each file is held here instead.
+#
+#    Notes:
+#     - Entries are dropped explicitly by the add-on's own operators and by the
+#       load_post/save_post handlers.
+#     - A TTL is kept as a fallback for changes made outside of Blender
+#       (e.g. a commit from the command line).
+#     - This module must not import bpy so that it can be used off the main
+#       thread and outside of Blender.
+
+import threading, time, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Seconds before a cached entry is considered stale.
+DEFAULT_TTL = 10.0
+
+
+## Last known svn state of a single file
+#   Errors are kept alongside values in the same way the svn helper
+#   functions return them as (error, result) pairs.
+class FileState:
+    __slots__ = ("filepath", "has_working_set", "wc_root", "wc_root_err",
+                 "status", "status_err", "revision", "revision_err", "timestamp")
+
+    def __init__(self, filepath):
+        self.filepath        = filepath
+        self.has_working_set = False
+        self.wc_root         = None
+        self.wc_root_err     = None
+        self.status          = None
+        self.status_err      = None
+        self.revision        = None
+        self.revision_err    = None
+        self.timestamp       = time.monotonic()
+
+
+## Cache of FileState entries keyed by file path
+#   loader(filepath) is called on a miss or when the entry has expired and
+#   must return a populated FileState.
+class StateCache:
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, filepath, loader):
+        now = time.monotonic()
+        with self._lock:
+            state = self._entries.get(filepath)
+            if state is not None and (now - state.timestamp) < self.ttl:
+                self.hits += 1
+                return state
+            self.misses += 1
+
+        # Load outside of the lock. Two concurrent misses may both load,
+        # which is harmless; the later result wins.
+        state = loader(filepath)
+        with self._lock:
+            self._entries[filepath] = state
+        return state
+
+
+    def peek(self, filepath):
+        with self._lock:
+            return self._entries.get(filepath)
+
+
+    ## Drop the entry for filepath, or every entry if filepath is None
+    def invalidate(self, filepath=None):
+        with self._lock:
+            if filepath is None:
+                self._entries.clear()
+                myLogger.debug('Invalidated all cached svn states.')
+            else:
+                self._entries.pop(str(filepath), None)
+                myLogger.debug('Invalidated cached svn state for %s.', filepath)
+
+
+    ## Drop every entry which belongs to the working copy at wc_root
+    def invalidateWorkingCopy(self, wc_root):
+        wc_root = str(wc_root)
+        with self._lock:
+            stale = [key for key, state in self._entries.items()
+                     if state.wc_root == wc_root or key.startswith(wc_root)]
+            for key in stale:
+                del self._entries[key]
+        myLogger.debug('Invalidated %d cached svn states under %s.', len(stale), wc_root)
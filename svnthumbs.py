@@ -0,0 +1,76 @@
+## Cache of the thumbnails embedded in each revision of a .blend
+#
+#    The history panel shows the preview image Blender saved with every
+#    revision. Thumbnails are read once per revision (see blendfile.py) and
+#    written to PNG files which Blender can load as icons.
+#
+#    Notes:
+#     - Files are kept under <cache_dir>/<repository UUID>/<hash of path>/ and
+#       named after the revision, so they are keyed by repository path and
+#       revision.
+#     - Revisions saved without a thumbnail get an empty '.none' marker so they
+#       are not fetched again.
+
+import os, struct, zlib, hashlib, logging
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _pngChunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+## Write RGBA pixels as a PNG file
+#   Blender stores rows bottom to top, PNG top to bottom.
+def writePng(path, width, height, pixels):
+    stride = width*4
+    rows = b''.join(b'\x00' + pixels[y*stride:(y+1)*stride] for y in reversed(range(height)))
+
+    temp = path + '.tmp'
+    with open(temp, 'wb') as file:
+        file.write(PNG_SIGNATURE)
+        file.write(_pngChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        file.write(_pngChunk(b'IDAT', zlib.compress(rows)))
+        file.write(_pngChunk(b'IEND', b''))
+    os.replace(temp, path)
+
+
+class ThumbnailCache:
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+
+    def _base(self, uuid, path, revision):
+        key = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, uuid, key, f'r{revision}')
+
+
+    ## Path of the PNG for a revision (which may not exist)
+    def imagePath(self, uuid, path, revision):
+        return self._base(uuid, path, revision) + '.png'
+
+
+    ## True if a thumbnail is cached, False if the revision has none, None if unknown
+    def state(self, uuid, path, revision):
+        base = self._base(uuid, path, revision)
+        if os.path.isfile(base + '.png'):
+            return True
+        if os.path.isfile(base + '.none'):
+            return False
+        return None
+
+
+    ## Store a blendfile.Thumbnail for a revision, or record that it has none
+    def store(self, uuid, path, revision, thumbnail):
+        base = self._base(uuid, path, revision)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        if thumbnail is None:
+            open(base + '.none', 'wb').close()
+            myLogger.debug('No thumbnail in %s@%s.', path, revision)
+        else:
+            writePng(base + '.png', thumbnail.width, thumbnail.height, thumbnail.pixels)
+            myLogger.debug('Cached %sx%s thumbnail of %s@%s.', thumbnail.width, thumbnail.height, path, revision)
@@ -0,0 +1,293 @@
+## Instrumentation of the processes started by the SVN Connector add-on
+#
+#    Every svn, svnadmin and helper process is started through svntrace.Popen.
+#    When the process has been waited for, it records a span: the command, the
+#    wall time, the bytes read from its stdout and the exit code.
+#
+#    Notes:
+#     - Spans are kept per command (e.g. 'svn status') in a ring buffer of
+#       SPAN_HISTORY entries, for the rolling p50/p95 shown in the SVN
+#       Diagnostics panel.
+#     - Each process is also counted against its scope, i.e. what caused it:
+#       an operator's poll/invoke/execute, a panel's draw or a job. Operators
+#       and panels enter their scope through the wrappers instrumentClass()
+#       installs; jobs enter theirs on their worker thread.
+#     - With a trace file set, each span is also appended to it as a JSON line.
+#     - Nothing here imports bpy.
+
+import os, json, time, threading, subprocess, logging
+
+from collections import deque
+from contextlib import contextmanager
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Spans kept per command for the latency percentiles
+SPAN_HISTORY = 200
+
+## Seconds over which processes per second are measured
+RATE_WINDOW = 10.0
+
+## Methods wrapped by instrumentClass(), with the number of arguments Blender
+#  expects them to take
+WRAPPED_METHODS = {'poll': 2, 'invoke': 3, 'execute': 2, 'draw': 2}
+
+_local = threading.local()
+
+
+## The scope the current thread is working for, or None
+def currentScope():
+    return getattr(_local, 'scope', None)
+
+
+## Run the body of a with statement in scope name
+@contextmanager
+def scoped(name):
+    previous = currentScope()
+    _local.scope = name
+    try:
+        yield
+    finally:
+        _local.scope = previous
+
+
+## Short name of a command for grouping, e.g. 'svn status' or 'python3 blenddiff.py'
+def commandKey(command):
+    key = os.path.basename(command[0])
+    if len(command)>1 and not command[1].startswith('-'):
+        key += ' ' + os.path.basename(command[1])
+    return key
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values)-1, int(round(fraction*(len(values)-1))))]
+
+
+## One finished process
+class Span:
+    __slots__ = ("command", "key", "scope", "thread", "start", "seconds", "output_bytes", "returncode")
+
+    def __init__(self, command, scope):
+        self.command      = [str(arg) for arg in command]
+        self.key          = commandKey(self.command)
+        self.scope        = scope
+        self.thread       = threading.current_thread().name
+        self.start        = time.time()
+        self.seconds      = None
+        self.output_bytes = 0
+        self.returncode   = None
+
+
+    def asDict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+## Calls of one scope and the processes they started
+class ScopeStats:
+    __slots__ = ("calls", "seconds", "processes")
+
+    def __init__(self):
+        self.calls     = 0
+        self.seconds   = 0.0
+        self.processes = 0
+
+
+## Collects spans and scope counters from every thread
+class Tracer:
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._trace = None
+        self.trace_path = None
+        self.reset()
+
+
+    def reset(self):
+        with self._lock:
+            self.spans   = {}       # key -> deque of Span
+            self.scopes  = {}       # scope -> ScopeStats
+            self.spawns  = deque()  # monotonic times of recent spawns
+            self.total   = 0
+            self.started = time.monotonic()
+
+
+    def _scope(self, name):
+        stats = self.scopes.get(name)
+        if stats is None:
+            stats = self.scopes[name] = ScopeStats()
+        return stats
+
+
+    def spawned(self, scope):
+        now = time.monotonic()
+        with self._lock:
+            self.total += 1
+            self.spawns.append(now)
+            while self.spawns and self.spawns[0] < now - RATE_WINDOW:
+                self.spawns.popleft()
+            self._scope(scope or 'other').processes += 1
+
+
+    def record(self, span):
+        with self._lock:
+            spans = self.spans.get(span.key)
+            if spans is None:
+                spans = self.spans[span.key] = deque(maxlen=SPAN_HISTORY)
+            spans.append(span)
+            if self._trace is not None:
+                try:
+                    self._trace.write(json.dumps(span.asDict()) + '\n')
+                    self._trace.flush()
+                except OSError as error:
+                    myLogger.error(f'Could not write trace file: {error}')
+                    self._trace = None
+
+
+    def entered(self, scope, seconds):
+        with self._lock:
+            stats = self._scope(scope)
+            stats.calls += 1
+            stats.seconds += seconds
+
+
+    ## Processes started per second over the last RATE_WINDOW seconds
+    def spawnRate(self):
+        now = time.monotonic()
+        with self._lock:
+            while self.spawns and self.spawns[0] < now - RATE_WINDOW:
+                self.spawns.popleft()
+            return len(self.spawns) / max(min(RATE_WINDOW, now - self.started), 1.0)
+
+
+    ## [(key, count, p50 seconds, p95 seconds)], most frequent first
+    def latencies(self):
+        with self._lock:
+            rows = [(key, [span.seconds for span in spans]) for key, spans in self.spans.items()]
+        rows = [(key, len(times), percentile(times, 0.5), percentile(times, 0.95)) for key, times in rows]
+        return sorted(rows, key=lambda row: -row[1])
+
+
+    ## [(scope, ScopeStats)], most processes first
+    def scopeStats(self):
+        with self._lock:
+            rows = list(self.scopes.items())
+        return sorted(rows, key=lambda row: (-row[1].processes, -row[1].calls))
+
+
+    ## Append every span to path as a JSON line from now on; '' stops it
+    #   Returns an error message or None.
+    def setTraceFile(self, path):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+            self.trace_path = None
+            if not path:
+                return None
+            try:
+                self._trace = open(path, 'a', encoding='utf-8')
+            except OSError as error:
+                myLogger.error(f'Could not open trace file \'{path}\': {error}')
+                return f'Could not open trace file: {error}'
+            self.trace_path = path
+        myLogger.info(f'Tracing processes to \'{path}\'.')
+        return None
+
+
+tracer = Tracer()
+
+
+## subprocess.Popen which records a span in tracer
+#   Callers reading stdout themselves report what they read with countOutput().
+class Popen(subprocess.Popen):
+
+    def __init__(self, command, *args, **kwargs):
+        self.span = Span(command, currentScope())
+        self._clock = time.perf_counter()
+        self._communicating = False
+        super().__init__(command, *args, **kwargs)
+        tracer.spawned(self.span.scope)
+
+
+    def countOutput(self, size):
+        self.span.output_bytes += size
+
+
+    def communicate(self, input=None, timeout=None):
+        self._communicating = True
+        try:
+            stdout, stderr = super().communicate(input, timeout)
+        finally:
+            self._communicating = False
+        self.countOutput(len(stdout or b''))
+        self._finish()
+        return stdout, stderr
+
+
+    def wait(self, timeout=None):
+        returncode = super().wait(timeout)
+        if not self._communicating:
+            self._finish()
+        return returncode
+
+
+    def poll(self):
+        returncode = super().poll()
+        if returncode is not None and not self._communicating:
+            self._finish()
+        return returncode
+
+
+    def _finish(self):
+        if self.span.seconds is None and self.returncode is not None:
+            self.span.seconds = time.perf_counter() - self._clock
+            self.span.returncode = self.returncode
+            tracer.record(self.span)
+
+
+def _wrap(func, scope, arity):
+
+    def call(args):
+        start = time.perf_counter()
+        with scoped(scope):
+            try:
+                return func(*args)
+            finally:
+                tracer.entered(scope, time.perf_counter() - start)
+
+    # Blender checks the number of arguments, so no *args here.
+    if arity == 3:
+        def wrapper(self, context, event):
+            return call((self, context, event))
+    else:
+        def wrapper(self, context):
+            return call((self, context))
+    wrapper.__name__     = func.__name__
+    wrapper.__qualname__ = func.__qualname__
+    wrapper.__doc__      = func.__doc__
+    wrapper.__wrapped__  = func
+    return wrapper
+
+
+## Count the calls of cls's poll/invoke/execute/draw and the processes they start
+#   Scopes are named '<bl_idname>.<method>'. Calling it again re-wraps the
+#   original methods, so it is safe on every register().
+def instrumentClass(cls):
+    name = getattr(cls, 'bl_idname', cls.__name__)
+    for method, arity in WRAPPED_METHODS.items():
+        for klass in cls.__mro__:
+            if method in klass.__dict__:
+                static = klass.__dict__[method]
+                break
+        else:
+            continue
+
+        is_classmethod = isinstance(static, classmethod)
+        func = static.__func__ if is_classmethod else static
+        func = getattr(func, '__wrapped__', func)
+        wrapper = _wrap(func, f'{name}.{method}', arity)
+        setattr(cls, method, classmethod(wrapper) if is_classmethod else wrapper)
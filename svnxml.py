@@ -0,0 +1,298 @@
+## Incremental parsing of 'svn ... --xml' output
+#
+#    The plain text output of svn is localised and its layout differs between
+#    commands and versions, so scraping it by line index or regex is fragile
+#    (non-ASCII paths, translated labels). The --xml output is stable, so the
+#    add-on's queries use it instead.
+#
+#    Output is read from the pipe in chunks and fed to an XMLPullParser. Each
+#    finished <entry> is turned into a typed record and removed from the tree,
+#    so large working copies are never held in memory as one string.
+#
+#    Ref: https://svn.apache.org/repos/asf/subversion/trunk/subversion/svn/schema/
+
+import subprocess, tempfile, logging
+import xml.etree.ElementTree as ET
+
+from . import svntrace, svnjobs
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## Bytes read from the svn pipe at a time.
+CHUNK_SIZE = 64*1024
+
+## Seconds a query run outside a job may go without output before it is killed
+#   Jobs use their own timeout (see svnjobs.Job.streamProcess).
+QUERY_TIMEOUT = 60
+
+## Map <wc-status item="..."> to the first column of 'svn status'
+STATUS_LETTERS = {
+    "none":        ' ',
+    "normal":      ' ',
+    "added":       'A',
+    "conflicted":  'C',
+    "deleted":     'D',
+    "ignored":     'I',
+    "modified":    'M',
+    "replaced":    'R',
+    "external":    'X',
+    "unversioned": '?',
+    "missing":     '!',
+    "incomplete":  '!',
+    "obstructed":  '~',
+}
+
+
+## One <entry> of 'svn info --xml'
+class InfoEntry:
+    __slots__ = ("path", "kind", "revision", "url", "repos_root", "repos_uuid",
+                 "wc_root", "schedule", "depth", "checksum", "commit_revision")
+
+    def __init__(self, path):
+        self.path            = path
+        self.kind            = None
+        self.revision        = 0
+        self.url             = None
+        self.repos_root      = None
+        self.repos_uuid      = None
+        self.wc_root         = None
+        self.schedule        = None
+        self.depth           = None
+        self.checksum        = None
+        self.commit_revision = None
+
+
+## A <lock> of 'svn status --xml', in the working copy or the repository
+class LockInfo:
+    __slots__ = ("token", "owner", "comment", "created")
+
+    def __init__(self, token):
+        self.token   = token
+        self.owner   = ""
+        self.comment = ""
+        self.created = ""
+
+
+## One <entry> of 'svn status --xml'
+#   repos_item and repos_lock are only reported with --show-updates (-u).
+class StatusEntry:
+    __slots__ = ("path", "item", "props", "revision", "commit_revision", "lock",
+                 "repos_item", "repos_lock")
+
+    def __init__(self, path):
+        self.path            = path
+        self.item            = "none"
+        self.props           = "none"
+        self.revision        = None
+        self.commit_revision = None
+        self.lock            = None
+        self.repos_item      = None
+        self.repos_lock      = None
+
+    ## Status as the single letter shown by 'svn status'
+    #   A change of properties alone is shown in the second column by svn; it
+    #   counts as 'M' here, as node_status of the bindings does.
+    @property
+    def letter(self):
+        if self.item == "normal" and self.props == "modified":
+            return 'M'
+        return STATUS_LETTERS.get(self.item, ' ')
+
+
+## One <logentry> of 'svn log --xml'
+class LogEntry:
+    __slots__ = ("revision", "author", "date", "message")
+
+    def __init__(self, revision):
+        self.revision = revision
+        self.author   = ""
+        self.date     = ""
+        self.message  = ""
+
+
+def _toInt(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def buildInfoEntry(elem):
+    entry = InfoEntry(elem.get("path"))
+    entry.kind     = elem.get("kind")
+    # Schedule-add nodes have no revision yet; report them as 0 like 'svn info'.
+    entry.revision = max(_toInt(elem.get("revision"), 0), 0)
+    entry.url      = elem.findtext("url")
+    entry.repos_root = elem.findtext("repository/root")
+    entry.repos_uuid = elem.findtext("repository/uuid")
+    entry.wc_root  = elem.findtext("wc-info/wcroot-abspath")
+    entry.schedule = elem.findtext("wc-info/schedule")
+    entry.depth    = elem.findtext("wc-info/depth")
+    entry.checksum = elem.findtext("wc-info/checksum")
+    commit = elem.find("commit")
+    if commit is not None:
+        entry.commit_revision = _toInt(commit.get("revision"))
+    return entry
+
+
+def buildStatusEntry(elem):
+    entry = StatusEntry(elem.get("path"))
+    wc_status = elem.find("wc-status")
+    if wc_status is not None:
+        entry.item     = wc_status.get("item", "none")
+        entry.props    = wc_status.get("props", "none")
+        entry.revision = _toInt(wc_status.get("revision"))
+        commit = wc_status.find("commit")
+        if commit is not None:
+            entry.commit_revision = _toInt(commit.get("revision"))
+        entry.lock = buildLockInfo(wc_status.find("lock"))
+    repos_status = elem.find("repos-status")
+    if repos_status is not None:
+        entry.repos_item = repos_status.get("item", "none")
+        entry.repos_lock = buildLockInfo(repos_status.find("lock"))
+    return entry
+
+
+def buildLockInfo(elem):
+    if elem is None:
+        return None
+    lock = LockInfo(elem.findtext("token"))
+    lock.owner   = elem.findtext("owner") or ""
+    lock.comment = elem.findtext("comment") or ""
+    lock.created = elem.findtext("created") or ""
+    return lock
+
+
+def buildLogEntry(elem):
+    entry = LogEntry(_toInt(elem.get("revision"), 0))
+    entry.author  = elem.findtext("author") or ""
+    entry.date    = elem.findtext("date") or ""
+    entry.message = elem.findtext("msg") or ""
+    return entry
+
+
+## Yield build(elem) for each finished <tag> element read so far by parser
+#   Finished elements are detached from their parent so memory stays flat.
+def _drain(parser, stack, tag, build):
+    for event, elem in parser.read_events():
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag == tag:
+            yield build(elem)
+            if stack:
+                stack[-1].remove(elem)
+
+
+## Yield build(elem) for each finished <tag> element in a stream of chunks
+def iterRecords(chunks, tag, build):
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _drain(parser, stack, tag, build)
+
+    try:
+        parser.close()
+    except ET.ParseError as error:
+        # svn stops writing mid-document when it hits an error; the error
+        # itself is reported on stderr.
+        myLogger.debug('Incomplete svn xml output: %s', error)
+    yield from _drain(parser, stack, tag, build)
+
+
+## Collect build(elem) records from chunks passed to it one at a time
+#   For output read by someone else, e.g. Job.streamProcess(). Only records
+#   for which keep(record) is true are retained in records.
+class RecordCollector:
+
+    def __init__(self, tag, build, keep=None):
+        self.tag     = tag
+        self.build   = build
+        self.keep    = keep
+        self.records = []
+
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack  = []
+
+
+    def __call__(self, chunk):
+        self._parser.feed(chunk)
+        self._collect()
+
+
+    def close(self):
+        try:
+            self._parser.close()
+        except ET.ParseError as error:
+            myLogger.debug('Incomplete svn xml output: %s', error)
+        self._collect()
+        return self.records
+
+
+    def _collect(self):
+        self.records += [record for record in _drain(self._parser, self._stack, self.tag, self.build)
+                         if self.keep is None or self.keep(record)]
+
+
+## Run an svn --xml command and collect the records it returns
+#   Returns (returncode, records, stderr) with stderr decoded. Only records for
+#   which keep(record) is true are retained.
+#   With a job the command is run by job.streamProcess(), so that a cancel or
+#   the job's output timeout stops it. Without one, svn gets an empty stdin
+#   and is killed after timeout seconds without output.
+def runXmlCommand(command, tag, build, keep=None, chunk_size=CHUNK_SIZE, job=None, timeout=QUERY_TIMEOUT):
+    if job is not None:
+        collector = RecordCollector(tag, build, keep)
+        returncode, stderr = job.streamProcess(command, collector, chunk_size=chunk_size)
+        return returncode, collector.close(), stderr.decode('utf-8', errors='replace')
+
+    # stderr goes to a file so that a chatty stderr cannot block the child
+    # while we are still reading stdout.
+    with tempfile.TemporaryFile() as errfile:
+        process = svntrace.Popen(command,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=errfile)
+        watchdog = svnjobs.Watchdog(timeout, process.kill)
+
+        def read():
+            chunk = process.stdout.read1(chunk_size)
+            watchdog.touch()
+            process.countOutput(len(chunk))
+            return chunk
+
+        try:
+            chunks = iter(read, b'')
+            records = [record for record in iterRecords(chunks, tag, build)
+                       if keep is None or keep(record)]
+        finally:
+            watchdog.stop()
+            process.stdout.close()
+            returncode = process.wait()
+
+        errfile.seek(0)
+        stderr = errfile.read().decode('utf-8', errors='replace')
+
+    if watchdog.expired:
+        myLogger.error(f'\'{" ".join(command[:2])}\' printed nothing for {timeout} seconds and was stopped.')
+        stderr += f'\'{" ".join(command[:2])}\' printed nothing for {timeout} seconds and was stopped.'
+    return returncode, records, stderr
+
+
+## 'svn info --xml' records
+def runInfo(command, job=None):
+    return runXmlCommand(command, "entry", buildInfoEntry, job=job)
+
+
+## 'svn status --xml' records, optionally filtered while streaming
+def runStatus(command, keep=None, job=None):
+    return runXmlCommand(command, "entry", buildStatusEntry, keep, job=job)
+
+
+## 'svn log --xml' records, newest first as svn returns them
+def runLog(command, job=None):
+    return runXmlCommand(command, "logentry", buildLogEntry, job=job)
@@ -0,0 +1,47 @@
+## Shared set-up for the add-on's tests
+#
+#    The add-on is imported with the bpy stand-in of the benchmarks, copied
+#    into a work directory the way Blender installs it (see
+#    benchmarks/run_benchmarks.py), once for all tests.
+#    Tests which run svn are skipped when no working svn is on the PATH.
+
+import sys, atexit, shutil, tempfile, subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent/'benchmarks'))
+
+import run_benchmarks
+
+
+_addon = None
+_svnWorks = None
+
+
+## The add-on, its copy and caches live here until the tests have finished
+_workdir = None
+
+
+def loadAddon():
+    global _addon, _workdir
+    if _addon is None:
+        _workdir = tempfile.TemporaryDirectory(prefix='svnconnector-test-', ignore_cleanup_errors=True)
+        atexit.register(_workdir.cleanup)
+        _addon = run_benchmarks.loadAddon(_workdir.name)
+    return _addon
+
+
+## Whether svn and svnadmin are installed and can create a repository
+def svnWorks():
+    global _svnWorks
+    if _svnWorks is None:
+        workdir = tempfile.mkdtemp(prefix='svnconnector-probe-')
+        try:
+            repo = Path(workdir)/'repo'
+            subprocess.run(['svnadmin', 'create', str(repo)], check=True, capture_output=True, timeout=60)
+            subprocess.run(['svn', 'info', '--non-interactive', repo.as_uri()], check=True, capture_output=True, timeout=60)
+            _svnWorks = True
+        except (OSError, subprocess.SubprocessError):
+            _svnWorks = False
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return _svnWorks
@@ -0,0 +1,36 @@
+## Tests of the svn capability probe
+
+import time, unittest
+
+import support
+
+
+class CapabilitiesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addon = support.loadAddon()
+        self.addon.capsCacheFile.unlink(missing_ok=True)
+        self.addon.svn_caps_loaded = False
+        self.addon.capsJob = None
+
+
+    ## The first request starts a job; the panel shows 'probing…' meanwhile.
+    #  A later session reads the result from the cache without a job.
+    def test_probe_runs_in_a_job_and_is_cached(self):
+        self.assertFalse(self.addon.requestSvnCapabilities())
+        # As from draw(), until the job has been delivered.
+        deadline = time.monotonic() + 60
+        while not self.addon.requestSvnCapabilities():
+            self.assertLess(time.monotonic(), deadline, 'probe did not finish')
+            time.sleep(0.01)
+        self.assertFalse(self.addon.lockEngine.isBusy())
+        self.assertTrue(self.addon.capsCacheFile.is_file())
+
+        self.addon.svn_caps_loaded = False
+        self.addon.capsJob = None
+        self.assertTrue(self.addon.requestSvnCapabilities())
+        self.assertIsNone(self.addon.capsJob)
+
+
+if __name__ == '__main__':
+    unittest.main()
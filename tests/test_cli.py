@@ -0,0 +1,52 @@
+## Tests of the command line, python -m svnconnector
+
+import io, shutil, tempfile, unittest, importlib, contextlib
+from pathlib import Path
+
+import support
+
+
+class BootstrapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addon = support.loadAddon()
+        self.svncli = importlib.import_module(self.addon.__name__ + '.svncli')
+        self.directory = Path(tempfile.mkdtemp(prefix='svnconnector-cli-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        # --svn-dir changes the add-on's preferences in this process.
+        self.addCleanup(self.addon.prefs.__setitem__, 'str_prefSVNExecutableDir',
+                        self.addon.prefs['str_prefSVNExecutableDir'])
+
+        self.project = self.directory/'project'
+        self.project.mkdir()
+        self.filepath = self.project/'scene.blend'
+        self.filepath.write_bytes(b'BLENDER-v300')
+
+
+    def bootstrap(self, *options):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = self.svncli.main(['-j', '1'] + list(options) +
+                                      ['bootstrap', '--repo-root', str(self.directory/'repos'), str(self.filepath)])
+        return status, output.getvalue()
+
+
+    def test_bootstrap_without_svnadmin(self):
+        empty = self.directory/'bin'
+        empty.mkdir()
+        status, output = self.bootstrap('--svn-dir', str(empty))
+        self.assertEqual(status, 1)
+        self.assertIn('needs svnadmin', output)
+        self.assertFalse((self.directory/'repos'/'project').exists())
+
+
+    @unittest.skipUnless(support.svnWorks(), 'needs svn and svnadmin')
+    def test_bootstrap(self):
+        status, output = self.bootstrap('--svn-dir', str(Path(shutil.which('svnadmin')).parent))
+        self.assertEqual(status, 0, output)
+        self.assertTrue((self.directory/'repos'/'project'/'format').is_file())
+        self.assertTrue((self.project/'.svn').is_dir())
+
+
+if __name__ == '__main__':
+    unittest.main()
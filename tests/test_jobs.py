@@ -0,0 +1,37 @@
+## Tests of the job engine as the operators use it
+
+import shutil, tempfile, unittest
+
+import support
+
+import bpy
+
+
+class WindowlessOperatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addon = support.loadAddon()
+        self.directory = tempfile.mkdtemp(prefix='svnconnector-project-')
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.assertIsNone(bpy.context.window)
+
+
+    ## Without a window (a script, background mode) no timer delivers the
+    #  job, so the operator has to, or every later poll() sees a busy engine.
+    def test_batch_operators_back_to_back(self):
+        for cls in (self.addon.BatchStatusOperator, self.addon.BatchCommitOperator):
+            self.addon.stateCache._entries['marker'] = self.addon.svnstate.FileState('marker')
+
+            self.assertTrue(cls.poll(bpy.context), f'{cls.__name__} refused to run')
+            operator = cls()
+            operator.directory = self.directory
+            self.assertEqual(operator.execute(bpy.context), {'FINISHED'})
+
+            self.assertFalse(self.addon.jobEngine.isBusy())
+            self.assertTrue(operator._job.delivered)
+            # svnJobDone ran: the cached state was dropped.
+            self.assertIsNone(self.addon.stateCache.peek('marker'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+## Tests of creating a local repository
+
+import shutil, tempfile, unittest
+from pathlib import Path
+
+import support
+
+
+class LocalRepositoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addon = support.loadAddon()
+        self.directory = Path(tempfile.mkdtemp(prefix='svnconnector-repos-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+
+    def test_prepare_new_repository(self):
+        err, repoPath = self.addon.prepareLocalRepository(self.directory/'home', 'Project')
+        self.assertIsNone(err)
+        self.assertEqual(repoPath, self.directory/'home'/'Project')
+        self.assertTrue((self.directory/'home').is_dir())
+
+
+    def test_prepare_existing_repository(self):
+        (self.directory/'Project').mkdir()
+        err, repoPath = self.addon.prepareLocalRepository(self.directory, 'Project')
+        self.assertIn('already exists', err)
+        self.assertIsNone(repoPath)
+
+
+    @unittest.skipUnless(support.svnWorks(), 'needs svn and svnadmin')
+    def test_create_and_import(self):
+        project = self.directory/'project'
+        project.mkdir()
+        filepath = project/'scene.blend'
+        filepath.write_bytes(b'BLENDER-v300')
+
+        err, message = support.run_benchmarks.runJob(self.addon, self.addon.svnCreateAndImport,
+                                                     str(filepath), self.directory/'repos', 'Project')
+        self.assertIsNone(err, err)
+        self.assertTrue((self.directory/'repos'/'Project'/'format').is_file())
+        self.assertTrue((project/'.svn').is_dir())
+
+
+if __name__ == '__main__':
+    unittest.main()
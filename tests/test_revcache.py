@@ -0,0 +1,75 @@
+## Tests of the revision cache
+
+import os, stat, shutil, tempfile, unittest
+
+import support
+
+
+class RevisionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.revcache = support.loadAddon().revcache
+        self.directory = tempfile.mkdtemp(prefix='svnconnector-revcache-')
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+
+    def insert(self, cache, revision, content):
+        incoming = cache.incoming()
+        incoming.write(content)
+        return cache.insert('uuid', '/file.blend', revision, incoming)
+
+
+    ## Both revisions of a comparison have to survive the second fetch, even
+    #  when together they exceed the budget.
+    def test_pinned_blob_is_not_evicted(self):
+        cache = self.revcache.RevisionCache(self.directory, budget=10)
+        self.addCleanup(cache.close)
+
+        old = self.insert(cache, 1, b'x'*8)
+        cache.pin(old)
+        new = self.insert(cache, 2, b'y'*8)
+        self.assertTrue(os.path.isfile(old))
+        self.assertTrue(os.path.isfile(new))
+
+        cache.unpin(old)
+        self.insert(cache, 3, b'z'*8)
+        self.assertFalse(os.path.isfile(old))
+        self.assertIsNone(cache.lookup('uuid', '/file.blend', 1))
+
+
+    ## A file with svn:needs-lock is read-only until it is locked.
+    def test_materialize_keeps_mode(self):
+        cache = self.revcache.RevisionCache(os.path.join(self.directory, 'cache'), budget=1024)
+        self.addCleanup(cache.close)
+        blob = self.insert(cache, 1, b'old content')
+
+        dst = os.path.join(self.directory, 'file.blend')
+        with open(dst, 'wb') as file:
+            file.write(b'new content')
+        os.chmod(dst, 0o444)
+        self.addCleanup(os.chmod, dst, 0o644)
+
+        cache.materialize(blob, dst)
+        with open(dst, 'rb') as file:
+            self.assertEqual(file.read(), b'old content')
+        self.assertEqual(stat.S_IMODE(os.stat(dst).st_mode), 0o444)
+
+
+    def test_materialize_keeps_hard_links(self):
+        cache = self.revcache.RevisionCache(os.path.join(self.directory, 'cache'), budget=1024)
+        self.addCleanup(cache.close)
+        blob = self.insert(cache, 1, b'old content')
+
+        dst = os.path.join(self.directory, 'file.blend')
+        link = os.path.join(self.directory, 'link.blend')
+        with open(dst, 'wb') as file:
+            file.write(b'new content')
+        os.link(dst, link)
+
+        cache.materialize(blob, dst)
+        with open(link, 'rb') as file:
+            self.assertEqual(file.read(), b'old content')
+
+
+if __name__ == '__main__':
+    unittest.main()
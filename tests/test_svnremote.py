@@ -0,0 +1,60 @@
+## Tests of the RA session pool, with a stand-in for the svn bindings
+
+import threading, unittest
+from types import SimpleNamespace
+
+import support
+
+
+class SubversionException(Exception):
+
+    def __init__(self, message, apr_err):
+        super().__init__(message)
+        self.apr_err = apr_err
+
+
+## The part of svn.ra the pool uses. A log on a stale session fails after
+#  one entry, as when the server has closed the connection midway.
+class FakeRa:
+
+    def __init__(self, svnremote):
+        self.svnremote = svnremote
+        self.opened = 0
+
+    def open2(self, root, callbacks, config, pool):
+        self.opened += 1
+        return {'stale': False}
+
+    def get_latest_revnum(self, session):
+        return 3
+
+    def get_log2(self, session, paths, start, end, limit, changed_paths, strict, merged, revprops, receiver):
+        for revision in range(start, end-1, -1):
+            receiver(SimpleNamespace(revision=revision, revprops={'svn:author': b'artist'}))
+            if session['stale']:
+                raise SubversionException('Connection closed', self.svnremote.SVN_ERR_RA_SVN_CONNECTION_CLOSED)
+
+
+class RaSessionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.svnremote = support.loadAddon().svnremote
+        self.pool = self.svnremote.RaSessionPool.__new__(self.svnremote.RaSessionPool)
+        self.pool._core = SimpleNamespace(SubversionException=SubversionException)
+        self.pool._ra = FakeRa(self.svnremote)
+        self.pool._ra.Callbacks = SimpleNamespace
+        self.pool._auth = self.pool._config = self.pool._pool = None
+        self.pool._lock = threading.Lock()
+        self.pool._sessions = {'svn://server/repo': {'stale': True}}
+
+
+    ## The retry on a new session must not keep the entries of the failed one.
+    def test_log_retry_has_no_duplicates(self):
+        err, entries = self.pool.log('svn://server/repo', '/trunk/shot.blend', None, 1)
+        self.assertIsNone(err)
+        self.assertEqual(self.pool._ra.opened, 1)
+        self.assertEqual([entry.revision for entry in entries], [3, 2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
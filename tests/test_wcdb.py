@@ -0,0 +1,95 @@
+## Tests of reading the working copy database
+
+import os, shutil, sqlite3, tempfile, unittest
+
+import support
+
+
+class GetWcDbTest(unittest.TestCase):
+
+    def setUp(self):
+        self.wcdb = support.loadAddon().wcdb
+        self.wc_root = tempfile.mkdtemp(prefix='svnconnector-wc-')
+        os.mkdir(os.path.join(self.wc_root, self.wcdb.WC_ADM_DIR))
+        self.addCleanup(shutil.rmtree, self.wc_root, ignore_errors=True)
+        self.addCleanup(self.wcdb.closeAll)
+
+        retry = self.wcdb.RETRY_INTERVAL
+        self.wcdb.RETRY_INTERVAL = 0
+        self.addCleanup(setattr, self.wcdb, 'RETRY_INTERVAL', retry)
+
+
+    def writeDb(self, format, tables=True):
+        conn = sqlite3.connect(os.path.join(self.wc_root, self.wcdb.WC_ADM_DIR, self.wcdb.WC_DB_NAME))
+        with conn:
+            if tables:
+                conn.execute('CREATE TABLE IF NOT EXISTS WCROOT (id INTEGER PRIMARY KEY, local_abspath TEXT)')
+                conn.execute('INSERT INTO WCROOT (local_abspath) VALUES (NULL)')
+            conn.execute(f'PRAGMA user_version = {format}')
+        conn.close()
+
+
+    ## A checkout creates the tables first and sets the format last.
+    def test_database_being_created_is_retried(self):
+        self.writeDb(0, tables=False)
+        with self.assertRaises(self.wcdb.SchemaMismatch):
+            self.wcdb.getWcDb(self.wc_root)
+
+        self.writeDb(self.wcdb.SUPPORTED_FORMATS[-1])
+        self.assertEqual(self.wcdb.getWcDb(self.wc_root).format, self.wcdb.SUPPORTED_FORMATS[-1])
+
+
+    def test_unsupported_format_is_not_retried(self):
+        self.writeDb(29)
+        with self.assertRaises(self.wcdb.UnsupportedFormat):
+            self.wcdb.getWcDb(self.wc_root)
+
+        self.writeDb(self.wcdb.SUPPORTED_FORMATS[-1])
+        with self.assertRaises(self.wcdb.SchemaMismatch):
+            self.wcdb.getWcDb(self.wc_root)
+
+
+
+class PropertiesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addon = support.loadAddon()
+        self.wcdb = self.addon.wcdb
+        self.wc_root = tempfile.mkdtemp(prefix='svnconnector-wc-')
+        os.mkdir(os.path.join(self.wc_root, self.wcdb.WC_ADM_DIR))
+        self.addCleanup(shutil.rmtree, self.wc_root, ignore_errors=True)
+        self.addCleanup(self.wcdb.closeAll)
+
+        # A committed file, unchanged on disk, with svn:needs-lock set since.
+        self.filepath = os.path.join(self.wc_root, 'scene.blend')
+        with open(self.filepath, 'wb') as file:
+            file.write(b'BLENDER-v300')
+        stat = os.stat(self.filepath)
+
+        conn = sqlite3.connect(os.path.join(self.wc_root, self.wcdb.WC_ADM_DIR, self.wcdb.WC_DB_NAME))
+        with conn:
+            conn.execute('CREATE TABLE WCROOT (id INTEGER PRIMARY KEY, local_abspath TEXT)')
+            conn.execute('CREATE TABLE NODES (wc_id INTEGER, local_relpath TEXT, op_depth INTEGER, presence TEXT, '
+                         'kind TEXT, revision INTEGER, translated_size INTEGER, last_mod_time INTEGER, '
+                         'checksum TEXT, properties BLOB)')
+            conn.execute('CREATE TABLE ACTUAL_NODE (wc_id INTEGER, local_relpath TEXT, properties BLOB, '
+                         'conflict_data BLOB)')
+            conn.execute('INSERT INTO WCROOT (id) VALUES (1)')
+            conn.execute('INSERT INTO NODES VALUES (1, ?, 0, ?, ?, 2, ?, ?, NULL, ?)',
+                         ('scene.blend', 'normal', 'file', stat.st_size, stat.st_mtime_ns // 1000, b'()'))
+            conn.execute('INSERT INTO ACTUAL_NODE VALUES (1, ?, ?, NULL)',
+                         ('scene.blend', b'(14 svn:needs-lock 1 *)'))
+            conn.execute(f'PRAGMA user_version = {self.wcdb.SUPPORTED_FORMATS[-1]}')
+        conn.close()
+
+
+    def test_property_change_is_a_change(self):
+        db = self.wcdb.getWcDb(self.wc_root)
+        self.assertTrue(db.matchesPristine(self.filepath))
+        self.assertTrue(db.propertiesModified(self.filepath))
+        self.assertEqual(db.status(self.filepath), 'M')
+        self.assertFalse(self.addon.isUnchangedSinceCommit(self.filepath))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,423 @@
+## Read-only access to the working copy database (.svn/wc.db)
+#
+#    Since svn 1.7 all working copy metadata lives in a single SQLite database
+#    at the wc-root. The questions Blender asks constantly (is this a working
+#    copy, where is its root, what revision is the file at, has it changed)
+#    can be answered from it without starting svn or taking a wc lock.
+#
+#    Notes:
+#     - Connections are opened with mode=ro and kept in a pool keyed by wc-root.
+#     - Only the schema formats listed in SUPPORTED_FORMATS are read. Anything
+#       else raises SchemaMismatch so the caller can fall back to svn.
+#     - A wc.db of an unsupported format is not tried again in the session.
+#       Other failures (locked, or still being created by a checkout) are
+#       retried after RETRY_INTERVAL.
+#     - Answers which need the file content (same size but a different mtime)
+#       are not guessed; None is returned and svn decides.
+#
+#    Ref: https://svn.apache.org/repos/asf/subversion/trunk/subversion/libsvn_wc/wc-metadata.sql
+
+import os, sqlite3, threading, hashlib, time, logging
+
+from pathlib import Path
+
+
+myLogger = logging.getLogger('com.codetestdummy.blender.svnconnector')
+
+## wc.db formats (PRAGMA user_version) this module understands.
+#   31 is written by svn 1.8 to 1.14.
+SUPPORTED_FORMATS = (31,)
+
+WC_ADM_DIR = '.svn'
+WC_DB_NAME = 'wc.db'
+
+## Seconds to wait for svn to release a write lock before giving up.
+BUSY_TIMEOUT = 0.1
+
+## Seconds before a wc.db which could not be read is tried again
+#   Unless its format is unsupported, the cause is usually passing: svn holds
+#   a lock, or a checkout has not finished creating the database yet.
+RETRY_INTERVAL = 5.0
+
+## Size of the per-thread buffer used to hash working files.
+HASH_BUFFER_SIZE = 4*1024*1024
+
+## wc.db stores checksums as '$sha1$<hex>'
+SHA1_PREFIX = '$sha1$'
+
+## Paths per query when looking up many nodes (SQLite allows 999 parameters)
+SQL_BATCH = 500
+
+
+## Raised when wc.db cannot be read with the queries in this module
+class SchemaMismatch(Exception):
+    pass
+
+
+## Raised when wc.db is of a format not in SUPPORTED_FORMATS
+#   Unlike other SchemaMismatch errors this will not go away by itself.
+class UnsupportedFormat(SchemaMismatch):
+    pass
+
+
+## Return the wc-root containing path, or None if there is none
+#   The innermost directory holding .svn is the root. A .svn without wc.db is a
+#   pre-1.7 working copy, which raises SchemaMismatch.
+def findWcRoot(path):
+    path = Path(os.path.abspath(path))
+    for directory in [path] + list(path.parents):
+        if (directory/WC_ADM_DIR).is_dir():
+            if not (directory/WC_ADM_DIR/WC_DB_NAME).is_file():
+                raise SchemaMismatch(f'No {WC_DB_NAME} in {directory/WC_ADM_DIR}.')
+            return str(directory)
+    return None
+
+
+## A pooled read-only connection to one working copy's wc.db
+class WcDb:
+
+    def __init__(self, wc_root):
+        self.wc_root = wc_root
+        self.db_path = os.path.join(wc_root, WC_ADM_DIR, WC_DB_NAME)
+        self._lock = threading.Lock()
+
+        uri = Path(self.db_path).as_uri() + '?mode=ro'
+        try:
+            self._conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT,
+                                         check_same_thread=False)
+        except sqlite3.Error as error:
+            raise SchemaMismatch(f'Could not open {self.db_path}: {error}')
+
+        try:
+            self.format = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if self.format == 0:
+                # svn sets the format once it has created the tables.
+                raise SchemaMismatch(f'wc.db in {wc_root} is still being created.')
+            if self.format not in SUPPORTED_FORMATS:
+                raise UnsupportedFormat(f'Unsupported wc.db format {self.format} in {wc_root}.')
+            row = self._conn.execute('SELECT id FROM WCROOT LIMIT 1').fetchone()
+            if row is None:
+                raise SchemaMismatch(f'No working copy root in {self.db_path} yet.')
+            self.wc_id = row[0]
+        except sqlite3.Error as error:
+            self._conn.close()
+            raise SchemaMismatch(f'Could not read {self.db_path}: {error}')
+        except SchemaMismatch:
+            self._conn.close()
+            raise
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+    def _query(self, sql, args):
+        with self._lock:
+            try:
+                return self._conn.execute(sql, args).fetchall()
+            except sqlite3.Error as error:
+                raise SchemaMismatch(f'Could not query {self.db_path}: {error}')
+
+
+    ## Path of abspath relative to the wc-root in wc.db form ('' is the root)
+    def relpath(self, abspath):
+        relpath = os.path.relpath(os.path.abspath(abspath), self.wc_root)
+        return '' if relpath == '.' else relpath.replace(os.sep, '/')
+
+
+    ## All layers of a node, topmost (working) first
+    def nodeRows(self, relpath):
+        return self._query(
+            'SELECT op_depth, presence, kind, revision, translated_size, last_mod_time, checksum '
+            'FROM NODES WHERE wc_id = ? AND local_relpath = ? ORDER BY op_depth DESC',
+            (self.wc_id, relpath))
+
+
+    def isConflicted(self, relpath):
+        return len(self._query(
+            'SELECT 1 FROM ACTUAL_NODE WHERE wc_id = ? AND local_relpath = ? '
+            'AND conflict_data IS NOT NULL', (self.wc_id, relpath)))>0
+
+
+    ## (repository root URL, UUID, repository-relative path) of the node's base
+    #   None for nodes which are not in the repository yet.
+    def reposInfo(self, abspath):
+        rows = self._query(
+            'SELECT r.root, r.uuid, n.repos_path FROM NODES n '
+            'JOIN REPOSITORY r ON r.id = n.repos_id '
+            'WHERE n.wc_id = ? AND n.local_relpath = ? AND n.op_depth = 0',
+            (self.wc_id, self.relpath(abspath)))
+        return rows[0] if rows else None
+
+
+    ## Versioned properties of the node, as {name: value} in bytes
+    #   Local changes (propset since the last commit) are included.
+    def properties(self, abspath):
+        relpath = self.relpath(abspath)
+        rows = self._query(
+            'SELECT properties FROM ACTUAL_NODE WHERE wc_id = ? AND local_relpath = ? '
+            'AND properties IS NOT NULL', (self.wc_id, relpath))
+        if not rows:
+            rows = self._query(
+                'SELECT properties FROM NODES WHERE wc_id = ? AND local_relpath = ? '
+                'ORDER BY op_depth DESC LIMIT 1', (self.wc_id, relpath))
+        return parseProperties(rows[0][0]) if rows else {}
+
+
+    ## Return whether the node's properties differ from its pristine ones
+    #   ACTUAL_NODE holds properties only while they are changed locally.
+    def propertiesModified(self, abspath):
+        relpath = self.relpath(abspath)
+        actual = self._query(
+            'SELECT properties FROM ACTUAL_NODE WHERE wc_id = ? AND local_relpath = ? '
+            'AND properties IS NOT NULL', (self.wc_id, relpath))
+        if not actual:
+            return False
+        pristine = self._query(
+            'SELECT properties FROM NODES WHERE wc_id = ? AND local_relpath = ? '
+            'ORDER BY op_depth DESC LIMIT 1', (self.wc_id, relpath))
+        return parseProperties(actual[0][0]) != (parseProperties(pristine[0][0]) if pristine else {})
+
+
+    ## Depth of the versioned directories at or below abspath, as [(relpath, depth)]
+    #   depth is one of 'empty', 'files', 'immediates', 'infinity', or
+    #   'exclude' for directories taken out with --set-depth exclude.
+    def directoryDepths(self, abspath, limit=-1):
+        relpath = self.relpath(abspath)
+        rows = self._query(
+            "SELECT local_relpath, presence, depth FROM NODES "
+            "WHERE wc_id = :wc_id AND op_depth = 0 AND kind = 'dir' "
+            "AND presence IN ('normal', 'excluded') "
+            "AND (:relpath = '' OR local_relpath = :relpath "
+            "OR substr(local_relpath, 1, length(:relpath)+1) = :relpath || '/') "
+            "ORDER BY local_relpath LIMIT :limit",
+            dict(wc_id=self.wc_id, relpath=relpath, limit=limit))
+        return [(path, _depth(presence, depth)) for path, presence, depth in rows]
+
+
+    ## Depth of those relpaths which are versioned directories, as {relpath: depth}
+    def depthsOf(self, relpaths):
+        relpaths = list(relpaths)
+        depths = {}
+        for start in range(0, len(relpaths), SQL_BATCH):
+            batch = relpaths[start:start+SQL_BATCH]
+            rows = self._query(
+                "SELECT local_relpath, presence, depth FROM NODES "
+                "WHERE wc_id = ? AND op_depth = 0 AND kind = 'dir' "
+                "AND presence IN ('normal', 'excluded') "
+                f"AND local_relpath IN ({', '.join('?'*len(batch))})",
+                [self.wc_id] + batch)
+            depths.update((path, _depth(presence, depth)) for path, presence, depth in rows)
+        return depths
+
+
+    ## Revision of the node as shown by 'svn info', or None if unknown
+    def revision(self, abspath):
+        rows = self.nodeRows(self.relpath(abspath))
+        if not rows:
+            return None
+        base = [row for row in rows if row[0] == 0]
+        if base and base[0][1] == 'normal':
+            return base[0][3]
+        if rows[0][0] > 0 and rows[0][1] == 'normal':
+            # Scheduled for addition, no revision yet.
+            return 0
+        return None
+
+
+    ## First column of 'svn status' for the node, or None if svn must decide
+    def status(self, abspath):
+        relpath = self.relpath(abspath)
+        rows = self.nodeRows(relpath)
+        if not rows:
+            # Unversioned or ignored; only svn knows the ignore rules.
+            return None
+
+        if self.isConflicted(relpath):
+            return 'C'
+
+        op_depth, presence, kind, revision, translated_size, last_mod_time, checksum = rows[0]
+
+        if op_depth > 0:
+            if presence == 'base-deleted':
+                return 'D'
+            if presence != 'normal':
+                return None
+            if not os.path.lexists(abspath):
+                return '!'
+            has_base = any(row[0] == 0 and row[1] == 'normal' for row in rows)
+            return 'R' if has_base else 'A'
+
+        if presence == 'incomplete':
+            return '!'
+        if presence != 'normal':
+            return None
+
+        try:
+            stat = os.stat(abspath)
+        except FileNotFoundError:
+            return '!'
+
+        if kind != 'file':
+            return 'M' if self.propertiesModified(abspath) else ' '
+
+        status = compareFileStat(stat, translated_size, last_mod_time)
+        if status == ' ' and self.propertiesModified(abspath):
+            return 'M'
+        return status
+
+
+    ## Return whether the file's content matches its pristine (last committed) copy
+    #   True or False when wc.db can tell, None when only svn can (e.g. added,
+    #   conflicted or not a file). Hashes the file only if size and mtime do not
+    #   already decide it.
+    def matchesPristine(self, abspath):
+        relpath = self.relpath(abspath)
+        rows = self.nodeRows(relpath)
+        if not rows:
+            return None
+
+        op_depth, presence, kind, revision, translated_size, last_mod_time, checksum = rows[0]
+        if op_depth > 0 or presence != 'normal' or kind != 'file':
+            return None
+        if self.isConflicted(relpath):
+            return None
+
+        try:
+            stat = os.stat(abspath)
+        except FileNotFoundError:
+            return None
+
+        quick = compareFileStat(stat, translated_size, last_mod_time)
+        if quick == ' ':
+            return True
+        if quick == 'M':
+            return False
+
+        if not checksum or not checksum.startswith(SHA1_PREFIX):
+            return None
+        return fileSha1(abspath) == checksum[len(SHA1_PREFIX):]
+
+
+## Parse a property list as wc.db stores it, e.g. b'(svn:needs-lock 1 * )'
+#   The list is a 'skel' of alternating names and values. An atom is either
+#   a word (starting with a letter, up to whitespace or a parenthesis) or a
+#   length, one whitespace character and that many bytes.
+def parseProperties(skel):
+    if not skel or skel[:1] != b'(':
+        return {}
+
+    atoms, pos = [], 1
+    while pos < len(skel):
+        char = skel[pos:pos+1]
+        if char.isspace():
+            pos += 1
+        elif char == b')':
+            break
+        elif char.isdigit():
+            stop = pos
+            while skel[stop:stop+1].isdigit():
+                stop += 1
+            start = stop + 1
+            pos = start + int(skel[pos:stop])
+            atoms.append(skel[start:pos])
+        else:
+            stop = pos
+            while stop < len(skel) and not skel[stop:stop+1].isspace() and skel[stop:stop+1] not in (b'(', b')'):
+                stop += 1
+            atoms.append(skel[pos:stop])
+            pos = stop
+    return dict(zip(atoms[0::2], atoms[1::2]))
+
+
+def _depth(presence, depth):
+    return 'exclude' if presence == 'excluded' else depth
+
+
+## Compare a file's stat against what wc.db recorded at the last checkout
+#   Returns ' ' if unchanged, 'M' if certainly changed and None if only the
+#   content can tell (same size but a different timestamp).
+def compareFileStat(stat, translated_size, last_mod_time):
+    if translated_size is None or last_mod_time is None:
+        return None
+    if stat.st_size != translated_size:
+        return 'M'
+    # wc.db records apr_time_t, i.e. microseconds since the epoch.
+    if stat.st_mtime_ns // 1000 == last_mod_time:
+        return ' '
+    return None
+
+
+_hash_buffers = threading.local()
+
+
+## Stream the SHA-1 of a file through a reusable per-thread buffer
+def fileSha1(path):
+    buffer = getattr(_hash_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _hash_buffers.buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+
+    sha1 = hashlib.sha1()
+    with open(path, 'rb', buffering=0) as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            sha1.update(view[:count])
+    return sha1.hexdigest()
+
+
+#########################
+###  Connection Pool  ###
+#########################
+
+_pool = {}
+_pool_lock = threading.Lock()
+
+## wc-roots which failed to open, so they are not retried on every call
+#   wc_root -> (error message, time.monotonic() of the next try or None for never)
+_unsupported = {}
+
+
+## Return a pooled WcDb for the working copy at wc_root
+#   Raises SchemaMismatch if it cannot be read.
+def getWcDb(wc_root):
+    with _pool_lock:
+        db = _pool.get(wc_root)
+        if db is None:
+            if wc_root in _unsupported:
+                message, retry = _unsupported[wc_root]
+                if retry is None or time.monotonic() < retry:
+                    raise SchemaMismatch(message)
+                del _unsupported[wc_root]
+            try:
+                db = WcDb(wc_root)
+            except UnsupportedFormat as error:
+                myLogger.info(f'Not reading wc.db directly: {error}')
+                _unsupported[wc_root] = (str(error), None)
+                raise
+            except SchemaMismatch as error:
+                myLogger.info(f'Not reading wc.db directly for now: {error}')
+                _unsupported[wc_root] = (str(error), time.monotonic() + RETRY_INTERVAL)
+                raise
+            _pool[wc_root] = db
+            myLogger.debug('Opened wc.db for %s (format %s).', wc_root, db.format)
+        return db
+
+
+## Return the pooled WcDb of the working copy containing path, or None
+def getWcDbFor(path):
+    wc_root = findWcRoot(path)
+    if wc_root is None:
+        return None
+    return getWcDb(wc_root)
+
+
+def closeAll():
+    with _pool_lock:
+        for db in _pool.values():
+            db.close()
+        _pool.clear()
+        _unsupported.clear()